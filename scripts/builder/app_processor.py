@@ -7,8 +7,10 @@ replacing the legacy scripts/lib/app_processor.sh implementation.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import re
 import subprocess
 import sys
 import tempfile
@@ -28,17 +30,24 @@ from scripts.builder.cli_profiles import (
     PatchCommandConfig,
     detect_cli_profile,
 )
+from scripts.builder.scheduler import BuildTimes, Variant, order_longest_first, variant_key
 from scripts.lib.plugins import dispatch_plugins
 from scripts.scrapers.base import DownloadSource
 from scripts.utils.java import JavaRunner
+from scripts.utils.network import configure_download_governor, download_job
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
 
     from scripts.builder.config import AppConfig, Config
+    from scripts.scrapers.download_manager import MultiSourceMode, SourceCandidate
+    from scripts.scrapers.source_stats import SourceStats
 
 logger = logging.getLogger(__name__)
 
+# Maximum prebuilt downloads in flight during `prefetch_prebuilts`.
+PREFETCH_CONCURRENCY = 4
+
 
 class Architecture(Enum):
     """Supported CPU architectures."""
@@ -227,6 +236,33 @@ class DownloadManager(Protocol):
         """
         ...
 
+    def download_any(
+        self,
+        candidates: Sequence[SourceCandidate],
+        version: str,
+        output_path: Path,
+        *,
+        mode: MultiSourceMode = "race",
+        arch: str | None = None,
+        dpi: str | None = None,
+        expected_package: str | None = None,
+    ) -> tuple[Path, DownloadSource]:
+        """Download stock APK from whichever of several sources delivers it.
+
+        Args:
+            candidates: Sources to try, in preference order.
+            version: Version to download.
+            output_path: Where to save the APK.
+            mode: "failover" or "race".
+            arch: Target architecture.
+            dpi: Target DPI.
+            expected_package: Android package id the APK must declare.
+
+        Returns:
+            Tuple of (path to downloaded APK, source it came from).
+        """
+        ...
+
 
 class ModuleGenerator(Protocol):
     """Protocol for module generation implementations."""
@@ -286,11 +322,33 @@ def _resolve_github_release_asset(source: str, ext: str, fallback_ext: str | Non
         browser_download_url) requires an octet-stream Accept header to
         stream binary content, which gh_dl() already sets.
     """
-    import json
-
     from scripts.utils.network import gh_req
 
     releases_raw = gh_req(f"https://api.github.com/repos/{source}/releases")
+    return _select_release_asset(source, releases_raw, ext, fallback_ext)
+
+
+async def _async_resolve_github_release_asset(
+    source: str,
+    ext: str,
+    fallback_ext: str | None = None,
+) -> tuple[str, str]:
+    """Async counterpart of `_resolve_github_release_asset`."""
+    from scripts.utils.network import async_gh_req
+
+    releases_raw = await async_gh_req(f"https://api.github.com/repos/{source}/releases")
+    return _select_release_asset(source, releases_raw, ext, fallback_ext)
+
+
+def _select_release_asset(
+    source: str,
+    releases_raw: str | bytes,
+    ext: str,
+    fallback_ext: str | None,
+) -> tuple[str, str]:
+    """Pick the asset from a ``/releases`` listing (see `_resolve_github_release_asset`)."""
+    import json
+
     releases = json.loads(releases_raw)
     if not releases:
         msg = f"No releases found for {source}"
@@ -309,6 +367,154 @@ def _resolve_github_release_asset(source: str, ext: str, fallback_ext: str | Non
     raise RuntimeError(msg)
 
 
+@dataclass(frozen=True)
+class PrebuiltSpec:
+    """A CLI or patches artifact a build needs locally.
+
+    Attributes:
+        kind: "cli" or "patches".
+        source: GitHub repository (or external-bundles source) to fetch from.
+        version: Requested version.
+        path: Cache path the artifact is stored at.
+        ext: Release asset extension to look for.
+        fallback_ext: Extension accepted when no ``ext`` asset exists.
+        bundle_selector: external-bundles selector, for external sources.
+    """
+
+    kind: str
+    source: str
+    version: str
+    path: Path
+    ext: str
+    fallback_ext: str | None = None
+    bundle_selector: str | None = None
+
+    @property
+    def resolve_key(self) -> tuple[str, str, str | None, str | None, str]:
+        """Specs with equal keys resolve to the same download URL."""
+        return (self.source, self.ext, self.fallback_ext, self.bundle_selector, self.version)
+
+
+def _prebuilt_specs(
+    cli_source: str,
+    cli_version: str,
+    patches_source: str | list[str],
+    patches_version: str,
+    app_id: str,
+) -> list[PrebuiltSpec]:
+    """List the prebuilts of one app: the CLI first, then each patches bundle.
+
+    Paths live under ``$CACHE_DIR/prebuilts`` and are shared by every app
+    and variant with the same versions.
+    """
+    from scripts.scrapers.external_bundles import is_external_bundles_source, parse_bundle_selector
+
+    prebuilts_dir = Path(os.environ.get("CACHE_DIR", ".cache")) / "prebuilts"
+    specs = [PrebuiltSpec("cli", cli_source, cli_version, prebuilts_dir / f"cli-{cli_version}.jar", "jar")]
+
+    patches_sources = [patches_source] if isinstance(patches_source, str) else patches_source
+    for idx, patches_src in enumerate(patches_sources):
+        is_morphe = _is_morphe_patches_source(patches_src)
+        ext = "mpp" if is_morphe else "rvp"
+        specs.append(
+            PrebuiltSpec(
+                "patches",
+                patches_src,
+                patches_version,
+                prebuilts_dir / f"patches-{patches_version}-{idx}.{ext}",
+                ext,
+                fallback_ext="rvp" if is_morphe else "mpp",
+                bundle_selector=(
+                    parse_bundle_selector(patches_src) or app_id if is_external_bundles_source(patches_src) else None
+                ),
+            )
+        )
+    return specs
+
+
+def _resolve_prebuilt_url(spec: PrebuiltSpec) -> str:
+    """Download URL of a prebuilt."""
+    if spec.bundle_selector is not None:
+        from scripts.scrapers.external_bundles import resolve_bundle
+
+        return resolve_bundle(spec.bundle_selector, spec.version).download_url
+    _asset_name, url = _resolve_github_release_asset(spec.source, spec.ext, spec.fallback_ext)
+    return url
+
+
+async def _async_resolve_prebuilt_url(spec: PrebuiltSpec) -> str:
+    """Async counterpart of `_resolve_prebuilt_url`."""
+    if spec.bundle_selector is not None:
+        from scripts.scrapers.external_bundles import resolve_bundle
+
+        entry = await asyncio.to_thread(resolve_bundle, spec.bundle_selector, spec.version)
+        return entry.download_url
+    _asset_name, url = await _async_resolve_github_release_asset(spec.source, spec.ext, spec.fallback_ext)
+    return url
+
+
+def prefetch_prebuilts(config: Config, *, max_concurrency: int = PREFETCH_CONCURRENCY) -> list[Path]:
+    """Download the prebuilts of every enabled app before builds start.
+
+    Collects the unique CLI and patches artifacts across ``config.apps``,
+    resolves their release assets concurrently (each distinct source once)
+    and downloads the missing ones with at most ``max_concurrency`` in
+    flight. Build jobs then find them on disk in `_ensure_prebuilts`.
+
+    Args:
+        config: Loaded configuration.
+        max_concurrency: Maximum simultaneous downloads.
+
+    Returns:
+        Paths that could not be fetched; their builds retry on their own.
+    """
+    settings = config.global_settings
+    specs: dict[Path, PrebuiltSpec] = {}
+    for app_config in config.apps.values():
+        if not app_config.enabled:
+            continue
+        for spec in _prebuilt_specs(
+            app_config.cli_source or settings.cli_source,
+            settings.cli_version,
+            app_config.patches_source or settings.patches_source,
+            settings.patches_version,
+            app_config.name,
+        ):
+            specs.setdefault(spec.path, spec)
+
+    missing = [spec for spec in specs.values() if not spec.path.exists()]
+    if not missing:
+        return []
+    missing[0].path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info("Prefetching %d prebuilt(s)", len(missing))
+    return asyncio.run(_prefetch_specs(missing, max_concurrency))
+
+
+async def _prefetch_specs(specs: list[PrebuiltSpec], max_concurrency: int) -> list[Path]:
+    from scripts.utils.network import aclose_shared_clients, async_gh_dl
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    resolving: dict[tuple[str, str, str | None, str | None, str], asyncio.Task[str]] = {}
+
+    async def fetch(spec: PrebuiltSpec) -> bool:
+        task = resolving.get(spec.resolve_key)
+        if task is None:
+            task = resolving[spec.resolve_key] = asyncio.create_task(_async_resolve_prebuilt_url(spec))
+        try:
+            url = await task
+            async with semaphore:
+                return await async_gh_dl(spec.path, url)
+        except Exception as e:
+            logger.warning("Failed to prefetch %s from %s: %s", spec.path.name, spec.source, e)
+            return False
+
+    try:
+        results = await asyncio.gather(*(fetch(spec) for spec in specs))
+    finally:
+        await aclose_shared_clients()
+    return [spec.path for spec, ok in zip(specs, results, strict=True) if not ok]
+
+
 def _derive_scraper_pkg_name(download_url: str, source: DownloadSource) -> str:
     """Derive the package identifier a scraper expects from a configured ``*-dlurl`` listing-page URL.
 
@@ -327,6 +533,36 @@ def _derive_scraper_pkg_name(download_url: str, source: DownloadSource) -> str:
     return path.rsplit("/", 1)[-1]
 
 
+# Download sources in preference order. APKMirror first (preferred: most
+# complete/official listings; its scraper's stale selectors against the live
+# site were fixed -- see _list_release_pages()/_get_download_url() in
+# apkmirror.py). Archive.org is the fallback: a stable static directory
+# listing, but a much smaller catalog than APKMirror's.
+_SOURCE_PRIORITY: tuple[tuple[DownloadSource, str], ...] = (
+    (DownloadSource.APKMIRROR, "apkmirror_dlurl"),
+    (DownloadSource.ARCHIVE, "archive_dlurl"),
+    (DownloadSource.UPTODOWN, "uptodown_dlurl"),
+    (DownloadSource.APKPURE, "apkpure_dlurl"),
+    (DownloadSource.APTOIDE, "aptoide_dlurl"),
+    (DownloadSource.APKMonk, "apkmonk_dlurl"),
+)
+
+_PACKAGE_ID = re.compile(r"^[A-Za-z][\w]*(?:\.[A-Za-z][\w]*)+$")
+
+
+def _configured_sources(options: dict[str, Any]) -> list[tuple[DownloadSource, str]]:
+    """``(source, dlurl)`` for every configured ``*_dlurl`` option, in preference order."""
+    return [(source, options[key]) for source, key in _SOURCE_PRIORITY if options.get(key)]
+
+
+def _expected_package(candidates: list[SourceCandidate]) -> str | None:
+    """Android package id named by a candidate's identifier, if any source uses one."""
+    for candidate in candidates:
+        if candidate.source != DownloadSource.APKMIRROR and _PACKAGE_ID.match(candidate.app_id):
+            return candidate.app_id
+    return None
+
+
 _KNOWN_NATIVE_ARCHS = ("arm64-v8a", "armeabi-v7a")
 
 
@@ -487,6 +723,7 @@ class AppProcessor:
         version_resolver: Optional version resolver.
         download_manager: Optional download manager.
         module_generator: Optional module generator.
+        source_stats: Optional source health records ordering the sources.
     """
 
     def __init__(
@@ -498,6 +735,7 @@ class AppProcessor:
         version_resolver: VersionResolver | None = None,
         download_manager: DownloadManager | None = None,
         module_generator: ModuleGenerator | None = None,
+        source_stats: SourceStats | None = None,
     ) -> None:
         """Initialize AppProcessor.
 
@@ -509,6 +747,8 @@ class AppProcessor:
             version_resolver: Optional version resolver.
             download_manager: Optional download manager.
             module_generator: Optional module generator.
+            source_stats: Optional source health records; when given, an
+                app's configured sources are tried healthiest first.
         """
         self.config = config
         self.java_runner = java_runner
@@ -517,6 +757,7 @@ class AppProcessor:
         self.version_resolver = version_resolver
         self.download_manager = download_manager
         self.module_generator = module_generator
+        self.source_stats = source_stats
 
     @property
     def parallel_jobs(self) -> int:
@@ -546,25 +787,35 @@ class AppProcessor:
                 end_time=datetime.now(UTC),
             )
 
-        with JobRunner(max_workers=self.parallel_jobs) as runner:
-            futures: dict[Future[BuildResult], str] = {}
+        settings = self.config.global_settings
+        configure_download_governor(
+            max_per_host=settings.download_max_per_host,
+            bandwidth_limit=settings.download_bandwidth_limit,
+        )
+
+        try:
+            for path in prefetch_prebuilts(self.config):
+                logger.warning("Prebuilt %s not prefetched; builds will retry", path.name)
+        except Exception as e:
+            logger.warning("Prebuilt prefetch failed: %s", e)
 
-            for app_config in enabled_apps:
-                arch = self._parse_architecture(app_config)
-                arch_list = self._get_architecture_list(arch)
+        build_times = BuildTimes()
+        variants = order_longest_first(self._schedule_variants(enabled_apps), build_times)
 
-                for arch_variant in arch_list:
-                    future = runner.submit(
-                        self._build_app_variant,
-                        app_config,
-                        arch_variant,
-                    )
-                    futures[future] = app_config.name
+        with JobRunner(max_workers=self.parallel_jobs) as runner:
+            futures: dict[Future[BuildResult], Variant[tuple[AppConfig, str]]] = {}
+
+            for variant in variants:
+                future = runner.submit(self._build_app_variant_job, *variant.payload)
+                futures[future] = variant
 
-            for future, app_name in futures.items():
+            for future, variant in futures.items():
+                app_name = variant.payload[0].name
                 try:
                     result = future.result()
                     all_results.append(result)
+                    if result.success and result.build_time:
+                        build_times.record(variant.key, result.build_time)
                 except Exception as e:
                     logger.error("Build failed with exception: %s", e)
                     all_results.append(
@@ -579,6 +830,11 @@ class AppProcessor:
                         )
                     )
 
+        try:
+            build_times.save()
+        except OSError as e:
+            logger.warning("Could not save build times: %s", e)
+
         summary = BuildSummary(
             total=len(all_results),
             succeeded=[r for r in all_results if r.success],
@@ -592,6 +848,26 @@ class AppProcessor:
 
         return summary
 
+    def _schedule_variants(self, apps: list[AppConfig]) -> list[Variant[tuple[AppConfig, str]]]:
+        """Expand apps into per-arch variants, with APK URLs for size probes.
+
+        Only the direct download path fetches the configured URL itself; the
+        download manager treats it as a listing page, which has no size to probe.
+        """
+        variants = []
+        for app_config in apps:
+            url = None
+            if self.download_manager is None:
+                url = self._get_download_url(app_config, self._determine_download_source(app_config)) or None
+            for arch in self._get_architecture_list(self._parse_architecture(app_config)):
+                variants.append(Variant(variant_key(app_config.name, arch), (app_config, arch), url))
+        return variants
+
+    def _build_app_variant_job(self, app_config: AppConfig, arch: str) -> BuildResult:
+        """Run `_build_app_variant` as its own job for download fair queuing."""
+        with download_job(variant_key(app_config.name, arch)):
+            return self._build_app_variant(app_config, arch)
+
     def _build_app_variant(
         self,
         app_config: AppConfig,
@@ -751,10 +1027,30 @@ class AppProcessor:
             Path to downloaded APK.
         """
         if self.download_manager:
+            from scripts.scrapers.download_manager import SourceCandidate
+
+            # Arch variants of one app download concurrently; each needs its own file.
+            stock_path = context.output_path.parent / f"stock-{context.app_name}-{context.version}-{context.arch}.apk"
+            mode = self.config.global_settings.download_mode
+            candidates = [
+                SourceCandidate(source, _derive_scraper_pkg_name(url, source))
+                for source, url in _configured_sources(context.options)
+            ]
+            if mode != "single" and len(candidates) > 1:
+                path, source = self.download_manager.download_any(
+                    candidates,
+                    context.version,
+                    stock_path,
+                    mode="race" if mode == "race" else "failover",
+                    arch=context.arch,
+                    expected_package=_expected_package(candidates),
+                )
+                logger.info("Downloaded %s %s from %s", context.app_name, context.version, source.value)
+                return path
             return self.download_manager.download(
                 context.scraper_pkg_name or context.app_id,
                 context.version,
-                context.output_path.parent / f"stock-{context.app_name}-{context.version}.apk",
+                stock_path,
                 context.source,
                 arch=context.arch,
             )
@@ -786,53 +1082,27 @@ class AppProcessor:
         Returns:
             Tuple of (cli_jar_path, patches_jars_paths).
         """
-        cache_dir = Path(os.environ.get("CACHE_DIR", ".cache"))
-        prebuilts_dir = cache_dir / "prebuilts"
-        prebuilts_dir.mkdir(parents=True, exist_ok=True)
-
-        cli_jar = prebuilts_dir / f"cli-{context.cli_version}.jar"
-        patches_jars: list[Path] = []
-
-        from scripts.utils.network import gh_dl
-
-        if not cli_jar.exists():
-            _asset_name, cli_url = _resolve_github_release_asset(context.cli_source, "jar")
-            success = gh_dl(cli_jar, cli_url)
-            if not success:
-                raise RuntimeError(f"Failed to download CLI from {context.cli_source}")
-
-        patches_sources = (
-            [context.patches_source] if isinstance(context.patches_source, str) else context.patches_source
+        specs = _prebuilt_specs(
+            context.cli_source,
+            context.cli_version,
+            context.patches_source,
+            context.patches_version,
+            context.app_id,
         )
+        specs[0].path.parent.mkdir(parents=True, exist_ok=True)
 
-        from scripts.scrapers.external_bundles import (
-            is_external_bundles_source,
-            parse_bundle_selector,
-            resolve_bundle,
-        )
-
-        for idx, patches_src in enumerate(patches_sources):
-            is_morphe = _is_morphe_patches_source(patches_src)
-            ext = "mpp" if is_morphe else "rvp"
-            patches_jar = prebuilts_dir / f"patches-{context.patches_version}-{idx}.{ext}"
-            patches_jars.append(patches_jar)
+        from scripts.utils.network import gh_dl
 
-            if patches_jar.exists():
+        for spec in specs:
+            if spec.path.exists():
                 continue
+            url = _resolve_prebuilt_url(spec)
+            if not gh_dl(spec.path, url):
+                if spec.kind == "cli":
+                    raise RuntimeError(f"Failed to download CLI from {spec.source}")
+                raise RuntimeError(f"Failed to download patches from {url}")
 
-            if is_external_bundles_source(patches_src):
-                selector = parse_bundle_selector(patches_src) or context.app_id
-                entry = resolve_bundle(selector, context.patches_version)
-                patches_url = entry.download_url
-            else:
-                fallback_ext = "rvp" if is_morphe else "mpp"
-                _asset_name, patches_url = _resolve_github_release_asset(patches_src, ext, fallback_ext)
-
-            success = gh_dl(patches_jar, patches_url)
-            if not success:
-                raise RuntimeError(f"Failed to download patches from {patches_url}")
-
-        return cli_jar, patches_jars
+        return specs[0].path, [spec.path for spec in specs[1:]]
 
     def _get_changelog(self, context: AppBuildContext) -> list[str]:
         """Get list of patches that will be applied.
@@ -1039,27 +1309,10 @@ class AppProcessor:
         Returns:
             DownloadSource enum value.
         """
-        options = app_config.options
-
-        # APKMirror first (preferred: most complete/official listings; its
-        # scraper's stale selectors against the live site were fixed --
-        # see _list_release_pages()/_get_download_url() in apkmirror.py).
-        # Archive.org is the fallback: a stable static directory listing,
-        # but a much smaller catalog than APKMirror's.
-        if options.get("apkmirror_dlurl"):
-            return DownloadSource.APKMIRROR
-        if options.get("archive_dlurl"):
-            return DownloadSource.ARCHIVE
-        if options.get("uptodown_dlurl"):
-            return DownloadSource.UPTODOWN
-        if options.get("apkpure_dlurl"):
-            return DownloadSource.APKPURE
-        if options.get("aptoide_dlurl"):
-            return DownloadSource.APTOIDE
-        if options.get("apkmonk_dlurl"):
-            return DownloadSource.APKMonk
-
-        return DownloadSource.APKMIRROR
+        configured = _configured_sources(app_config.options)
+        if self.source_stats is not None:
+            configured = self.source_stats.order(configured, lambda entry: entry[0])
+        return configured[0][0] if configured else DownloadSource.APKMIRROR
 
     def _get_download_url(self, app_config: AppConfig, source: DownloadSource) -> str:
         """Get download URL from app config.
@@ -1153,21 +1406,31 @@ def main(argv: list[str]) -> int:
     try:
         from scripts.builder.config import load_config
         from scripts.scrapers.download_manager import DownloadManager
+        from scripts.scrapers.source_stats import SourceStats
 
         config = load_config(*argv[1:])
 
         # DownloadManager also implements the VersionResolver protocol
         # (.resolve()) via the same underlying scrapers, so one instance
         # covers both roles.
-        download_manager = DownloadManager()
+        source_stats = SourceStats()
+        download_manager = DownloadManager(concurrency=config.global_settings.source_concurrency, stats=source_stats)
         processor = AppProcessor(
             config,
             JavaRunner(),
             version_resolver=download_manager,
             download_manager=download_manager,
+            source_stats=source_stats,
         )
 
-        summary = processor.process_all()
+        try:
+            summary = processor.process_all()
+        finally:
+            download_manager.close()
+            try:
+                source_stats.save()
+            except OSError as e:
+                logger.warning("Could not save source stats: %s", e)
 
         print(f"Built {summary.success_count}/{summary.total} apps")
         if summary.failed:
@@ -19,7 +19,7 @@ from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, get_args
 
 if sys.version_info < (3, 11):
     import tomllib
@@ -40,11 +40,18 @@ def _normalize_table_keys(table: dict[str, Any]) -> dict[str, Any]:
     return {k.replace("-", "_"): v for k, v in table.items()}
 
 
+DownloadMode = Literal["single", "failover", "race"]
+
+
 @dataclass
 class GlobalConfig:
     """Global configuration settings applied across all apps."""
 
     parallel_jobs: int = 0
+    download_max_per_host: int | None = None
+    source_concurrency: int = 2
+    download_mode: DownloadMode = "single"
+    download_bandwidth_limit: str | int | None = None
     build_mode: Literal["apk", "module", "both"] = "apk"
     cli_profile: str = "auto"
     patches_version: str = "latest"
@@ -74,9 +81,15 @@ class GlobalConfig:
 
         Returns:
             GlobalConfig instance with values from data dict.
+
+        Raises:
+            ValueError: If ``download_mode`` is not a `DownloadMode`.
         """
         valid_fields = {f.name for f in cls.__dataclass_fields__.values()}
         filtered = {k: v for k, v in data.items() if k in valid_fields}
+        download_mode = filtered.get("download_mode", "single")
+        if download_mode not in get_args(DownloadMode):
+            raise ValueError(f"download_mode must be one of {', '.join(get_args(DownloadMode))}, not {download_mode!r}")
         return cls(**filtered)
 
 
@@ -27,6 +27,7 @@ from scripts.builder.cli_profiles import (
 )
 from scripts.builder.config import AppConfig
 from scripts.utils.apk import APKSigner, align_apk, verify_signature
+from scripts.utils.artifacts import file_sha256
 from scripts.utils.java import JavaRunner
 
 logger = logging.getLogger(__name__)
@@ -89,8 +90,7 @@ class CacheManager:
 
 def _get_file_hash(file_path: Path) -> str | None:
     try:
-        with open(file_path, "rb") as f:
-            return hashlib.file_digest(f, "sha256").hexdigest()
+        return file_sha256(file_path)
     except OSError:
         return None
 
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Longest-processing-time-first ordering of build variants.
+
+`JobRunner` starts jobs in submission order, so submitting the most
+expensive variants first keeps a large stock APK (e.g. the YouTube bundle)
+from waiting behind small builds and stretching the total build time.
+
+A variant's cost is its recorded build time from earlier runs
+(``$CACHE_DIR/build-times.json``). Variants without history are estimated
+from the ``Content-Length`` of a HEAD request to the APK they download, when
+that URL is known before the build, or from the average of the known build
+times. Scraped sources only resolve the APK URL while building (their
+``*_dlurl`` options are listing pages), so they rely on history alone.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from scripts.utils.network import HttpClient, HttpClientConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Cost assumed for a variant with neither history nor a size probe.
+DEFAULT_BUILD_SECONDS = 120.0
+# Rough download-plus-patch throughput used to turn a size into seconds.
+SIZE_COST_BYTES_PER_SECOND = 1024 * 1024
+# Weight of the newest sample in the recorded build time (moving average).
+BUILD_TIME_SMOOTHING = 0.5
+# HEAD probes in flight while estimating costs.
+PROBE_CONCURRENCY = 8
+PROBE_TIMEOUT = 10.0
+
+
+def default_build_times_path() -> Path:
+    """Build time history location under CACHE_DIR."""
+    return Path(os.environ.get("CACHE_DIR", ".cache")) / "build-times.json"
+
+
+def variant_key(app_name: str, arch: str) -> str:
+    """Identifier of one app/arch build variant."""
+    return f"{app_name}-{arch}"
+
+
+class BuildTimes:
+    """Persistent moving average of build seconds per variant.
+
+    Attributes:
+        path: JSON file holding ``{variant_key: seconds}``.
+
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Load the history from ``path`` (missing or corrupt files are empty).
+
+        Args:
+            path: History file; defaults to `default_build_times_path`.
+
+        """
+        self.path = path or default_build_times_path()
+        self._times: dict[str, float] = {}
+        try:
+            data = json.loads(self.path.read_text())
+        except OSError, ValueError:
+            return
+        if isinstance(data, dict):
+            self._times = {k: float(v) for k, v in data.items() if isinstance(v, int | float) and v > 0}
+
+    def get(self, key: str) -> float | None:
+        """Recorded seconds for ``key``, if any."""
+        return self._times.get(key)
+
+    def average(self) -> float | None:
+        """Mean of all recorded build times, or None without history."""
+        return sum(self._times.values()) / len(self._times) if self._times else None
+
+    def record(self, key: str, seconds: float) -> None:
+        """Blend a new measurement into the history of ``key``."""
+        previous = self._times.get(key)
+        if previous is None:
+            self._times[key] = seconds
+        else:
+            self._times[key] = BUILD_TIME_SMOOTHING * seconds + (1 - BUILD_TIME_SMOOTHING) * previous
+
+    def save(self) -> None:
+        """Write the history atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self._times, indent=2, sort_keys=True))
+            tmp.replace(self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+            raise
+
+
+def probe_content_length(url: str, *, timeout: float = PROBE_TIMEOUT) -> int | None:
+    """Size of the file behind ``url`` from a HEAD request.
+
+    The request goes through the pooled `HttpClient`, so it holds a host
+    slot of the download governor and rate limits are retried per its
+    retry policy. HTML answers (listing pages rather than the file) and
+    failures give None.
+    """
+    client = HttpClient(HttpClientConfig(), pooled=True)
+    try:
+        response = client.head(url, timeout=timeout)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    finally:
+        client.close()
+    if "text/html" in response.headers.get("content-type", "").lower():
+        return None
+    try:
+        size = int(response.headers.get("content-length", ""))
+    except ValueError:
+        return None
+    return size if size > 0 else None
+
+
+@dataclass(frozen=True)
+class Variant[T]:
+    """A build variant awaiting scheduling.
+
+    Attributes:
+        key: `variant_key` of the variant.
+        payload: Caller data carried through the ordering.
+        url: URL of the APK itself, probed when there is no history;
+            None when it is only resolved during the build.
+
+    """
+
+    key: str
+    payload: T
+    url: str | None = None
+
+
+def estimate_costs(
+    variants: Sequence[Variant[Any]],
+    history: BuildTimes,
+    *,
+    probe: Callable[[str], int | None] = probe_content_length,
+) -> dict[str, float]:
+    """Estimated seconds per variant key.
+
+    History wins; otherwise a successful size probe; otherwise the average
+    recorded build time (or `DEFAULT_BUILD_SECONDS`).
+    """
+    costs: dict[str, float] = {}
+    to_probe: dict[str, str] = {}
+    for variant in variants:
+        recorded = history.get(variant.key)
+        if recorded is not None:
+            costs[variant.key] = recorded
+        elif variant.url:
+            to_probe[variant.key] = variant.url
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=min(PROBE_CONCURRENCY, len(to_probe))) as pool:
+            sizes = dict(zip(to_probe, pool.map(probe, to_probe.values()), strict=True))
+        for key, size in sizes.items():
+            if size is not None:
+                costs[key] = size / SIZE_COST_BYTES_PER_SECOND
+
+    fallback = history.average() or DEFAULT_BUILD_SECONDS
+    return {variant.key: costs.get(variant.key, fallback) for variant in variants}
+
+
+def order_longest_first[T](
+    variants: list[Variant[T]],
+    history: BuildTimes,
+    *,
+    probe: Callable[[str], int | None] = probe_content_length,
+) -> list[Variant[T]]:
+    """Sort ``variants`` by descending estimated cost (stable for ties)."""
+    costs = estimate_costs(variants, history, probe=probe)
+    ordered = sorted(variants, key=lambda v: costs[v.key], reverse=True)
+    logger.debug("Build order: %s", ", ".join(f"{v.key} (~{costs[v.key]:.0f}s)" for v in ordered))
+    return ordered
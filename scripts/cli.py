@@ -5,6 +5,7 @@ import argparse
 import re
 import signal
 import sys
+import time
 from pathlib import Path
 
 # Allow running as a direct script: `python scripts/cli.py`
@@ -18,6 +19,7 @@ from scripts.lib.args import (
     build_parser,
     cache_parser,
     check_parser,
+    sources_parser,
     version_tracker_parser,
 )
 from scripts.lib.cache import (
@@ -203,6 +205,38 @@ def run_cache(args: argparse.Namespace) -> int:
         log.abort(f"Cache command failed: {exc}")
 
 
+def run_sources(args: argparse.Namespace) -> int:
+    """Execute sources subcommands and return a process exit code."""
+    from scripts.scrapers.source_stats import SourceStats
+
+    subcommand = args.sources_command
+
+    if subcommand == "stats":
+        stats = SourceStats()
+        records = sorted(stats.snapshot().items(), key=lambda item: -item[1].score())
+        if not records:
+            log.info(f"No source stats recorded in {stats.path}")
+            return 0
+        log.pr("Source Health (best first):")
+        now = time.time()
+        for name, health in records:
+            latency = f"{health.latency:.1f}s" if health.latency is not None else "-"
+            throughput = f"{format_cache_size(int(health.throughput))}/s" if health.throughput is not None else "-"
+            log.pr(
+                f"  {name}: score {health.score():.2f}, success {health.success_rate:.0%}, "
+                f"lookup {latency}, download {throughput}, "
+                f"{health.attempts} attempts ({health.failures} failed)"
+            )
+            if health.last_failure is not None:
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(health.last_failure))
+                log.pr(f"    last failure {when}: {health.last_error}")
+            if health.cooling_down(now):
+                log.pr(f"    cooling down for {int(health.cooldown_until - now) // 60 + 1} more minutes")
+        return 0
+
+    log.abort(f"Unknown sources subcommand: {subcommand}")
+
+
 def main() -> int:
     """Main entry point."""
     signal.signal(signal.SIGINT, _signal_handler)
@@ -218,6 +252,7 @@ def main() -> int:
     check_parser(subparsers)
     version_tracker_parser(subparsers)
     cache_parser(subparsers)
+    sources_parser(subparsers)
 
     args = parser.parse_args()
 
@@ -230,6 +265,8 @@ def main() -> int:
             return run_version_tracker(args)
         if args.command == "cache":
             return run_cache(args)
+        if args.command == "sources":
+            return run_sources(args)
         parser.print_help()
         return 1
     except KeyboardInterrupt:
@@ -125,3 +125,14 @@ def cache_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]
         "--pattern",
         help="Regex pattern to match cache entries",
     )
+
+
+def sources_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
+    """Add 'sources' subcommand with sub-subcommands."""
+    parser = subparsers.add_parser(
+        "sources",
+        help="Inspect download source health",
+    )
+    sub = parser.add_subparsers(dest="sources_command", required=True)
+
+    sub.add_parser("stats", help="Show recorded source health, best first")
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
 import re
 import shutil
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 from selectolax.parser import HTMLParser, Node
 
@@ -17,8 +19,13 @@ from scripts.scrapers.base import (
     DownloadSource,
     ScraperBase,
     VersionInfo,
+    is_html_response,
+    version_sort_key,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
 type ArchType = Literal["universal", "noarch", "arm64-v8a", "armeabi-v7a", "arm64-v8a + armeabi-v7a"]
 type BundleType = Literal["APK", "BUNDLE"]
 
@@ -48,6 +55,7 @@ class RowData:
     bundle: str
     arch: str
     dpi: str
+    url: str | None = None
 
 
 _MIN_ROW_CELLS: int = 5
@@ -62,6 +70,15 @@ def get_target_archs(arch: ArchType) -> list[str]:
             return [arch, *base_archs]
 
 
+@functools.cache
+def _target_arch_set(arch: ArchType) -> frozenset[str]:
+    return frozenset(get_target_archs(arch))
+
+
+def _has_class(node: Node, name: str) -> bool:
+    return name in (node.attributes.get("class") or "").split()
+
+
 def _parse_row_data(row: Node) -> RowData | None:
     """Extract variant fields from a real variant table row.
 
@@ -71,24 +88,43 @@ def _parse_row_data(row: Node) -> RowData | None:
     text nodes in DOM order (the previous approach) interleaves these and
     breaks positional field mapping. Reading each field from its own cell
     (and the version from its link's own text, not the cell's) is exact.
+
+    The row and version cell are walked once over their direct children;
+    CSS queries are only the fallback for markup that nests them deeper.
     """
-    cells = row.css(".table-cell")
+    cells = [child for child in row.iter() if _has_class(child, "table-cell")]
+    if len(cells) < _MIN_ROW_CELLS:
+        cells = row.css(".table-cell")
     if len(cells) < _MIN_ROW_CELLS:
         return None
-    version_link = cells[0].css_first("a")
-    version = (version_link or cells[0]).text(strip=True)
-    bundle_badge = cells[0].css_first(".apkm-badge")
-    bundle = bundle_badge.text(strip=True) if bundle_badge else ""
+    version_cell = cells[0]
+    version_link: Node | None = None
+    bundle_badge: Node | None = None
+    for child in version_cell.iter():
+        if child.tag == "a":
+            version_link = version_link or child
+        elif bundle_badge is None and _has_class(child, "apkm-badge"):
+            bundle_badge = child
+    if version_link is not None:
+        # A link directly in the version cell is the row's first "div > a".
+        href = version_link.attrs.get("href")
+        url = f"https://www.apkmirror.com{href}" if href else None
+    else:
+        version_link = version_cell.css_first("a")
+        url = _extract_download_url(row)
+    if bundle_badge is None:
+        bundle_badge = version_cell.css_first(".apkm-badge")
     return RowData(
-        version=version,
+        version=(version_link or version_cell).text(strip=True),
         size="",
-        bundle=bundle,
+        bundle=bundle_badge.text(strip=True) if bundle_badge else "",
         arch=cells[1].text(strip=True),
         dpi=cells[3].text(strip=True),
+        url=url,
     )
 
 
-def _row_matches(row_data: RowData, config: SearchConfig, target_archs: list[str]) -> bool:
+def _row_matches(row_data: RowData, config: SearchConfig, target_archs: frozenset[str]) -> bool:
     if config.match_any:
         return True
     return row_data.bundle == config.apk_bundle and row_data.dpi == config.dpi and row_data.arch in target_archs
@@ -108,6 +144,31 @@ def _parse_rows(tree: HTMLParser) -> list[Node]:
     return tree.css("div.table-row.headerFont")
 
 
+def extract_variants(html_content: str) -> list[RowData]:
+    """Every variant row of a release page, from one parse and one walk of the table."""
+    variants: list[RowData] = []
+    for row in _parse_rows(HTMLParser(html_content)):
+        row_data = _parse_row_data(row)
+        if row_data is not None:
+            variants.append(row_data)
+    return variants
+
+
+def select_variant(variants: list[RowData], config: SearchConfig) -> str | None:
+    """URL of the first variant matching ``config``, if any."""
+    target_archs = _target_arch_set(config.arch)
+    for row_data in variants:
+        if config.exclude_alpha_beta and ("alpha" in row_data.version.lower() or "beta" in row_data.version.lower()):
+            continue
+        if _row_matches(row_data, config, target_archs) and row_data.url:
+            return row_data.url
+    return None
+
+
+# Release pages fetched at once while listing versions.
+RELEASE_FETCH_CONCURRENCY = 4
+
+
 class APKMirror(ScraperBase):
     BASE_URL = "https://www.apkmirror.com"
     APK_ARCH_PATH = BASE_URL + "/apk"
@@ -128,25 +189,7 @@ class APKMirror(ScraperBase):
         return f"{self.APK_ARCH_PATH}/{pkg_name}/"
 
     def _search_variant(self, html_content: str, config: SearchConfig) -> str | None:
-        tree = HTMLParser(html_content)
-        rows = _parse_rows(tree)
-        if not rows:
-            return None
-        target_archs = get_target_archs(config.arch)
-        for row in rows:
-            row_data = _parse_row_data(row)
-            if row_data is None:
-                continue
-            if config.exclude_alpha_beta and (
-                "alpha" in row_data.version.lower() or "beta" in row_data.version.lower()
-            ):
-                continue
-            if not _row_matches(row_data, config, target_archs):
-                continue
-            url = _extract_download_url(row)
-            if url:
-                return url
-        return None
+        return select_variant(extract_variants(html_content), config)
 
     def _find_download_link(self, variant_page_html: str) -> str | None:
         # Real class is "accent_bg btn btn-flat downloadButton sSo" -- the
@@ -180,7 +223,9 @@ class APKMirror(ScraperBase):
         return f"{self.BASE_URL}{href}"
 
     async def _get_download_url(self, variant_url: str) -> str | None:
-        response = await self.get(variant_url)
+        # The variant page's button carries a one-time ``?key=``, so neither the
+        # page nor the link parsed from it may be cached.
+        response = await self.get(variant_url, use_cache=False)
         confirm_url = self._find_download_link(response.text)
         if confirm_url is None:
             return None
@@ -199,8 +244,10 @@ class APKMirror(ScraperBase):
         rather than matching ``.appRow`` page-wide.
         """
         url = self._get_versions_page_url(pkg_name)
-        response = await self.get(url)
-        tree = HTMLParser(response.text)
+        return list(await self._get_parsed("releases", url, self._parse_release_pages))
+
+    def _parse_release_pages(self, html_content: str) -> list[tuple[str, str]]:
+        tree = HTMLParser(html_content)
         releases: list[tuple[str, str]] = []
         all_versions_widget = None
         for widget in tree.css(".listWidget"):
@@ -220,6 +267,15 @@ class APKMirror(ScraperBase):
             releases.append((link.text(strip=True), f"{self.BASE_URL}{href}"))
         return releases
 
+    async def _release_variant(self, release_url: str, config: SearchConfig) -> str | None:
+        """Variant URL matching ``config`` on a release page.
+
+        The page's variant rows are memoized once per release, so looking
+        it up again with another config does not parse it again.
+        """
+        variants = await self._get_parsed("variants", release_url, extract_variants, use_cache=False)
+        return select_variant(variants, config)
+
     async def get_versions(
         self,
         pkg_name: str,
@@ -228,7 +284,43 @@ class APKMirror(ScraperBase):
         bundle_type: BundleType = "APK",
         exclude_alpha_beta: bool = True,
         match_any: bool = False,
+        limit: int | None = None,
     ) -> list[VersionInfo]:
+        """List matching releases, highest version first.
+
+        With ``limit``, fetching stops as soon as that many of the highest
+        versions are confirmed to have a matching variant.
+        """
+        versions = self.iter_versions(
+            pkg_name,
+            arch=arch,
+            dpi=dpi,
+            bundle_type=bundle_type,
+            exclude_alpha_beta=exclude_alpha_beta,
+            match_any=match_any,
+        )
+        results: list[VersionInfo] = []
+        async with contextlib.aclosing(versions):
+            async for version in versions:
+                results.append(version)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    async def iter_versions(  # type: ignore[override]
+        self,
+        pkg_name: str,
+        arch: ArchType = "universal",
+        dpi: str = "nodpi",
+        bundle_type: BundleType = "APK",
+        exclude_alpha_beta: bool = True,
+        match_any: bool = False,
+    ) -> AsyncGenerator[VersionInfo]:
+        """Yield matching releases, highest version first.
+
+        Release pages are fetched RELEASE_FETCH_CONCURRENCY at a time;
+        closing the iterator cancels the fetches that have not finished.
+        """
         config = SearchConfig(
             apk_bundle=bundle_type,
             dpi=dpi,
@@ -236,33 +328,39 @@ class APKMirror(ScraperBase):
             exclude_alpha_beta=exclude_alpha_beta,
             match_any=match_any,
         )
-        releases = await self._list_release_pages(pkg_name)
-        results: list[VersionInfo] = []
-        for display_text, release_url in releases:
+        candidates: list[tuple[str, str]] = []
+        for display_text, release_url in await self._list_release_pages(pkg_name):
             if exclude_alpha_beta and ("alpha" in display_text.lower() or "beta" in display_text.lower()):
                 continue
             version_match = re.search(r"\d+(?:\.\d+)+", display_text)
-            if version_match is None:
-                continue
-            version = version_match.group()
-            try:
-                release_html = await self.get(release_url, False)
-            except RuntimeError:
-                # A single throttled/removed release page shouldn't abort
-                # enumerating the rest (e.g. a rate limit from fetching many
-                # release pages back-to-back).
-                continue
-            download_url = self._search_variant(release_html.text, config)
-            if download_url:
-                results.append(
-                    VersionInfo(
-                        version=version,
-                        url=download_url,
-                        arch=arch,
-                        dpi=dpi,
-                    )
-                )
-        return results
+            if version_match is not None:
+                candidates.append((version_match.group(), release_url))
+        candidates.sort(key=lambda c: version_sort_key(c[0]), reverse=True)
+
+        slots = asyncio.Semaphore(RELEASE_FETCH_CONCURRENCY)
+
+        async def match_release(release_url: str) -> str | None:
+            async with slots:
+                try:
+                    return await self._release_variant(release_url, config)
+                except RuntimeError:
+                    # A single throttled/removed release page shouldn't abort
+                    # enumerating the rest.
+                    return None
+
+        # Tasks wait on the semaphore in version order, so awaiting them in
+        # order confirms the highest matches first and cancelling the rest
+        # skips page loads that have not started yet.
+        tasks = [asyncio.create_task(match_release(url)) for _, url in candidates]
+        try:
+            for (version, _), task in zip(candidates, tasks, strict=True):
+                download_url = await task
+                if download_url:
+                    yield VersionInfo(version=version, url=download_url, arch=arch, dpi=dpi)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def _is_bundle(self, file_path: Path) -> bool:
         return file_path.suffix.lower() in (".apkm", ".xapk")
@@ -334,6 +432,7 @@ class APKMirror(ScraperBase):
                     dpi=dpi,
                     bundle_type=bundle_type,
                     exclude_alpha_beta=exclude_alpha_beta,
+                    limit=1,
                 )
                 if not versions:
                     return DownloadResult(success=False, error="No versions found")
@@ -351,8 +450,7 @@ class APKMirror(ScraperBase):
                     version_match = re.search(r"\d+(?:\.\d+)+", display_text)
                     if version_match is None or version_match.group() != version:
                         continue
-                    release_html = await self.get(release_url, False)
-                    download_url = self._search_variant(release_html.text, config)
+                    download_url = await self._release_variant(release_url, config)
                     break
                 if download_url is None:
                     return DownloadResult(
@@ -377,9 +475,10 @@ class APKMirror(ScraperBase):
             return DownloadResult(success=False, error=str(e))
 
     async def _download_file(self, url: str, output_path: Path) -> None:
-        response = await self.get(url, use_cache=False)
-        await asyncio.to_thread(output_path.parent.mkdir, parents=True, exist_ok=True)
-        await asyncio.to_thread(output_path.write_bytes, response.content)
+        response = await self._stream_to_file(url, output_path)
+        if is_html_response(response):
+            msg = "Received HTML instead of APK"
+            raise RuntimeError(msg)
 
     def close(self) -> None:
         super().close()
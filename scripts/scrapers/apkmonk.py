@@ -6,12 +6,8 @@ versions and downloading APKs from APKMonk.
 
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
-from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    import httpx
 from selectolax.parser import HTMLParser
 
 from scripts.scrapers.base import (
@@ -19,6 +15,7 @@ from scripts.scrapers.base import (
     DownloadSource,
     ScraperBase,
     VersionInfo,
+    is_html_response,
 )
 
 APKMONK_BASE = "https://www.apkmonk.com"
@@ -71,9 +68,7 @@ class APKMonkScraper(ScraperBase):
 
     async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
         url = self._build_url(pkg_name)
-        response = await self.get(url)
-        html = response.text
-        return self._parse_versions_page(html)
+        return list(await self._get_parsed("versions", url, self._parse_versions_page))
 
     async def download(
         self,
@@ -94,22 +89,16 @@ class APKMonkScraper(ScraperBase):
             if download_url is None:
                 return DownloadResult(success=False, error="Download link not found")
 
-            dl_response = await self._request_with_retry(download_url, "GET")
-            content_type = dl_response.headers.get("content-type", "")
-            if "text/html" in content_type.lower():
+            dl_response = await self._stream_to_file(download_url, output_path)
+            if is_html_response(dl_response):
                 download_url = self._parse_download_link(dl_response.text)
                 if download_url is None:
                     return DownloadResult(success=False, error="Download link not found")
-                dl_response = await self._request_with_retry(download_url, "GET")
-
-            await asyncio.to_thread(self._save_apk, dl_response, output_path)
+                dl_response = await self._stream_to_file(download_url, output_path)
+                if is_html_response(dl_response):
+                    return DownloadResult(success=False, error="Received HTML instead of APK")
 
             return DownloadResult(success=True, file_path=output_path, version=version)
 
         except Exception as e:
             return DownloadResult(success=False, error=str(e))
-
-    def _save_apk(self, response: httpx.Response, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("wb") as f:
-            f.writelines(response.iter_bytes(chunk_size=8192))
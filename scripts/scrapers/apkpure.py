@@ -2,12 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
-from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    import httpx
 from selectolax.parser import HTMLParser
 
 from scripts.scrapers.base import (
@@ -15,6 +11,7 @@ from scripts.scrapers.base import (
     DownloadSource,
     ScraperBase,
     VersionInfo,
+    is_html_response,
 )
 
 APKPURE_BASE = "https://apkpure.net"
@@ -66,9 +63,7 @@ class APKPureScraper(ScraperBase):
     async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
         name = str(kwargs.get("name", pkg_name))
         url = self._build_url(name, pkg_name, "versions")
-        response = await self.get(url)
-        html = response.text
-        return self._parse_versions_page(html)
+        return list(await self._get_parsed("versions", url, self._parse_versions_page))
 
     async def download(
         self,
@@ -90,23 +85,16 @@ class APKPureScraper(ScraperBase):
             if download_url is None:
                 return DownloadResult(success=False, error="Download link not found")
 
-            dl_response = await self._request_with_retry(download_url, "GET")
-            content_type = dl_response.headers.get("content-type", "")
-            if "text/html" in content_type.lower():
-                html = dl_response.text
-                download_url = self._parse_download_link(html)
+            dl_response = await self._stream_to_file(download_url, output_path)
+            if is_html_response(dl_response):
+                download_url = self._parse_download_link(dl_response.text)
                 if download_url is None:
                     return DownloadResult(success=False, error="Download link not found")
-                dl_response = await self._request_with_retry(download_url, "GET")
-
-            await asyncio.to_thread(self._save_apk, dl_response, output_path)
+                dl_response = await self._stream_to_file(download_url, output_path)
+                if is_html_response(dl_response):
+                    return DownloadResult(success=False, error="Received HTML instead of APK")
 
             return DownloadResult(success=True, file_path=output_path, version=version)
 
         except Exception as e:
             return DownloadResult(success=False, error=str(e))
-
-    def _save_apk(self, response: httpx.Response, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("wb") as f:
-            f.writelines(response.iter_bytes(chunk_size=8192))
@@ -1,22 +1,32 @@
-"""Aptoide scraper implementation."""
+"""Aptoide scraper implementation.
+
+Versions come from the paginated ``getVersions`` API, asking the server to
+filter by ABI. The decoded list is memoized per package and ABI, so
+`download` reuses the lookup; the published md5sum is checked while the
+APK streams to disk.
+"""
 
 from __future__ import annotations
 
-import asyncio
+import base64
+import json
+import urllib.parse
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
-
-if TYPE_CHECKING:
-    import httpx
+from typing import Any
 
 from scripts.scrapers.base import (
     DownloadResult,
     DownloadSource,
     ScraperBase,
     VersionInfo,
+    is_html_response,
 )
 
 APTOIDE_API = "https://ws75.aptoide.com/api/7"
+# Versions requested per getVersions page.
+VERSIONS_PAGE_LIMIT = 50
+# Pages read at most per package (newest versions come first).
+MAX_VERSION_PAGES = 10
 
 
 class AptoideScraper(ScraperBase):
@@ -25,8 +35,12 @@ class AptoideScraper(ScraperBase):
     def __init__(self) -> None:
         super().__init__(DownloadSource.APTOIDE)
 
-    def _build_versions_url(self, package: str) -> str:
-        return f"{APTOIDE_API}/app/{package}/getVersions"
+    def _build_versions_url(self, package: str, offset: int = 0, arch: str = "universal") -> str:
+        params = {"limit": str(VERSIONS_PAGE_LIMIT), "offset": str(offset)}
+        if arch and arch != "universal":
+            # The API's device filter: URL-safe base64 of "myCPU=<abi>".
+            params["q"] = base64.urlsafe_b64encode(f"myCPU={arch}".encode()).decode()
+        return f"{APTOIDE_API}/app/{package}/getVersions?{urllib.parse.urlencode(params)}"
 
     def _parse_version_info(self, data: dict[str, Any]) -> list[VersionInfo]:
         versions: list[VersionInfo] = []
@@ -38,7 +52,30 @@ class AptoideScraper(ScraperBase):
             apk_files = item.get("file", {})
             path = apk_files.get("path")
             arch = item.get("architecture")
-            versions.append(VersionInfo(version=version, url=path, arch=arch))
+            md5sum = apk_files.get("md5sum")
+            filesize = apk_files.get("filesize")
+            versions.append(
+                VersionInfo(
+                    version=version,
+                    url=path,
+                    arch=arch,
+                    size=filesize if isinstance(filesize, int) else None,
+                    hashes={"md5": md5sum} if isinstance(md5sum, str) and md5sum else {},
+                )
+            )
+        return versions
+
+    async def _fetch_versions(self, pkg_name: str, arch: str) -> list[VersionInfo]:
+        """All pages of ``getVersions`` for ``pkg_name``, stopping at the first short page."""
+        versions: list[VersionInfo] = []
+        for page in range(MAX_VERSION_PAGES):
+            response = await self.get(self._build_versions_url(pkg_name, page * VERSIONS_PAGE_LIMIT, arch))
+            data = json.loads(response.text)
+            page_versions = self._parse_version_info(data)
+            versions.extend(page_versions)
+            total = data.get("data", {}).get("total")
+            if len(page_versions) < VERSIONS_PAGE_LIMIT or (isinstance(total, int) and len(versions) >= total):
+                break
         return versions
 
     def _filter_by_architecture(self, versions: list[VersionInfo], arch: str) -> list[VersionInfo]:
@@ -47,12 +84,12 @@ class AptoideScraper(ScraperBase):
         return [v for v in versions if v.arch == arch or v.arch == "universal"]
 
     async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
-        url = self._build_versions_url(pkg_name)
-        response = await self.get(url)
-        data = response.json()
-        versions = self._parse_version_info(data)
         arch = str(kwargs.get("arch", "universal"))
+        versions = list(
+            await self._cached_result("versions", (pkg_name, arch), lambda: self._fetch_versions(pkg_name, arch))
+        )
         if arch and arch != "universal":
+            # The server filter is best-effort; entries of another ABI are still dropped here.
             versions = self._filter_by_architecture(versions, arch)
         return versions
 
@@ -81,16 +118,11 @@ class AptoideScraper(ScraperBase):
             return DownloadResult(success=False, error="Download URL not available")
 
         try:
-            dl_response = await self._request_with_retry(target_version.url, "GET")
-            content_type = dl_response.headers.get("content-type", "")
-            if "text/html" in content_type.lower():
+            dl_response = await self._stream_to_file(
+                target_version.url, output_path, expected_hashes=target_version.hashes
+            )
+            if is_html_response(dl_response):
                 return DownloadResult(success=False, error="Received HTML instead of APK")
-            await asyncio.to_thread(self._save_apk, dl_response, output_path)
             return DownloadResult(success=True, file_path=output_path, version=version)
         except Exception as e:
             return DownloadResult(success=False, error=str(e))
-
-    def _save_apk(self, response: httpx.Response, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("wb") as f:
-            f.writelines(response.iter_bytes(chunk_size=8192))
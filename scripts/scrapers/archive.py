@@ -1,21 +1,52 @@
-"""Archive.org scraper for j-hc-apks collection."""
+"""Archive.org scraper for j-hc-apks collection.
+
+Versions come from the item's metadata API, one JSON file list for the
+whole collection that also carries each file's size and hashes. It is
+parsed once into a per-package index and memoized, and downloads are
+verified against the published hash as they are written.
+
+The API has no per-package view, so that list grows with the collection
+while only one package's entries are needed, and past the page cache's
+``MAX_PAGE_BYTES`` it would be fetched again by every process. The file
+count (a tiny, cached answer) is checked first: above `MAX_METADATA_FILES`
+the package's own HTML directory listing is used instead, trading the
+published hashes for a small per-package page. The listing is also the
+fallback when the metadata cannot be loaded.
+"""
 
 from __future__ import annotations
 
-import asyncio
+import json
 import re
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from selectolax.parser import HTMLParser
 
-from .base import APK_ARCHIVE_URL, DownloadResult, DownloadSource, ScraperBase, VersionInfo
+from .base import (
+    APK_ARCHIVE_URL,
+    DownloadResult,
+    DownloadSource,
+    ScraperBase,
+    VersionInfo,
+    is_html_response,
+    version_sort_key,
+)
+from .page_cache import MAX_PAGE_BYTES
 
 if TYPE_CHECKING:
     from re import Match
 
 ARCHIVE_COLLECTION = "jhc-apks"
 ARCHIVE_BASE_URL = f"{APK_ARCHIVE_URL}/download/{ARCHIVE_COLLECTION}/apks"
+ARCHIVE_FILES_URL = f"{APK_ARCHIVE_URL}/metadata/{ARCHIVE_COLLECTION}/files"
+ARCHIVE_FILES_COUNT_URL = f"{APK_ARCHIVE_URL}/metadata/{ARCHIVE_COLLECTION}/files_count"
+# Rough size of one entry (name, size, mtime, hashes) in the metadata file list.
+METADATA_BYTES_PER_FILE = 400
+# Largest collection whose file list still fits the page cache.
+MAX_METADATA_FILES = MAX_PAGE_BYTES // METADATA_BYTES_PER_FILE
+# Published hashes in order of preference; only the first one present is checked.
+VERIFY_HASHES = ("sha1", "md5")
 
 
 class ArchiveScraper(ScraperBase):
@@ -30,9 +61,70 @@ class ArchiveScraper(ScraperBase):
         super().__init__(DownloadSource.ARCHIVE)
 
     async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
+        try:
+            files = await self._get_parsed("files-count", ARCHIVE_FILES_COUNT_URL, self._parse_files_count)
+            if files <= MAX_METADATA_FILES:
+                index = await self._get_parsed("file-index", ARCHIVE_FILES_URL, self._parse_file_index)
+                return list(index.get(pkg_name, ()))
+        except RuntimeError, ValueError:
+            pass
         url = f"{ARCHIVE_BASE_URL}/{pkg_name}"
-        response = await self.get(url)
-        parser = HTMLParser(response.text)
+        return list(await self._get_parsed("versions", url, lambda html: self._parse_listing(pkg_name, html)))
+
+    def _parse_files_count(self, text: str) -> int:
+        """Number of files in the collection from the metadata API.
+
+        Raises:
+            ValueError: If the answer is not a file count.
+
+        """
+        data = json.loads(text)
+        if isinstance(data, dict) and isinstance(count := data.get("result"), int):
+            return count
+        msg = "Unexpected Archive.org files_count answer"
+        raise ValueError(msg)
+
+    def _parse_file_index(self, text: str) -> dict[str, list[VersionInfo]]:
+        """Group the metadata file list into newest-first versions per package.
+
+        Raises:
+            ValueError: If the answer is not a metadata file list.
+
+        """
+        data = json.loads(text)
+        files = data["result"] if isinstance(data, dict) and isinstance(data.get("result"), list) else None
+        if files is None:
+            msg = "Unexpected Archive.org metadata answer"
+            raise ValueError(msg)
+        index: dict[str, list[VersionInfo]] = {}
+        seen: set[tuple[str, str, str | None]] = set()
+        for entry in files:
+            if not isinstance(entry, dict):
+                continue
+            directory, _, path = str(entry.get("name", "")).partition("/")
+            pkg_name, _, filename = path.partition("/")
+            if directory != "apks" or not pkg_name or "/" in filename or not filename.endswith(".apk"):
+                continue
+            parsed = self._parse_filename(filename)
+            if parsed is None or (pkg_name, parsed.version, parsed.arch) in seen:
+                continue
+            seen.add((pkg_name, parsed.version, parsed.arch))
+            size = str(entry.get("size", ""))
+            index.setdefault(pkg_name, []).append(
+                VersionInfo(
+                    version=parsed.version,
+                    url=f"{ARCHIVE_BASE_URL}/{pkg_name}/{filename}",
+                    arch=parsed.arch,
+                    size=int(size) if size.isdigit() else None,
+                    hashes={name: entry[name] for name in VERIFY_HASHES if isinstance(entry.get(name), str)},
+                )
+            )
+        for versions in index.values():
+            versions.sort(key=lambda v: version_sort_key(v.version), reverse=True)
+        return index
+
+    def _parse_listing(self, pkg_name: str, html: str) -> list[VersionInfo]:
+        parser = HTMLParser(html)
         versions: list[VersionInfo] = []
         seen: set[str] = set()
         for link in parser.css("a"):
@@ -83,15 +175,22 @@ class ArchiveScraper(ScraperBase):
         versions = await self.get_versions(pkg_name, **kwargs)
         for v in versions:
             if v.version == version and (arch is None or v.arch == arch) and v.url is not None:
-                return await self._download_file(v.url, output_path, v.version)
+                return await self._download_file(v.url, output_path, v.version, v.hashes)
         return DownloadResult(success=False, error=f"Version {version} not found for package {pkg_name}")
 
-    async def _download_file(self, url: str, output_path: Path, version: str) -> DownloadResult:
+    async def _download_file(
+        self,
+        url: str,
+        output_path: Path,
+        version: str,
+        hashes: dict[str, str] | None = None,
+    ) -> DownloadResult:
+        published = hashes or {}
+        expected = next(({name: published[name]} for name in VERIFY_HASHES if name in published), None)
         try:
-            response = await self.session.get(url, follow_redirects=True)
-            response.raise_for_status()
-            await asyncio.to_thread(output_path.parent.mkdir, parents=True, exist_ok=True)
-            await asyncio.to_thread(output_path.write_bytes, response.content)
+            response = await self._stream_to_file(url, output_path, follow_redirects=True, expected_hashes=expected)
+            if is_html_response(response):
+                return DownloadResult(success=False, error="Received HTML instead of APK")
             return DownloadResult(success=True, file_path=output_path, version=version)
         except Exception as e:
             return DownloadResult(success=False, error=str(e))
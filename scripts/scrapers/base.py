@@ -1,14 +1,27 @@
 """Base scraper class and common types for all APK download sources."""
 
 import asyncio
+import contextlib
+import hashlib
+import os
+import re
+import tempfile
+import threading
 from abc import ABC
-from dataclasses import dataclass
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable, Mapping
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
 import httpx
 
+from scripts.scrapers.page_cache import page_cache
+from scripts.scrapers.result_cache import result_cache
+from scripts.utils.cookies import cookie_store
+from scripts.utils.network import DOWNLOAD_CHUNK_SIZE, download_governor
+from scripts.utils.retry import RetryPolicy
+
 APK_ARCHIVE_URL = "https://archive.org"
 
 
@@ -27,6 +40,10 @@ class VersionInfo:
     url: str | None = None
     arch: str | None = None
     dpi: str | None = None
+    # Published file size and hex digests (keyed by hashlib algorithm name),
+    # for sources that list them.
+    size: int | None = None
+    hashes: dict[str, str] = field(default_factory=dict)
 
 
 @dataclass
@@ -37,15 +54,71 @@ class DownloadResult:
     error: str | None = None
 
 
+def version_sort_key(version: str) -> tuple[int, ...]:
+    """Sort key for dotted version strings, e.g. ``19.09.36`` > ``9.9.9``.
+
+    ponytail: numeric-only comparison, ignores suffixes like "-beta3" beyond
+    their leading digits. Good enough for picking the newest stable release;
+    revisit with proper semver parsing if pre-release ordering matters.
+    """
+    parts = re.findall(r"\d+", version)
+    return tuple(int(p) for p in parts) if parts else (0,)
+
+
+async def first_version(versions: AsyncGenerator[VersionInfo]) -> VersionInfo | None:
+    """First item of a version iterator (the newest), closing it afterwards."""
+    async with contextlib.aclosing(versions):
+        async for version in versions:
+            return version
+    return None
+
+
+def is_html_response(response: httpx.Response) -> bool:
+    """Whether a response is an HTML page (e.g. an interstitial) rather than a file."""
+    return "text/html" in response.headers.get("content-type", "").lower()
+
+
+def _partial_file(output_path: Path) -> Path:
+    """Create a uniquely named temporary file beside ``output_path``."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix=f".{output_path.name}.", suffix=".part", dir=output_path.parent)
+    os.close(fd)
+    return Path(name)
+
+
+class _HostPacer:
+    """Process-wide minimum spacing between request starts to one host."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_start: dict[str, float] = {}
+
+    def reserve(self, host: str, interval: float) -> float:
+        """Book the next start slot for ``host``; return seconds to wait for it."""
+        with self._lock:
+            now = _time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + interval
+            return start - now
+
+
+_HOST_PACER = _HostPacer()
+
+
 class ScraperBase(ABC):
     MAX_RETRIES = 4
     BASE_DELAY = 1.0
+    RETRY_DEADLINE = 120.0
+    # Seconds a cached page (see `scripts.scrapers.page_cache`) is served
+    # without revalidation; scrapers override it per source.
     CACHE_TTL = 3600
+    # Minimum seconds between request starts to one host, across all
+    # scrapers and concurrent calls, so parallel scraping stays polite.
+    MIN_REQUEST_INTERVAL = 0.5
 
     def __init__(self, source: DownloadSource) -> None:
         self.source = source
         self._session: httpx.AsyncClient | None = None
-        self._cache: dict[str, tuple[float, object]] = {}
 
     @property
     def session(self) -> httpx.AsyncClient:
@@ -56,19 +129,25 @@ class ScraperBase(ABC):
                 headers={
                     "User-Agent": "Mozilla/5.0 (compatible; APKScraper/1.0)",
                 },
+                cookies=cookie_store().jar,
             )
         return self._session
 
-    def _get_cache(self, key: str) -> object | None:
-        if key in self._cache:
-            timestamp, value = self._cache[key]
-            if timestamp + self.CACHE_TTL > _time.time():
-                return value
-            del self._cache[key]
-        return None
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return RetryPolicy(
+            max_retries=self.MAX_RETRIES - 1,
+            initial_delay=self.BASE_DELAY,
+            deadline=self.RETRY_DEADLINE,
+        )
 
-    def _set_cache(self, key: str, value: object) -> None:
-        self._cache[key] = (_time.time(), value)
+    async def _pace(self, url: str) -> None:
+        """Wait for this host's next request slot (see MIN_REQUEST_INTERVAL)."""
+        if self.MIN_REQUEST_INTERVAL <= 0:
+            return
+        delay = _HOST_PACER.reserve(httpx.URL(url).host, self.MIN_REQUEST_INTERVAL)
+        if delay > 0:
+            await asyncio.sleep(delay)
 
     async def _request_with_retry(
         self,
@@ -76,38 +155,164 @@ class ScraperBase(ABC):
         method: str = "GET",
         **kwargs: Any,
     ) -> httpx.Response:
-        delay = self.BASE_DELAY
-        last_error: Exception | None = None
+        async def attempt() -> httpx.Response:
+            await self._pace(url)
+            response = await self.session.request(method, url, **kwargs)
+            # A 304 answers a conditional request from `get`; it is not an error.
+            if response.status_code != httpx.codes.NOT_MODIFIED:
+                response.raise_for_status()
+            return response
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = await self.session.request(method, url, **kwargs)
+        try:
+            return await self.retry_policy.acall(attempt)
+        except httpx.HTTPError as e:
+            msg = f"Request failed: {url}"
+            raise RuntimeError(msg) from e
+
+    async def _stream_to_file(
+        self,
+        url: str,
+        output_path: Path,
+        method: str = "GET",
+        *,
+        expected_hashes: Mapping[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Stream a download to ``output_path`` under the shared download governor.
+
+        The body is written to a temporary file next to ``output_path`` and
+        moved into place once complete and verified, so concurrent or failed
+        downloads never leave a mixed or partial file at ``output_path``.
+        HTML answers (an interstitial page instead of the file) are not
+        written; their body is loaded so the caller can inspect ``.text``.
+
+        Args:
+            url: File to download.
+            output_path: Where to write it.
+            method: HTTP method.
+            expected_hashes: Published hex digests keyed by hashlib
+                algorithm name. They are computed from the chunks as they
+                are written, so verifying costs no second read of the file.
+            **kwargs: Passed to the request.
+
+        Returns:
+            The closed response.
+
+        Raises:
+            RuntimeError: If the request keeps failing, or the download
+                does not match ``expected_hashes`` (it is discarded then).
+        """
+        governor = download_governor()
+        expected = {name: value.lower() for name, value in (expected_hashes or {}).items()}
+        digests: dict[str, Any] = {}
+        partial: Path | None = None
+
+        async def attempt() -> httpx.Response:
+            nonlocal partial
+            await self._pace(url)
+            async with governor.aslot(url), self.session.stream(method, url, **kwargs) as response:
                 response.raise_for_status()
-                return response
-            except (httpx.HTTPError, httpx.TimeoutException) as e:
-                last_error = e
-                if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(delay)
-                    delay *= 2
+                if is_html_response(response):
+                    await response.aread()
+                    return response
+                if partial is None:
+                    partial = await asyncio.to_thread(_partial_file, output_path)
+                # Fresh digests per attempt: a retry rewrites the file from the start.
+                digests.clear()
+                digests.update({name: hashlib.new(name) for name in expected})
+                f = await asyncio.to_thread(partial.open, "wb")
+                with f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await governor.athrottle(len(chunk))
+                        f.write(chunk)
+                        for digest in digests.values():
+                            digest.update(chunk)
+            return response
+
+        try:
+            try:
+                response = await self.retry_policy.acall(attempt)
+            except httpx.HTTPError as e:
+                msg = f"Request failed: {url}"
+                raise RuntimeError(msg) from e
 
-        msg = f"Request failed after {self.MAX_RETRIES} retries: {url}"
-        raise RuntimeError(msg) from last_error
+            for name, digest in digests.items():
+                if digest.hexdigest() != expected[name]:
+                    msg = f"{name} mismatch for {url}: got {digest.hexdigest()}, expected {expected[name]}"
+                    raise RuntimeError(msg)
+            if partial is not None:
+                await asyncio.to_thread(os.replace, partial, output_path)
+        finally:
+            if partial is not None:
+                await asyncio.to_thread(partial.unlink, missing_ok=True)
+        return response
 
     async def get(self, url: str, use_cache: bool = True) -> httpx.Response:
-        cache_key = f"get:{url}"
-        if use_cache:
-            cached = self._get_cache(cache_key)
-            if cached is not None:
-                return cached  # type: ignore  # noqa: PGH003
-
-        response = await self._request_with_retry(url)
-        if use_cache:
-            self._set_cache(cache_key, response)
+        """GET ``url`` through the persistent page cache.
+
+        Pages younger than ``CACHE_TTL`` are served from disk; older ones
+        are revalidated and a 304 answers from the cache. ``use_cache=False``
+        always fetches and stores nothing (e.g. one-time download links).
+        """
+        if not use_cache:
+            return await self._request_with_retry(url)
+
+        cache = page_cache()
+        cached = await asyncio.to_thread(cache.get, url)
+        if cached is not None and cached.is_fresh(self.CACHE_TTL):
+            return cached.to_response()
+
+        headers = cached.conditional_headers() if cached is not None else {}
+        response = await self._request_with_retry(url, headers=headers)
+        if cached is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            await asyncio.to_thread(cache.refresh, url, response)
+            return cached.to_response()
+        await asyncio.to_thread(cache.put, url, response)
         return response
 
+    async def _cached_result[T](self, kind: Hashable, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """Memoize a parsed result of this source for ``CACHE_TTL`` (see `result_cache`)."""
+        return await result_cache().memoize((self.source, kind, key), self.CACHE_TTL, compute)
+
+    async def _get_parsed[T](
+        self,
+        kind: Hashable,
+        url: str,
+        parse: Callable[[str], T],
+        *,
+        use_cache: bool = True,
+    ) -> T:
+        """GET ``url`` and parse its text, memoizing the parsed result.
+
+        Args:
+            kind: What ``parse`` extracts, plus any query it depends on; two
+                calls share a result only if ``kind`` and ``url`` are equal.
+            url: Page to fetch.
+            parse: Turns the page text into the result.
+            use_cache: Passed to `get`; the parsed result is memoized either way.
+
+        """
+
+        async def fetch() -> T:
+            response = await self.get(url, use_cache=use_cache)
+            return parse(response.text)
+
+        return await self._cached_result(kind, url, fetch)
+
     async def get_versions(self, pkg_name: str) -> list[VersionInfo]:
         raise NotImplementedError
 
+    async def iter_versions(self, pkg_name: str, **kwargs: Any) -> AsyncGenerator[VersionInfo]:
+        """Yield versions newest-first, fetching only as far as the consumer reads.
+
+        The default sorts the full `get_versions` list; scrapers with
+        paginated listings override it to fetch pages on demand. Close the
+        iterator (``contextlib.aclosing``) when stopping early.
+        """
+        versions = await self.get_versions(pkg_name, **kwargs)
+        for version in sorted(versions, key=lambda v: version_sort_key(v.version), reverse=True):
+            yield version
+
     async def download(
         self,
         pkg_name: str,
@@ -116,6 +321,14 @@ class ScraperBase(ABC):
     ) -> DownloadResult:
         raise NotImplementedError
 
+    async def aclose(self) -> None:
+        """Close the session on the event loop that owns it."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.aclose()
+            with contextlib.suppress(OSError):
+                await asyncio.to_thread(cookie_store().save)
+
     def close(self) -> None:
         if self._session is not None:
             try:
@@ -125,6 +338,8 @@ class ScraperBase(ABC):
             except RuntimeError:
                 pass
             self._session = None
+            with contextlib.suppress(OSError):
+                cookie_store().save()
 
     def __del__(self) -> None:
         self.close()
@@ -3,65 +3,195 @@
 from __future__ import annotations
 
 import asyncio
-import re
+import contextlib
+import contextvars
+import logging
 import threading
+import time
 from dataclasses import dataclass
-from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
 
 from scripts.scrapers.apkmirror import APKMirror
 from scripts.scrapers.apkmonk import APKMonkScraper
 from scripts.scrapers.apkpure import APKPureScraper
 from scripts.scrapers.aptoide import AptoideScraper
 from scripts.scrapers.archive import ArchiveScraper
-from scripts.scrapers.base import DownloadSource, ScraperBase
+from scripts.scrapers.base import (
+    DownloadResult,
+    DownloadSource,
+    ScraperBase,
+    VersionInfo,
+    first_version,
+    version_sort_key,
+)
 from scripts.scrapers.uptodown import UptodownScraper
+from scripts.utils.apk import read_apk_identity
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Coroutine, Mapping, Sequence
+    from pathlib import Path
+
+    from scripts.scrapers.source_stats import SourceStats
+
+logger = logging.getLogger(__name__)
+
+# Default resolve()/download() calls in flight per source.
+DEFAULT_SOURCE_CONCURRENCY = 2
+
+# How download_any() uses several configured sources: "failover" tries them
+# in order; "race" checks the version on all of them at once and downloads
+# from the first that confirms it, falling back to the next confirmations.
+type MultiSourceMode = Literal["failover", "race"]
+# download_any() result: (path, winning source, per-source errors).
+type _Outcome = tuple[Path | None, DownloadSource | None, list[tuple[DownloadSource, str]]]
 
 ARCH_NORMALIZATION: dict[str, str] = {
     "arm-v7a": "armeabi-v7a",
 }
 
 
-def _reset_scraper_session(scraper: ScraperBase) -> None:
-    """Drop a scraper's cached httpx.AsyncClient before a new asyncio.run() call.
-
-    ScraperBase.session lazily creates and caches an AsyncClient bound to
-    whatever event loop is running at creation time. DownloadManager makes
-    one asyncio.run() call per resolve()/download() invocation -- each call
-    gets its own fresh event loop -- so a session cached from a prior call
-    breaks with "Event loop is closed". Resetting forces a fresh client bound
-    to the loop that's about to run.
-    """
-    scraper._session = None  # noqa: SLF001
-
+@dataclass(frozen=True, slots=True)
+class SourceCandidate:
+    """A source to try in `DownloadManager.download_any`.
 
-def _version_sort_key(version: str) -> tuple[int, ...]:
-    """Sort key for dotted version strings, e.g. ``19.09.36`` > ``9.9.9``.
+    Attributes:
+        source: Download source.
+        app_id: Package identifier as expected by that source's scraper.
 
-    ponytail: numeric-only comparison, ignores suffixes like "-beta3" beyond
-    their leading digits. Good enough for picking the newest stable release;
-    revisit with proper semver parsing if pre-release ordering matters.
     """
-    parts = re.findall(r"\d+", version)
-    return tuple(int(p) for p in parts) if parts else (0,)
+
+    source: DownloadSource
+    app_id: str
 
 
 @dataclass
 class DownloadManager:
     """Coordinates APK downloads across multiple sources with failover."""
 
-    def __init__(self) -> None:
-        """Initialize DownloadManager."""
+    def __init__(
+        self,
+        concurrency: int | Mapping[DownloadSource, int] = DEFAULT_SOURCE_CONCURRENCY,
+        stats: SourceStats | None = None,
+    ) -> None:
+        """Initialize DownloadManager.
+
+        Args:
+            concurrency: Calls allowed in flight per source, as one number
+                for every source or a per-source mapping (missing sources
+                use DEFAULT_SOURCE_CONCURRENCY).
+            stats: Health records to update with every lookup and download,
+                and to order `download_any` candidates by.
+
+        """
+        self._concurrency = concurrency
+        self.stats = stats
         self._scrapers: dict[DownloadSource, ScraperBase] = {}
-        # resolve()/download() are called concurrently across
-        # ThreadPoolExecutor worker threads (one per app/arch build
-        # variant), but each call's asyncio.run() creates a fresh event
-        # loop while reusing the same cached scraper (and its
-        # httpx.AsyncClient / internal locks). Serializing calls here is
-        # simpler and more correct than making the scrapers themselves
-        # thread-safe, and avoids self-inflicted rate limiting from
-        # hammering a source concurrently.
+        # resolve()/download() are called from ThreadPoolExecutor worker
+        # threads (one per app/arch build variant). All scraping runs on one
+        # long-lived event loop in a dedicated thread that owns the scrapers
+        # and their httpx.AsyncClient sessions, so connections are reused
+        # across calls and different sources are scraped concurrently.
+        # Calls to the *same* source are capped by a per-source semaphore,
+        # and ScraperBase paces requests per host, to avoid self-inflicted
+        # rate limiting.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._source_slots: dict[DownloadSource, asyncio.Semaphore] = {}
         self._lock = threading.Lock()
 
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the scraping event loop thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="download-manager-loop",
+                    daemon=True,
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _run[T](self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the scraping loop and wait for its result.
+
+        The coroutine runs in a copy of the caller's context, so context
+        variables such as the download governor's job label carry over.
+        """
+        loop = self._ensure_loop()
+        context = contextvars.copy_context()
+
+        async def in_caller_context() -> T:
+            return await loop.create_task(coro, context=context)
+
+        return asyncio.run_coroutine_threadsafe(in_caller_context(), loop).result()
+
+    @contextlib.asynccontextmanager
+    async def _scraper(self, source: DownloadSource) -> AsyncIterator[ScraperBase]:
+        """Borrow the scraper for ``source`` within its concurrency limit. Runs on the loop."""
+        slots = self._source_slots.get(source)
+        if slots is None:
+            slots = self._source_slots[source] = asyncio.Semaphore(self.source_concurrency(source))
+        async with slots:
+            yield self._get_scraper(source)
+
+    def source_concurrency(self, source: DownloadSource) -> int:
+        """Calls allowed in flight for ``source``."""
+        if isinstance(self._concurrency, int):
+            return max(1, self._concurrency)
+        return max(1, self._concurrency.get(source, DEFAULT_SOURCE_CONCURRENCY))
+
+    async def _latest_version(self, app_id: str, source: DownloadSource) -> VersionInfo | None:
+        async with self._scraper(source) as scraper:
+            # resolve() only needs *a* version number, not a specific
+            # installable variant -- not every app ships a plain
+            # "universal"/"nodpi"/"APK" build (e.g. APKMirror's YouTube Music
+            # releases are BUNDLE-only, split per-arch, with dpi *ranges*
+            # instead of "nodpi"). match_any skips APKMirror's bundle/dpi/arch
+            # equality checks, accepting whatever variant a release has. It's
+            # an APKMirror-only kwarg; other scrapers ignore unknown kwargs
+            # via **kwargs. iter_versions yields newest-first, so only the
+            # pages needed to confirm the newest release are fetched.
+            kwargs: dict[str, bool] = {"match_any": True}
+            started = time.monotonic()
+            try:
+                latest = await first_version(scraper.iter_versions(app_id, **kwargs))
+            except Exception as e:
+                self._record_failure(source, str(e))
+                raise
+            if latest is None:
+                self._record_failure(source, f"no versions found for {app_id}")
+            elif self.stats is not None:
+                self.stats.record_success(source, latency=time.monotonic() - started)
+            return latest
+
+    async def _download(
+        self,
+        app_id: str,
+        version: str,
+        output_path: Path,
+        source: DownloadSource,
+        kwargs: dict[str, str],
+    ) -> DownloadResult:
+        async with self._scraper(source) as scraper:
+            started = time.monotonic()
+            try:
+                result = await scraper.download(app_id, version, output_path, **kwargs)
+            except Exception as e:
+                self._record_failure(source, str(e))
+                raise
+        if not result.success or result.file_path is None:
+            self._record_failure(source, result.error or "download failed")
+        elif self.stats is not None:
+            size = await asyncio.to_thread(_file_size, result.file_path)
+            self.stats.record_success(source, size=size, seconds=time.monotonic() - started)
+        return result
+
+    def _record_failure(self, source: DownloadSource, error: str) -> None:
+        if self.stats is not None:
+            self.stats.record_failure(source, error)
+
     def _get_scraper(self, source: DownloadSource) -> ScraperBase:
         """Get or create scraper instance for source.
 
@@ -112,23 +242,10 @@ class DownloadManager:
             string; callers that need a real versionCode must look elsewhere.
         """
         del timeout
-        with self._lock:
-            scraper = self._get_scraper(source)
-            _reset_scraper_session(scraper)
-            # resolve() only needs *a* version number, not a specific
-            # installable variant -- not every app ships a plain
-            # "universal"/"nodpi"/"APK" build (e.g. APKMirror's YouTube Music
-            # releases are BUNDLE-only, split per-arch, with dpi *ranges*
-            # instead of "nodpi"). match_any skips APKMirror's bundle/dpi/arch
-            # equality checks, accepting whatever variant a release has. It's
-            # an APKMirror-only kwarg; other scrapers ignore unknown kwargs
-            # via **kwargs.
-            kwargs: dict[str, bool] = {"match_any": True}
-            versions = asyncio.run(scraper.get_versions(app_id, **kwargs))
-        if not versions:
+        latest = self._run(self._latest_version(app_id, source))
+        if latest is None:
             msg = f"No versions found for {app_id!r} on {source.value}"
             raise ValueError(msg)
-        latest = max(versions, key=lambda v: _version_sort_key(v.version))
         return latest.version, latest.version
 
     def download(
@@ -158,25 +275,182 @@ class DownloadManager:
         """
         del timeout
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with self._lock:
-            scraper = self._get_scraper(source)
-            _reset_scraper_session(scraper)
-            kwargs: dict[str, str] = {}
-            if arch:
-                # Only APKMirror's ArchType expects "armeabi-v7a"; other
-                # scrapers (e.g. Archive.org) key VersionInfo.arch off the raw
-                # filename convention ("arm-v7a"), so normalizing there would
-                # break the exact-match lookup in their download().
-                kwargs["arch"] = self._normalize_arch(arch) if source == DownloadSource.APKMIRROR else arch
-            if dpi:
-                kwargs["dpi"] = dpi
-
-            result = asyncio.run(scraper.download(app_id, version, output_path, **kwargs))
+        kwargs = self._download_kwargs(source, arch, dpi)
+
+        result = self._run(self._download(app_id, version, output_path, source, kwargs))
         if not result.success or result.file_path is None:
             msg = result.error or f"Failed to download {app_id!r} {version} from {source.value}"
             raise RuntimeError(msg)
         return result.file_path
 
+    def download_any(
+        self,
+        candidates: Sequence[SourceCandidate],
+        version: str,
+        output_path: Path,
+        *,
+        mode: MultiSourceMode = "race",
+        arch: str | None = None,
+        dpi: str | None = None,
+        expected_package: str | None = None,
+    ) -> tuple[Path, DownloadSource]:
+        """Download a stock APK from whichever of several sources delivers it.
+
+        Every download is checked before it is accepted: the scraper must
+        report the requested version and, when aapt2 is available, the APK
+        must declare ``expected_package`` (if given) and that version. A
+        failed or mismatching download falls over to the next source.
+
+        Args:
+            candidates: Sources to use, in preference order. With `stats`
+                they are reordered by recorded health, sources in cooldown
+                last (and left out of a race unless nothing else is left).
+            version: Version to download.
+            output_path: Where to save the downloaded APK.
+            mode: "failover" tries the candidates one after another; "race"
+                looks the version up on all of them concurrently, downloads
+                from the first to confirm it and cancels the other lookups.
+            arch: Target architecture, if the source supports filtering by it.
+            dpi: Target DPI, if the source supports filtering by it.
+            expected_package: Android package id the APK must declare.
+
+        Returns:
+            Tuple of (path to the downloaded APK, source it came from).
+
+        Raises:
+            ValueError: If ``candidates`` is empty.
+            RuntimeError: If no source delivered a matching APK.
+
+        """
+        if not candidates:
+            msg = "No download sources to try"
+            raise ValueError(msg)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.stats is not None:
+            candidates = self.stats.order(candidates, lambda c: c.source)
+        if mode == "race":
+            coro = self._race(candidates, version, output_path, arch, dpi, expected_package)
+        else:
+            coro = self._failover(candidates, version, output_path, arch, dpi, expected_package)
+        path, source, errors = self._run(coro)
+        if path is None or source is None:
+            detail = "; ".join(f"{s.value}: {e}" for s, e in errors) or "no source has this version"
+            msg = f"Failed to download version {version} from any source ({detail})"
+            raise RuntimeError(msg)
+        return path, source
+
+    async def _failover(
+        self,
+        candidates: Sequence[SourceCandidate],
+        version: str,
+        output_path: Path,
+        arch: str | None,
+        dpi: str | None,
+        expected_package: str | None,
+    ) -> _Outcome:
+        errors: list[tuple[DownloadSource, str]] = []
+        for candidate in candidates:
+            path, error = await self._checked_download(candidate, version, output_path, arch, dpi, expected_package)
+            if path is not None:
+                return path, candidate.source, errors
+            errors.append((candidate.source, error))
+        return None, None, errors
+
+    async def _race(
+        self,
+        candidates: Sequence[SourceCandidate],
+        version: str,
+        output_path: Path,
+        arch: str | None,
+        dpi: str | None,
+        expected_package: str | None,
+    ) -> _Outcome:
+        errors: list[tuple[DownloadSource, str]] = []
+        healthy = [c for c in candidates if self.stats is None or not self.stats.health(c.source).cooling_down()]
+        if healthy:
+            # Sources in cooldown only race when no healthy one is left.
+            errors.extend((c.source, "cooling down after repeated failures") for c in candidates if c not in healthy)
+            candidates = healthy
+        lookups: dict[asyncio.Future[bool], SourceCandidate] = {
+            asyncio.create_task(self._has_version(c, version, self._download_kwargs(c.source, arch, dpi))): c
+            for c in candidates
+        }
+        try:
+            async for done in asyncio.as_completed(lookups):
+                candidate = lookups[done]
+                if not done.result():
+                    errors.append((candidate.source, f"version {version} not listed"))
+                    continue
+                logger.debug("%s confirmed %s %s first", candidate.source.value, candidate.app_id, version)
+                path, error = await self._checked_download(candidate, version, output_path, arch, dpi, expected_package)
+                if path is not None:
+                    return path, candidate.source, errors
+                errors.append((candidate.source, error))
+        finally:
+            for task in lookups:
+                task.cancel()
+            await asyncio.gather(*lookups, return_exceptions=True)
+        return None, None, errors
+
+    async def _has_version(self, candidate: SourceCandidate, version: str, kwargs: dict[str, str]) -> bool:
+        """Whether ``candidate`` lists ``version``, reading its versions newest-first only as far as needed."""
+        target = version_sort_key(version)
+        found = False
+        try:
+            async with self._scraper(candidate.source) as scraper:
+                started = time.monotonic()
+                versions = scraper.iter_versions(candidate.app_id, **kwargs)
+                async with contextlib.aclosing(versions):
+                    async for info in versions:
+                        if info.version == version or version_sort_key(info.version) < target:
+                            found = info.version == version
+                            break
+        except Exception as e:
+            # A broken or blocked source just loses the race.
+            logger.debug("Version lookup on %s failed: %s", candidate.source.value, e)
+            self._record_failure(candidate.source, str(e))
+            return False
+        if self.stats is not None:
+            self.stats.record_success(candidate.source, latency=time.monotonic() - started)
+        return found
+
+    async def _checked_download(
+        self,
+        candidate: SourceCandidate,
+        version: str,
+        output_path: Path,
+        arch: str | None,
+        dpi: str | None,
+        expected_package: str | None,
+    ) -> tuple[Path | None, str]:
+        """Download from ``candidate`` and verify the APK; returns (path, error)."""
+        kwargs = self._download_kwargs(candidate.source, arch, dpi)
+        try:
+            result = await self._download(candidate.app_id, version, output_path, candidate.source, kwargs)
+        except Exception as e:
+            return None, str(e)
+        if not result.success or result.file_path is None:
+            return None, result.error or "download failed"
+        if result.version is not None and result.version != version:
+            return None, f"got version {result.version}"
+        mismatch = await asyncio.to_thread(_identity_mismatch, result.file_path, expected_package, version)
+        if mismatch is not None:
+            await asyncio.to_thread(result.file_path.unlink, missing_ok=True)
+            return None, mismatch
+        return result.file_path, ""
+
+    def _download_kwargs(self, source: DownloadSource, arch: str | None, dpi: str | None) -> dict[str, str]:
+        kwargs: dict[str, str] = {}
+        if arch:
+            # Only APKMirror's ArchType expects "armeabi-v7a"; other
+            # scrapers (e.g. Archive.org) key VersionInfo.arch off the raw
+            # filename convention ("arm-v7a"), so normalizing there would
+            # break the exact-match lookup in their download().
+            kwargs["arch"] = self._normalize_arch(arch) if source == DownloadSource.APKMIRROR else arch
+        if dpi:
+            kwargs["dpi"] = dpi
+        return kwargs
+
     def _normalize_arch(self, arch: str) -> str:
         """Normalize architecture string.
 
@@ -191,12 +465,48 @@ class DownloadManager:
         """
         return ARCH_NORMALIZATION.get(arch, arch)
 
+    async def _aclose_scrapers(self) -> None:
+        for scraper in self._scrapers.values():
+            await scraper.aclose()
+
     def close(self) -> None:
-        """Close all scraper sessions."""
+        """Close all scraper sessions and stop the scraping loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None and thread is not None:
+            if thread.is_alive() and thread is not threading.current_thread():
+                with contextlib.suppress(Exception):
+                    asyncio.run_coroutine_threadsafe(self._aclose_scrapers(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+            loop.close()
         for scraper in self._scrapers.values():
             scraper.close()
         self._scrapers.clear()
+        self._source_slots.clear()
 
     def __del__(self) -> None:
         """Cleanup on deletion."""
         self.close()
+
+
+def _file_size(path: Path) -> int | None:
+    with contextlib.suppress(OSError):
+        return path.stat().st_size
+    return None
+
+
+def _identity_mismatch(apk_path: Path, expected_package: str | None, version: str) -> str | None:
+    """Why ``apk_path`` is not the expected APK, or None if it is (or cannot be read)."""
+    if apk_path.suffix.lower() != ".apk":
+        return None
+    identity = read_apk_identity(apk_path)
+    if identity is None:
+        return None
+    package, version_name = identity
+    if expected_package and package != expected_package:
+        return f"APK is {package}, expected {expected_package}"
+    if version_name and version_name != version:
+        return f"APK is version {version_name}"
+    return None
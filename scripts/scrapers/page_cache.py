@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Persistent cache of scraped pages shared across runs and processes.
+
+Listing and release pages fetched by the scrapers are stored in one SQLite
+database (``$CACHE_DIR/scraper-pages.sqlite3``) keyed by URL. Entries
+younger than the scraper's ``CACHE_TTL`` are served without a request;
+older ones are revalidated with If-None-Match/If-Modified-Since so an
+unchanged page costs a 304 instead of a full download. The database runs
+in WAL mode, so concurrent build processes share it safely, and it is kept
+under a size budget by evicting the least recently used pages.
+
+Set SCRAPER_PAGE_CACHE to another database path, or to ``off`` to keep the
+cache in memory for the current process only; SCRAPER_PAGE_CACHE_MAX_MB
+bounds its size.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Size budget of the cache; least recently used pages are evicted past it.
+DEFAULT_PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Larger bodies (e.g. a stray file download) are never cached.
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+# Seconds a process waits for another one holding the database lock.
+SQLITE_BUSY_TIMEOUT = 30.0
+# Headers describing the stored (already decoded) body or the original
+# connection; replaying them would corrupt the rebuilt response.
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+def default_page_cache_path() -> Path | None:
+    """Database named by SCRAPER_PAGE_CACHE, else under CACHE_DIR; None if ``off``."""
+    value = os.environ.get("SCRAPER_PAGE_CACHE")
+    if value is None:
+        return Path(os.environ.get("CACHE_DIR", ".cache")) / "scraper-pages.sqlite3"
+    if value.strip().lower() in {"", "0", "off", "false", "no"}:
+        return None
+    return Path(value)
+
+
+def default_page_cache_max_bytes() -> int:
+    """Size budget from SCRAPER_PAGE_CACHE_MAX_MB, else the default."""
+    value = os.environ.get("SCRAPER_PAGE_CACHE_MAX_MB")
+    try:
+        return int(float(value) * 1024 * 1024) if value else DEFAULT_PAGE_CACHE_MAX_BYTES
+    except ValueError:
+        return DEFAULT_PAGE_CACHE_MAX_BYTES
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPage:
+    """A stored page.
+
+    Attributes:
+        url: Requested URL.
+        headers: Response headers without encoding and connection headers.
+        body: Decoded response body.
+        etag: ETag validator, if the server sent one.
+        last_modified: Last-Modified validator, if the server sent one.
+        stored_at: Epoch seconds the page was fetched or last revalidated.
+
+    """
+
+    url: str
+    headers: dict[str, str]
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Whether the page may be served without revalidation."""
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Revalidation headers for this page."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> httpx.Response:
+        """Rebuild the 200 response the page was stored from."""
+        return httpx.Response(
+            httpx.codes.OK,
+            headers=self.headers,
+            content=self.body,
+            request=httpx.Request("GET", self.url),
+        )
+
+
+class PageCache:
+    """URL-keyed page store in SQLite with LRU eviction.
+
+    Every operation is best effort: database errors are logged and cost a
+    cache miss, never a failed scrape.
+
+    Attributes:
+        path: Database file, or None for a per-process in-memory cache.
+        max_bytes: Total body size kept before evicting pages.
+
+    """
+
+    def __init__(self, path: Path | None = None, max_bytes: int = DEFAULT_PAGE_CACHE_MAX_BYTES) -> None:
+        """Open (lazily) the cache database.
+
+        Args:
+            path: Database file, or None for an in-memory cache.
+            max_bytes: Size budget for stored bodies.
+
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._broken = False
+
+    def _connection(self) -> sqlite3.Connection | None:
+        if self._conn is None and not self._broken:
+            try:
+                if self.path is None:
+                    conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+                else:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(
+                        self.path,
+                        timeout=SQLITE_BUSY_TIMEOUT,
+                        check_same_thread=False,
+                        isolation_level=None,
+                    )
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Scraper page cache disabled (%s): %s", self.path, exc)
+                self._broken = True
+                return None
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> CachedPage | None:
+        """Stored page for ``url`` (fresh or not), marking it recently used."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT headers, body, etag, last_modified, stored_at FROM pages WHERE url = ?",
+                    (url,),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+                headers = json.loads(row[0])
+            except (sqlite3.Error, ValueError) as exc:
+                logger.debug("Page cache read failed for %s: %s", url, exc)
+                return None
+        return CachedPage(url, headers, bytes(row[1]), row[2], row[3], row[4])
+
+    def put(self, url: str, response: httpx.Response) -> None:
+        """Store a successful response for ``url`` and evict past the budget."""
+        body = response.content
+        if response.status_code != httpx.codes.OK or len(body) > min(MAX_PAGE_BYTES, self.max_bytes):
+            return
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        url,
+                        json.dumps(headers),
+                        body,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        now,
+                        now,
+                        len(body),
+                    ),
+                )
+                self._evict(conn)
+            except sqlite3.Error as exc:
+                logger.debug("Page cache write failed for %s: %s", url, exc)
+
+    def refresh(self, url: str, response: httpx.Response) -> None:
+        """Restart the TTL of ``url`` after a 304, keeping any new validators."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "UPDATE pages SET stored_at = ?, accessed_at = ?, "
+                    "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (now, now, response.headers.get("ETag"), response.headers.get("Last-Modified"), url),
+                )
+            except sqlite3.Error as exc:
+                logger.debug("Page cache refresh failed for %s: %s", url, exc)
+
+    def total_bytes(self) -> int:
+        """Size of all stored bodies."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            return int(conn.execute("SELECT TOTAL(size) FROM pages").fetchone()[0])
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used pages until the rest fits ``max_bytes``."""
+        total = conn.execute("SELECT TOTAL(size) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        conn.execute(
+            "DELETE FROM pages WHERE url IN ("
+            " SELECT url FROM (SELECT url, SUM(size) OVER (ORDER BY accessed_at DESC, url) AS kept FROM pages)"
+            " WHERE kept > ?)",
+            (self.max_bytes,),
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                conn.close()
+
+
+class _SharedCache:
+    """Lazily opened process-wide `PageCache`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: PageCache | None = None
+
+    def get(self) -> PageCache:
+        with self._lock:
+            if self._cache is None:
+                self._cache = PageCache(default_page_cache_path(), default_page_cache_max_bytes())
+            return self._cache
+
+    def reset(self) -> None:
+        with self._lock:
+            cache, self._cache = self._cache, None
+        if cache is not None:
+            cache.close()
+
+
+_SHARED = _SharedCache()
+
+
+def page_cache() -> PageCache:
+    """The process-wide page cache configured from the environment."""
+    return _SHARED.get()
+
+
+def reset_page_cache() -> None:
+    """Close the shared cache so the next `page_cache` call reopens it."""
+    _SHARED.reset()
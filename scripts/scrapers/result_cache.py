@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""In-memory cache of parsed scraper results.
+
+The page cache (`scripts.scrapers.page_cache`) saves the network round trip
+but every hit is still parsed again. This cache keeps the parsed results
+themselves (release lists, variant URLs, version lists) keyed by source and
+query, so a repeated lookup in the same process skips both the request and
+the DOM parse. It is bounded by the approximate memory of its entries (the
+size of each result pickled) and evicts the least recently used ones past it.
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+# Approximate bytes of parsed results kept before the least recently used are dropped.
+DEFAULT_RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def approximate_size(value: object) -> int:
+    """Bytes ``value`` takes pickled, or its shallow size if it cannot be pickled."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except pickle.PicklingError, TypeError, AttributeError:
+        return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Bounded LRU map of parsed results with a per-entry TTL.
+
+    Attributes:
+        max_bytes: Approximate total size (see `approximate_size`) kept
+            before evicting the least recently used entries.
+
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES) -> None:
+        """Create an empty cache holding at most about ``max_bytes`` of results."""
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, object, int]] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of stored results, expired ones included."""
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes of the stored results."""
+        return self._size
+
+    def lookup(self, key: Hashable) -> tuple[bool, object]:
+        """Return ``(hit, value)``; a hit also marks the entry recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value, size = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._size -= size
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def store(self, key: Hashable, value: object, ttl: float) -> None:
+        """Keep ``value`` for ``ttl`` seconds, evicting past ``max_bytes``.
+
+        A value larger than ``max_bytes`` on its own is not kept.
+        """
+        if ttl <= 0:
+            return
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    async def memoize[T](self, key: Hashable, ttl: float, compute: Callable[[], Awaitable[T]]) -> T:
+        """Cached result for ``key``, or the result of awaiting ``compute``.
+
+        Exceptions from ``compute`` propagate and are not cached.
+        """
+        hit, value = self.lookup(key)
+        if hit:
+            return cast("T", value)
+        result = await compute()
+        self.store(key, result, ttl)
+        return result
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_RESULT_CACHE = ResultCache()
+
+
+def result_cache() -> ResultCache:
+    """The process-wide `ResultCache` shared by all scrapers."""
+    return _RESULT_CACHE
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Health scores of download sources, persisted across runs.
+
+Every version lookup and download through `DownloadManager` is recorded
+per source in ``$CACHE_DIR/source-stats.json``: lookup latency and download
+throughput as moving averages, a moving success rate, and the last failure.
+The score derived from them orders the configured sources of an app so the
+source that has been fastest and most reliable lately is tried first.
+
+A source that fails `FAILURE_THRESHOLD` times in a row is put in cooldown
+(a circuit breaker): it is tried only after every healthy source until the
+cooldown ends. The next attempt after that either closes the circuit (on
+success) or opens it again for twice as long (on failure).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from scripts.scrapers.base import DownloadSource
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency/throughput/success averages.
+STATS_SMOOTHING = 0.3
+# Lookup latency scored as "average" (half of the speed factor).
+REFERENCE_LATENCY = 5.0
+# Download throughput scored as "average" (half of the speed factor).
+REFERENCE_THROUGHPUT = 1024 * 1024
+# Consecutive failures that put a source in cooldown.
+FAILURE_THRESHOLD = 3
+# Cooldown after reaching the threshold; doubles with every further failure.
+BASE_COOLDOWN = 15 * 60
+MAX_COOLDOWN = 6 * 60 * 60
+# Longest failure message kept in the stats file.
+MAX_ERROR_LENGTH = 200
+
+
+def default_source_stats_path() -> Path:
+    """Source stats location under CACHE_DIR."""
+    return Path(os.environ.get("CACHE_DIR", ".cache")) / "source-stats.json"
+
+
+def _blend(previous: float | None, sample: float) -> float:
+    return sample if previous is None else STATS_SMOOTHING * sample + (1 - STATS_SMOOTHING) * previous
+
+
+@dataclass(slots=True)
+class SourceHealth:
+    """Recorded health of one download source.
+
+    Attributes:
+        latency: Moving average of version lookup seconds.
+        throughput: Moving average of download bytes per second.
+        success_rate: Moving average of outcomes (1.0 success, 0.0 failure).
+        attempts: Recorded lookups and downloads.
+        failures: Recorded failures.
+        consecutive_failures: Failures since the last success.
+        last_failure: Epoch seconds of the last failure.
+        last_error: Message of the last failure.
+        cooldown_until: Epoch seconds until which the circuit is open.
+
+    """
+
+    latency: float | None = None
+    throughput: float | None = None
+    success_rate: float = 1.0
+    attempts: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_failure: float | None = None
+    last_error: str | None = None
+    cooldown_until: float = 0.0
+
+    @classmethod
+    def from_json(cls, data: object) -> SourceHealth | None:
+        """Parse a stats file entry, or None if it is malformed."""
+        if not isinstance(data, dict):
+            return None
+        known = {f.name for f in fields(cls)}
+        try:
+            return cls(**{key: value for key, value in data.items() if key in known})
+        except TypeError:
+            return None
+
+    def score(self) -> float:
+        """Preference in [0, 1]: success rate times the speed factor.
+
+        Latency and throughput each contribute a factor of 0.5 at their
+        reference value, and 0.5 while unmeasured, so an unrecorded source
+        scores 0.5 -- ahead of slow or flaky sources, behind fast ones.
+        """
+        speed = [
+            REFERENCE_LATENCY / (REFERENCE_LATENCY + self.latency) if self.latency is not None else 0.5,
+            self.throughput / (self.throughput + REFERENCE_THROUGHPUT) if self.throughput is not None else 0.5,
+        ]
+        return self.success_rate * sum(speed) / len(speed)
+
+    def cooling_down(self, now: float | None = None) -> bool:
+        """Whether the circuit is open, i.e. the source should be tried last."""
+        return self.cooldown_until > (time.time() if now is None else now)
+
+
+class SourceStats:
+    """Persistent health records of download sources.
+
+    Records come from the scraping loop thread while build worker threads
+    read the ordering, so all access is locked.
+
+    Attributes:
+        path: JSON file holding ``{source: SourceHealth fields}``.
+
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Load the records from ``path`` (missing or corrupt files are empty).
+
+        Args:
+            path: Stats file; defaults to `default_source_stats_path`.
+
+        """
+        self.path = path or default_source_stats_path()
+        self._lock = threading.Lock()
+        self._health: dict[str, SourceHealth] = {}
+        try:
+            data = json.loads(self.path.read_text())
+        except OSError, ValueError:
+            return
+        if isinstance(data, dict):
+            for name, entry in data.items():
+                health = SourceHealth.from_json(entry)
+                if health is not None:
+                    self._health[name] = health
+
+    def health(self, source: DownloadSource) -> SourceHealth:
+        """Copy of the record of ``source`` (a fresh one if none exists)."""
+        with self._lock:
+            health = self._health.get(source.value)
+            return SourceHealth(**asdict(health)) if health is not None else SourceHealth()
+
+    def snapshot(self) -> dict[str, SourceHealth]:
+        """Copies of all records, keyed by source name."""
+        with self._lock:
+            return {name: SourceHealth(**asdict(health)) for name, health in self._health.items()}
+
+    def record_success(
+        self,
+        source: DownloadSource,
+        *,
+        latency: float | None = None,
+        size: int | None = None,
+        seconds: float | None = None,
+    ) -> None:
+        """Record a successful lookup (``latency``) or download (``size`` bytes in ``seconds``)."""
+        with self._lock:
+            health = self._health.setdefault(source.value, SourceHealth())
+            health.attempts += 1
+            health.success_rate = _blend(health.success_rate if health.attempts > 1 else None, 1.0)
+            health.consecutive_failures = 0
+            health.cooldown_until = 0.0
+            if latency is not None:
+                health.latency = _blend(health.latency, latency)
+            if size and seconds and seconds > 0:
+                health.throughput = _blend(health.throughput, size / seconds)
+
+    def record_failure(self, source: DownloadSource, error: str, *, now: float | None = None) -> None:
+        """Record a failed lookup or download, opening the circuit past the threshold."""
+        now = time.time() if now is None else now
+        with self._lock:
+            health = self._health.setdefault(source.value, SourceHealth())
+            health.attempts += 1
+            health.failures += 1
+            health.success_rate = _blend(health.success_rate if health.attempts > 1 else None, 0.0)
+            health.consecutive_failures += 1
+            health.last_failure = now
+            health.last_error = error[:MAX_ERROR_LENGTH]
+            excess = health.consecutive_failures - FAILURE_THRESHOLD
+            if excess >= 0:
+                cooldown = min(BASE_COOLDOWN * 2 ** min(excess, 16), MAX_COOLDOWN)
+                health.cooldown_until = now + cooldown
+                logger.warning(
+                    "%s failed %d times in a row; trying it last for %d minutes",
+                    source.value,
+                    health.consecutive_failures,
+                    cooldown // 60,
+                )
+
+    def order[T](self, items: Iterable[T], source_of: Callable[[T], DownloadSource]) -> list[T]:
+        """``items`` sorted best source first; sources in cooldown go last.
+
+        The sort is stable, so equally scored sources keep their given
+        (configured) order.
+        """
+        now = time.time()
+        with self._lock:
+            records = dict(self._health)
+
+        def rank(item: T) -> tuple[bool, float]:
+            health = records.get(source_of(item).value) or SourceHealth()
+            return health.cooling_down(now), -health.score()
+
+        return sorted(items, key=rank)
+
+    def save(self) -> None:
+        """Write the records atomically."""
+        with self._lock:
+            payload = {name: asdict(health) for name, health in self._health.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(payload, indent=2, sort_keys=True))
+            tmp.replace(self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+            raise
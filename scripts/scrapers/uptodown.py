@@ -5,19 +5,19 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import re
+import shutil
 import zipfile
 from dataclasses import dataclass
-from io import BytesIO
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 from selectolax.parser import HTMLParser
 
 from scripts.lib import logging as log
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
     from pathlib import Path
 
-    import httpx
     from selectolax.parser import Node
 
 from scripts.scrapers.base import (
@@ -25,9 +25,15 @@ from scripts.scrapers.base import (
     DownloadSource,
     ScraperBase,
     VersionInfo,
+    first_version,
+    is_html_response,
+    version_sort_key,
 )
+from scripts.utils.network import DOWNLOAD_CHUNK_SIZE
 
 SUPPORTED_ARCHS = frozenset({"arm64-v8a", "armeabi-v7a", "x86", "x86_64"})
+# Version pages after the first fetched at once while crawling.
+PAGE_FETCH_CONCURRENCY = 3
 
 
 @dataclass
@@ -105,31 +111,83 @@ class UptodownScraper(ScraperBase):
                     versions.append(version)
         return versions
 
-    async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
-        target_arch_raw = kwargs.get("arch")
-        target_arch: str | None = target_arch_raw if isinstance(target_arch_raw, str) else None
-        all_versions: list[UptodownVersion] = []
-        for page in range(1, self.max_pages + 1):
-            url = self._build_version_page_url(pkg_name, page)
+    async def _fetch_cards(self, url: str) -> list[UptodownVersion] | None:
+        """Parsed cards of one versions page (memoized), or None if it failed to load."""
+
+        async def fetch() -> list[UptodownVersion]:
             html = await self._fetch_page(url)
             if not html:
-                await asyncio.sleep(0.5)
-                continue
-            page_versions = self._parse_versions_page(html)
-            if not page_versions:
-                break
-            all_versions.extend(page_versions)
-            await asyncio.sleep(0.3)
-        if target_arch and target_arch in SUPPORTED_ARCHS:
-            all_versions = [v for v in all_versions if v.arch == target_arch or v.arch is None]
-        result: list[VersionInfo] = []
+                # Raised so a failed load is retried next time, not cached.
+                raise RuntimeError(url)
+            return self._parse_versions_page(html)
+
+        try:
+            return await self._cached_result("cards", url, fetch)
+        except RuntimeError:
+            return None
+
+    async def _iter_cards(self, pkg_name: str, target_arch: str | None) -> AsyncGenerator[UptodownVersion]:
+        """Yield version cards newest-first.
+
+        Uptodown lists newer pages first but does not guarantee the order of
+        cards within a page, so each page is sorted by `version_sort_key`
+        before it is yielded. The first page is fetched on its own, as most lookups only need the
+        newest versions. The remaining pages are fetched
+        PAGE_FETCH_CONCURRENCY at a time once the caller reads past it; an
+        empty page ends the crawl, and closing the iterator cancels the
+        fetches that have not finished. Request spacing is left to the
+        per-host pacing in `ScraperBase`.
+        """
+        if target_arch not in SUPPORTED_ARCHS:
+            target_arch = None
+
+        def wanted(cards: list[UptodownVersion]) -> list[UptodownVersion]:
+            matching = [v for v in cards if target_arch is None or v.arch == target_arch or v.arch is None]
+            return sorted(matching, key=lambda v: version_sort_key(v.version), reverse=True)
+
+        first_page = await self._fetch_cards(self._build_version_page_url(pkg_name, 1))
+        if first_page == []:
+            return
+        for v in wanted(first_page or []):
+            yield v
+
+        slots = asyncio.Semaphore(PAGE_FETCH_CONCURRENCY)
+
+        async def fetch(page: int) -> list[UptodownVersion] | None:
+            async with slots:
+                return await self._fetch_cards(self._build_version_page_url(pkg_name, page))
+
+        # Tasks wait on the semaphore in page order, so cancelling the rest
+        # skips page loads that have not started yet.
+        tasks = [asyncio.create_task(fetch(page)) for page in range(2, self.max_pages + 1)]
+        try:
+            for task in tasks:
+                page_versions = await task
+                if page_versions is None:
+                    continue
+                if not page_versions:
+                    break
+                for v in wanted(page_versions):
+                    yield v
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_versions(self, pkg_name: str, **kwargs: object) -> AsyncGenerator[VersionInfo]:
+        target_arch_raw = kwargs.get("arch")
+        target_arch = target_arch_raw if isinstance(target_arch_raw, str) else None
         seen: set[str] = set()
-        for v in all_versions:
-            if v.version in seen:
-                continue
-            seen.add(v.version)
-            result.append(VersionInfo(version=v.version, url=v.url, arch=v.arch))
-        return result
+        cards = self._iter_cards(pkg_name, target_arch)
+        async with contextlib.aclosing(cards):
+            async for v in cards:
+                if v.version in seen:
+                    continue
+                seen.add(v.version)
+                yield VersionInfo(version=v.version, url=v.url, arch=v.arch)
+
+    async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
+        return [v async for v in self.iter_versions(pkg_name, **kwargs)]
 
     async def _resolve_target_version(
         self,
@@ -137,20 +195,16 @@ class UptodownScraper(ScraperBase):
         version: str,
         target_arch: str | None,
     ) -> UptodownVersion | None:
-        versions = await self.get_versions(pkg_name, arch=target_arch)
-        for v_info in versions:
-            if v_info.version == version and v_info.url:
-                found_versions = await self._find_version_by_file_id(pkg_name, v_info.arch)
-                for fv in found_versions:
-                    if fv.version == version:
-                        return fv
-                return UptodownVersion(
-                    version=version,
-                    url=v_info.url,
-                    arch=v_info.arch,
-                    file_id="",
-                    is_xapk=False,
-                )
+        """Card of ``version``; the crawl stops at the page listing it.
+
+        Pages read by an earlier `iter_versions` pass come from the result
+        cache, so resolving a version just listed costs no requests.
+        """
+        cards = self._iter_cards(pkg_name, target_arch)
+        async with contextlib.aclosing(cards):
+            async for card in cards:
+                if card.version == version and card.url:
+                    return card
         return None
 
     async def download(
@@ -165,10 +219,10 @@ class UptodownScraper(ScraperBase):
             target_arch = str(target_arch) or None
 
         if version is None:
-            versions = await self.get_versions(pkg_name, arch=target_arch)
-            if not versions:
+            latest = await first_version(self.iter_versions(pkg_name, arch=target_arch))
+            if latest is None:
                 return DownloadResult(success=False, file_path=None, version=None, error="No versions found")
-            version = versions[0].version
+            version = latest.version
 
         target_version = await self._resolve_target_version(pkg_name, version, target_arch)
 
@@ -176,69 +230,64 @@ class UptodownScraper(ScraperBase):
             return DownloadResult(success=False, file_path=None, version=version, error=f"Version {version} not found")
 
         try:
-            response = await self._request_with_retry(target_version.url)
-            content = response.content
             if target_version.is_xapk:
-                return await self._download_xapk(content, output_path, version)
-            await asyncio.to_thread(output_path.parent.mkdir, parents=True, exist_ok=True)
-            await asyncio.to_thread(output_path.write_bytes, content)
+                bundle_path = output_path.with_suffix(".xapk")
+                try:
+                    await self._download_file(target_version.url, bundle_path)
+                    return await self._download_xapk(bundle_path, output_path, version)
+                finally:
+                    await asyncio.to_thread(bundle_path.unlink, missing_ok=True)
+            await self._download_file(target_version.url, output_path)
             return DownloadResult(success=True, file_path=output_path, version=version, error=None)
         except Exception as e:
             log.error(f"Download failed: {e}")
             return DownloadResult(success=False, file_path=None, version=version, error=str(e))
 
-    async def _find_version_by_file_id(self, pkg_name: str, arch: str | None) -> list[UptodownVersion]:
-        all_versions: list[UptodownVersion] = []
-        for page in range(1, self.max_pages + 1):
-            url = self._build_version_page_url(pkg_name, page)
-            html = await self._fetch_page(url)
-            if not html:
-                await asyncio.sleep(0.5)
-                continue
-            page_versions = self._parse_versions_page(html)
-            if not page_versions:
-                break
-            all_versions.extend(v for v in page_versions if arch is None or v.arch == arch or v.arch is None)
-            await asyncio.sleep(0.3)
-        return all_versions
+    async def _download_file(self, url: str, output_path: Path) -> None:
+        response = await self._stream_to_file(url, output_path)
+        if is_html_response(response):
+            msg = "Received HTML instead of APK"
+            raise RuntimeError(msg)
 
     async def _download_xapk(
         self,
-        content: bytes,
+        bundle_path: Path,
         output_path: Path,
         version: str | None,
     ) -> DownloadResult:
         try:
-            with zipfile.ZipFile(BytesIO(content)) as zf:
-                namelist = zf.namelist()
-                apk_files = [n for n in namelist if n.endswith(".apk")]
-                if not apk_files:
-                    return DownloadResult(
-                        success=False, file_path=None, version=version, error="No APK found in XAPK bundle"
-                    )
-                main_apk = apk_files[0]
-                apk_content = await asyncio.to_thread(zf.read, main_apk)
-                await asyncio.to_thread(output_path.parent.mkdir, parents=True, exist_ok=True)
-                await asyncio.to_thread(output_path.write_bytes, apk_content)
-                return DownloadResult(success=True, file_path=output_path, version=version, error=None)
+            extracted = await asyncio.to_thread(_extract_main_apk, bundle_path, output_path)
         except zipfile.BadZipFile:
             return DownloadResult(success=False, file_path=None, version=version, error="Invalid XAPK file format")
         except Exception as e:
             return DownloadResult(success=False, file_path=None, version=version, error=f"XAPK extraction failed: {e}")
+        if not extracted:
+            return DownloadResult(success=False, file_path=None, version=version, error="No APK found in XAPK bundle")
+        return DownloadResult(success=True, file_path=output_path, version=version, error=None)
+
+
+def _extract_main_apk(bundle_path: Path, output_path: Path) -> bool:
+    """Copy the main APK out of an XAPK bundle in chunks.
 
-    async def _request_with_retry(self, url: str, method: str = "GET", **kwargs: Any) -> httpx.Response:
-        delay = self.BASE_DELAY
-        last_error: Exception | None = None
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = await self.session.request(method, url, **kwargs)
-                response.raise_for_status()
-            except Exception as e:
-                last_error = e
-                if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(delay)
-                    delay *= 2
-            else:
-                return response
-        msg = f"Request failed after {self.MAX_RETRIES} retries: {url}"
-        raise RuntimeError(msg) from last_error
+    The member is streamed from the bundle on disk to a temporary file next
+    to ``output_path`` and renamed into place, so memory use does not grow
+    with the bundle size and a failed copy leaves no partial APK behind.
+
+    Returns:
+        False if the bundle holds no APK.
+
+    """
+    with zipfile.ZipFile(bundle_path) as zf:
+        apk_files = [n for n in zf.namelist() if n.endswith(".apk")]
+        if not apk_files:
+            return False
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f".{output_path.name}.part")
+        try:
+            with zf.open(apk_files[0]) as src, tmp_path.open("wb") as dst:
+                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+            tmp_path.replace(output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    return True
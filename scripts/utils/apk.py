@@ -135,6 +135,31 @@ def verify_signature(apk_path: Path) -> str | None:
         return None
 
 
+_BADGING_PACKAGE = re.compile(r"^package: name='([^']+)'.*?versionName='([^']*)'", re.MULTILINE)
+
+
+def read_apk_identity(apk_path: Path) -> tuple[str, str] | None:
+    """Package name and versionName of an APK via ``aapt2 dump badging``.
+
+    Returns:
+        ``(package, version_name)``, or None when aapt2 is not on PATH or
+        cannot read the file.
+
+    """
+    _validate_apk_path(apk_path, "read_apk_identity")
+
+    aapt2 = shutil.which("aapt2")
+    if aapt2 is None or not apk_path.exists():
+        return None
+
+    try:
+        result = subprocess.run([aapt2, "dump", "badging", str(apk_path)], check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError, OSError:
+        return None
+    match = _BADGING_PACKAGE.search(result.stdout)
+    return (match.group(1), match.group(2)) if match else None
+
+
 class BundleType(Enum):
     """Type of APK bundle."""
 
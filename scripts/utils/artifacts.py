@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""Content-addressed store for downloaded artifacts.
+
+Blobs are stored once under their SHA256 digest and an index maps source
+URLs to digests. Consumers get a reflink or (without filesystem support) a
+copy of the blob at their own path, so the same prebuilt fetched for several
+apps or cache directories costs one download. The store is opt-in
+(``HttpClientConfig.artifact_dir``) and meant for immutable release assets;
+it keeps at most ``max_bytes`` of blobs, dropping the least recently used.
+
+Digests are computed while downloads stream in (`StreamDigest`) and kept in
+a ``.<name>.digest`` sidecar keyed by the file's size and mtime, so
+re-verifying an unchanged file is a ``stat`` call instead of a full read.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+fcntl: ModuleType | None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+xxhash: ModuleType | None
+try:
+    xxhash = importlib.import_module("xxhash")
+except ImportError:
+    xxhash = None
+
+# ioctl request for FICLONE (copy-on-write clone on btrfs, XFS, bcachefs...).
+FICLONE = 0x40049409
+# URLs whose content changes over time; their digests are not indexed.
+MUTABLE_URL_MARKERS = ("/releases/latest/",)
+# Seconds a URL index entry is trusted before the URL is fetched again.
+URL_INDEX_TTL = 7 * 24 * 60 * 60
+# Total blob bytes kept before the least recently used blobs are pruned.
+DEFAULT_ARTIFACT_STORE_BYTES = 2 * 1024 * 1024 * 1024
+# Blobs are read-only so a stray write cannot corrupt every later consumer.
+BLOB_MODE = 0o444
+# Read granularity when hashing files that are already on disk.
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def default_artifact_dir() -> Path:
+    """Default store location under CACHE_DIR."""
+    return Path(os.environ.get("CACHE_DIR", ".cache")) / "artifacts"
+
+
+class StreamDigest:
+    """Incremental digests of data as it is written.
+
+    Always computes SHA256 (used for integrity checks and blob names); adds
+    XXH3-64 as a cheap cache key when the optional ``xxhash`` package is
+    installed.
+    """
+
+    def __init__(self) -> None:
+        """Start empty digests."""
+        self._hashers: dict[str, Any] = {"sha256": hashlib.sha256()}
+        if xxhash is not None:
+            self._hashers["xxh3_64"] = xxhash.xxh3_64()
+
+    def update(self, chunk: bytes) -> None:
+        """Feed the next chunk of data."""
+        for hasher in self._hashers.values():
+            hasher.update(chunk)
+
+    def update_from_file(self, path: Path) -> None:
+        """Feed the current contents of ``path`` (e.g. a resumed partial)."""
+        with path.open("rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                self.update(chunk)
+
+    def hexdigests(self) -> dict[str, str]:
+        """Hex digest per algorithm name."""
+        return {name: hasher.hexdigest() for name, hasher in self._hashers.items()}
+
+
+def digest_sidecar_path(path: Path) -> Path:
+    """Sidecar file holding the cached digests of ``path``."""
+    return path.with_name(f".{path.name}.digest")
+
+
+def record_digests(path: Path, digests: dict[str, str]) -> None:
+    """Remember ``digests`` for the current size and mtime of ``path``.
+
+    Best effort: an unwritable directory just means no cache.
+    """
+    try:
+        st = path.stat()
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, **digests}
+        digest_sidecar_path(path).write_text(json.dumps(entry))
+    except OSError:
+        pass
+
+
+def cached_digests(path: Path) -> dict[str, str] | None:
+    """Digests recorded for ``path``, if it has not changed since."""
+    try:
+        entry = json.loads(digest_sidecar_path(path).read_text())
+        st = path.stat()
+    except OSError, ValueError:
+        return None
+    if not isinstance(entry, dict) or entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return {k: v for k, v in entry.items() if k not in {"size", "mtime_ns"}}
+
+
+def discard_digests(path: Path) -> None:
+    """Remove the digest sidecar of ``path``."""
+    with contextlib.suppress(OSError):
+        digest_sidecar_path(path).unlink()
+
+
+def move_with_digests(src: Path, dst: Path) -> None:
+    """Rename ``src`` to ``dst`` together with its digest sidecar.
+
+    A rename keeps size and mtime, so the recorded digests stay valid.
+    """
+    src.replace(dst)
+    try:
+        digest_sidecar_path(src).replace(digest_sidecar_path(dst))
+    except OSError:
+        discard_digests(dst)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA256 hex digest of a file, from its sidecar when still valid.
+
+    A full read also records the sidecar for the next call.
+    """
+    cached = cached_digests(path)
+    if cached and "sha256" in cached:
+        return cached["sha256"]
+    digest = StreamDigest()
+    digest.update_from_file(path)
+    digests = digest.hexdigests()
+    record_digests(path, digests)
+    return digests["sha256"]
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with src.open("rb") as s, dst.open("wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        with contextlib.suppress(OSError):
+            dst.unlink()
+        return False
+    return True
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """Place an independent copy of ``src`` at ``dst``.
+
+    Tries a reflink first (copy-on-write, sharing storage until either file
+    changes), then a plain copy. Never hardlinks: a chmod or in-place edit
+    of ``dst`` must not reach ``src``. ``dst`` is replaced atomically.
+
+    Returns:
+        The method used: "reflink" or "copy".
+
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{dst.name}.", dir=dst.parent)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    tmp.unlink()
+    try:
+        if _reflink(src, tmp):
+            method = "reflink"
+        else:
+            shutil.copyfile(src, tmp)
+            method = "copy"
+        tmp.replace(dst)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        raise
+    return method
+
+
+def _touch(path: Path, digests: dict[str, str]) -> None:
+    """Mark ``path`` as just used for `ArtifactStore.prune`, keeping its digest sidecar valid."""
+    with contextlib.suppress(OSError):
+        os.utime(path)
+    record_digests(path, digests)
+
+
+class ArtifactStore:
+    """SHA256-addressed blob store with a URL to digest index.
+
+    Layout under ``root``::
+
+        blobs/<aa>/<digest>     artifact contents
+        urls/<sha256(url)>.json {"url", "sha256", "size", "stored_at"}
+
+    Blobs are read-only and their mtime marks their last use. URLs with a
+    query (e.g. signed one-time links) or matching `MUTABLE_URL_MARKERS` are
+    not indexed, and index entries expire after `URL_INDEX_TTL`.
+
+    Attributes:
+        root: Store directory.
+        max_bytes: Total blob size kept by `prune`.
+
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int = DEFAULT_ARTIFACT_STORE_BYTES) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Store directory; defaults to `default_artifact_dir`.
+            max_bytes: Total blob size kept by `prune`.
+
+        """
+        self.root = Path(root) if root is not None else default_artifact_dir()
+        self.max_bytes = max_bytes
+
+    def blob_path(self, digest: str) -> Path:
+        """Location of the blob for ``digest`` (which may not exist)."""
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "urls" / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def has(self, digest: str) -> bool:
+        """Whether a blob for ``digest`` is stored."""
+        return self.blob_path(digest).is_file()
+
+    @staticmethod
+    def indexable(url: str) -> bool:
+        """Whether ``url`` names content stable enough to index."""
+        return not urlsplit(url).query and not any(marker in url for marker in MUTABLE_URL_MARKERS)
+
+    def lookup(self, url: str) -> str | None:
+        """Digest recently recorded for ``url`` if its blob is still stored."""
+        if not self.indexable(url):
+            return None
+        try:
+            entry: dict[str, Any] = json.loads(self._index_path(url).read_text())
+        except OSError, ValueError:
+            return None
+        digest = entry.get("sha256")
+        stored_at = entry.get("stored_at")
+        if entry.get("url") != url or not isinstance(digest, str) or not isinstance(stored_at, int | float):
+            return None
+        if time.time() - stored_at > URL_INDEX_TTL:
+            return None
+        try:
+            if self.blob_path(digest).stat().st_size != entry.get("size"):
+                return None
+        except OSError:
+            return None
+        return digest
+
+    def add(self, src: Path, digest: str | None = None) -> str:
+        """Move ``src`` into the store, then `prune` other blobs past ``max_bytes``.
+
+        Args:
+            src: File to ingest; it is consumed (moved or removed).
+            digest: Known SHA256 of ``src``, computed if omitted.
+
+        Returns:
+            The blob's digest.
+
+        """
+        digest = digest or file_sha256(src)
+        digests = cached_digests(src) or {"sha256": digest}
+        discard_digests(src)
+        blob = self.blob_path(digest)
+        if blob.is_file():
+            src.unlink()
+            _touch(blob, cached_digests(blob) or digests)
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{digest}.{os.getpid()}.tmp")
+        shutil.move(src, tmp)
+        tmp.chmod(BLOB_MODE)
+        tmp.replace(blob)
+        _touch(blob, digests)
+        self.prune(keep=digest)
+        return digest
+
+    def prune(self, keep: str | None = None) -> None:
+        """Remove least recently used blobs until they total ``max_bytes``.
+
+        Args:
+            keep: Digest never removed (the blob just added).
+
+        """
+        blobs: list[tuple[float, int, Path]] = []
+        for blob in self.root.glob("blobs/*/*"):
+            if blob.name.startswith("."):
+                continue
+            with contextlib.suppress(OSError):
+                st = blob.stat()
+                blobs.append((st.st_mtime, st.st_size, blob))
+        total = sum(size for _, size, _ in blobs)
+        for _, size, blob in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if blob.name == keep:
+                continue
+            with contextlib.suppress(OSError):
+                blob.chmod(0o644)
+                blob.unlink()
+                discard_digests(blob)
+                total -= size
+
+    def record(self, url: str, digest: str) -> None:
+        """Remember that ``url`` served the blob ``digest``."""
+        if not self.indexable(url):
+            return
+        index_path = self._index_path(url)
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "size": self.blob_path(digest).stat().st_size,
+            "stored_at": time.time(),
+        }
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(index_path)
+
+    def materialize(self, digest: str, dest: Path) -> str:
+        """Place the blob for ``digest`` at ``dest``.
+
+        Returns:
+            The method used (see `link_or_copy`).
+
+        """
+        blob = self.blob_path(digest)
+        digests = cached_digests(blob) or {"sha256": digest}
+        method = link_or_copy(blob, dest)
+        _touch(blob, digests)
+        record_digests(dest, digests)
+        return method
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Process-wide cookie jars shared by every HTTP client.
+
+A Netscape ``cookies.txt`` file is parsed once into an
+`http.cookiejar.MozillaCookieJar` that httpx clients use directly, so cookies
+set by servers (e.g. Cloudflare clearance on APKMirror) are sent on every
+later request of the build, not just the ones that re-read the file. Stores
+are written back atomically on `CookieStore.save` and at process exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import http.cookiejar
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+def default_cookie_file() -> Path | None:
+    """Cookie file named by COOKIE_FILE, or None to keep cookies in memory."""
+    value = os.environ.get("COOKIE_FILE")
+    return Path(value) if value else None
+
+
+class CookieStore:
+    """A cookie jar loaded once from ``path`` and saved back on demand.
+
+    Attributes:
+        path: Netscape cookie file, or None for an in-memory jar.
+        jar: The shared jar; pass it as ``cookies=`` to httpx clients.
+
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Load ``path`` if it exists.
+
+        Args:
+            path: Netscape cookie file, or None for an in-memory jar.
+
+        """
+        self.path = path
+        self.jar = http.cookiejar.MozillaCookieJar()
+        self._lock = threading.Lock()
+        if path is not None and path.is_file():
+            try:
+                self.jar.load(str(path), ignore_discard=True, ignore_expires=True)
+            except OSError, http.cookiejar.LoadError:
+                self.jar.clear()
+
+    def save(self) -> None:
+        """Write the jar to ``path`` atomically (no-op for in-memory stores)."""
+        if self.path is None:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+            os.close(fd)
+            try:
+                self.jar.save(tmp_name, ignore_discard=True, ignore_expires=True)
+                Path(tmp_name).replace(self.path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    Path(tmp_name).unlink()
+                raise
+
+
+class _StoreRegistry:
+    """Process-wide map of cookie file to `CookieStore`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stores: dict[Path | None, CookieStore] = {}
+
+    def get(self, path: Path | None) -> CookieStore:
+        key = path.resolve() if path is not None else default_cookie_file()
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = self._stores[key] = CookieStore(key)
+            return store
+
+    def save_all(self) -> None:
+        with self._lock:
+            stores = list(self._stores.values())
+        for store in stores:
+            with contextlib.suppress(OSError):
+                store.save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores.clear()
+
+
+_STORES = _StoreRegistry()
+atexit.register(_STORES.save_all)
+
+
+def cookie_store(path: Path | None = None) -> CookieStore:
+    """Return the shared store for ``path``.
+
+    Args:
+        path: Cookie file; None selects the default store (COOKIE_FILE, or
+            in-memory when unset).
+
+    """
+    return _STORES.get(path)
+
+
+def save_cookie_stores() -> None:
+    """Write every store with a backing file."""
+    _STORES.save_all()
+
+
+def reset_cookie_stores() -> None:
+    """Forget all stores without saving them."""
+    _STORES.clear()
@@ -4,39 +4,91 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import collections
 import contextlib
+import contextvars
 import hashlib
+import itertools
+import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+import weakref
 from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import IO, TYPE_CHECKING, Any, ClassVar
+from typing import IO, TYPE_CHECKING, Any, ClassVar, cast
 
 import httpx
 
 from scripts.lib import logging as log
-
+from scripts.utils.artifacts import (
+    ArtifactStore,
+    StreamDigest,
+    default_artifact_dir,
+    discard_digests,
+    file_sha256,
+    move_with_digests,
+    record_digests,
+)
+from scripts.utils.cookies import cookie_store
+from scripts.utils.retry import RetryPolicy
+
+fcntl: ModuleType | None
 try:
     import fcntl
 except ImportError:
     fcntl = None
 
+msvcrt: ModuleType | None
 try:
     import msvcrt
 except ImportError:
     msvcrt = None
 
+h2: ModuleType | None
+try:
+    import h2
+except ImportError:
+    h2 = None
+
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import AsyncIterator, Callable, Iterator
+    from types import ModuleType
 
 DEFAULT_TIMEOUT = 300
 DEFAULT_MAX_RETRIES = 4
 DEFAULT_INITIAL_DELAY = 2
+# Wall-clock budget for one request including retries; long enough for a
+# large download to be resumed a few times.
+DEFAULT_RETRY_DEADLINE = 900.0
+# Read/write granularity for streamed downloads; bounds peak memory per
+# download regardless of artifact size.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Connection pool limits for the shared clients. With HTTP/2 every request to
+# a host is multiplexed over one connection, so these mostly cap HTTP/1.1
+# fallbacks (e.g. redirects to CDNs without h2). The per-host cap is the
+# download governor's (DEFAULT_DOWNLOAD_MAX_PER_HOST): every request holds
+# one of its host slots.
+POOL_MAX_CONNECTIONS = 32
+POOL_MAX_KEEPALIVE_CONNECTIONS = 16
+POOL_KEEPALIVE_EXPIRY = 30.0
+# Segmented downloads never split below this size per connection (aria2c's
+# --min-split-size default).
+SEGMENT_MIN_SIZE = 1024 * 1024
+# How long a cached GitHub API response is served without revalidation.
+DEFAULT_API_CACHE_TTL = 600
+# Concurrent transfers per host allowed by the download governor.
+DEFAULT_DOWNLOAD_MAX_PER_HOST = 4
+
+
+def _default_api_cache_dir() -> Path:
+    return Path(os.environ.get("CACHE_DIR", ".cache")) / "github-api"
 
 
 @dataclass
@@ -47,20 +99,401 @@ class HttpClientConfig:
         timeout: Request timeout in seconds.
         max_retries: Maximum number of retry attempts.
         initial_delay: Initial retry delay in seconds.
+        retry_deadline: Seconds after the first attempt past which no retry
+            is started, or None for no limit.
         connect_timeout: Connection timeout in seconds.
         user_agent: User agent string for requests.
         github_token: GitHub API token.
-        cookie_file: Path to cookie file.
+        cookie_file: Netscape cookie file backing the client's cookie jar
+            (see `scripts.utils.cookies`); None uses the default store.
+        api_cache_dir: Directory for cached GitHub API responses, or None
+            to disable the cache.
+        api_cache_ttl: Seconds a cached GitHub API response is reused
+            without contacting the API (GH_API_CACHE_TTL overrides it).
+        artifact_dir: Content-addressed store for immutable artifacts (see
+            `scripts.utils.artifacts`), or None to write outputs directly.
+            Off by default; `gh_dl` enables it for release assets.
 
     """
 
     timeout: int = DEFAULT_TIMEOUT
     max_retries: int = DEFAULT_MAX_RETRIES
     initial_delay: int = DEFAULT_INITIAL_DELAY
+    retry_deadline: float | None = DEFAULT_RETRY_DEADLINE
     connect_timeout: int = 10
     user_agent: str = "Mozilla/5.0 (X11; Linux x86_64; rv:142.0) Gecko/20100101 Firefox/142.0"
     github_token: str | None = field(default_factory=lambda: os.environ.get("GITHUB_TOKEN"), repr=False)
     cookie_file: Path | None = None
+    api_cache_dir: Path | None = field(default_factory=_default_api_cache_dir)
+    api_cache_ttl: int = field(
+        default_factory=lambda: int(os.environ.get("GH_API_CACHE_TTL", DEFAULT_API_CACHE_TTL)),
+    )
+    artifact_dir: Path | None = None
+
+
+type _PoolKey = tuple[int, int, str, Path | None]
+
+
+def _pool_key(config: HttpClientConfig) -> _PoolKey:
+    """Settings that must match for two configs to share a pooled client."""
+    return (config.timeout, config.connect_timeout, config.user_agent, config.cookie_file)
+
+
+def _client_options(config: HttpClientConfig) -> dict[str, Any]:
+    """Keyword arguments shared by every httpx client built from ``config``."""
+    return {
+        "timeout": httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        "headers": {"User-Agent": config.user_agent},
+        "cookies": cookie_store(config.cookie_file).jar,
+        "follow_redirects": True,
+        "http2": h2 is not None,
+        "limits": httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+class _ClientPool:
+    """Process-wide registry of lazily created, pooled httpx clients.
+
+    Sync clients are shared by every thread. Async clients are bound to the
+    event loop they were created on, so they are kept per loop and dropped
+    together with it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sync: dict[_PoolKey, httpx.Client] = {}
+        self._async: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[_PoolKey, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get_sync(self, config: HttpClientConfig) -> httpx.Client:
+        key = _pool_key(config)
+        with self._lock:
+            client = self._sync.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(**_client_options(config))
+                self._sync[key] = client
+            return client
+
+    def get_async(self, config: HttpClientConfig) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        key = _pool_key(config)
+        with self._lock:
+            clients = self._async.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(**_client_options(config))
+                clients[key] = client
+            return client
+
+    async def aclose_loop(self) -> None:
+        """Close the async clients bound to the running event loop."""
+        with self._lock:
+            clients = self._async.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def close(self) -> None:
+        """Close every pooled client; registered to run at process exit."""
+        with self._lock:
+            sync_clients = list(self._sync.values())
+            self._sync.clear()
+            async_clients = list(self._async.items())
+            self._async.clear()
+        for client in sync_clients:
+            client.close()
+        for loop, clients in async_clients:
+            if loop.is_closed() or loop.is_running():
+                # Sockets of a finished loop are released at process exit.
+                continue
+            for async_client in clients.values():
+                with contextlib.suppress(Exception):
+                    loop.run_until_complete(async_client.aclose())
+
+
+_CLIENT_POOL = _ClientPool()
+atexit.register(_CLIENT_POOL.close)
+
+
+def close_shared_clients() -> None:
+    """Close all pooled clients (normally done automatically at exit)."""
+    _CLIENT_POOL.close()
+
+
+async def aclose_shared_clients() -> None:
+    """Close the pooled async clients of the running event loop.
+
+    Call before the loop ends (e.g. at the end of an ``asyncio.run`` main);
+    clients of a finished loop can no longer be closed cleanly.
+    """
+    await _CLIENT_POOL.aclose_loop()
+
+
+_BYTE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_byte_rate(value: str | int | None) -> int:
+    """Parse an aria2c-style byte count such as ``"512K"`` or ``"2M"``.
+
+    Args:
+        value: Bytes as an int or string with an optional K/M/G suffix
+            (powers of 1024). None, 0 and empty strings mean unlimited.
+
+    Returns:
+        Number of bytes; 0 for unlimited.
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+
+    """
+    if value is None or value == "":
+        return 0
+    if isinstance(value, int):
+        return max(0, value)
+    text = value.strip().upper()
+    multiplier = 1
+    if text and text[-1] in _BYTE_SUFFIXES:
+        multiplier = _BYTE_SUFFIXES[text[-1]]
+        text = text[:-1]
+    try:
+        return max(0, int(float(text) * multiplier))
+    except ValueError:
+        raise ValueError(f"Invalid byte rate: {value!r}") from None
+
+
+_DOWNLOAD_JOB: contextvars.ContextVar[str | None] = contextvars.ContextVar("download_job", default=None)
+
+
+@contextlib.contextmanager
+def download_job(name: str) -> Iterator[None]:
+    """Label downloads started in this context as belonging to job ``name``.
+
+    The governor queues waiting downloads fairly between jobs. Without a
+    label, each thread counts as its own job. The label propagates into
+    ``asyncio.run``, ``asyncio.to_thread`` and tasks.
+    """
+    token = _DOWNLOAD_JOB.set(name)
+    try:
+        yield
+    finally:
+        _DOWNLOAD_JOB.reset(token)
+
+
+def _current_download_job() -> str:
+    return _DOWNLOAD_JOB.get() or threading.current_thread().name
+
+
+@dataclass(eq=False)
+class _SlotWaiter:
+    """A download queued for a host slot; woken by event (thread) or future (task)."""
+
+    job: str
+    host: str
+    event: threading.Event | None = None
+    future: asyncio.Future[None] | None = None
+    granted: bool = False
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.future is not None:
+            future = self.future
+            with contextlib.suppress(RuntimeError):
+                future.get_loop().call_soon_threadsafe(
+                    lambda: None if future.done() else future.set_result(None),
+                )
+
+
+class DownloadGovernor:
+    """Process-wide limits shared by every download, sync or async.
+
+    * At most ``max_per_host`` transfers run against one host at a time.
+    * Waiting transfers are granted slots round-robin between jobs (see
+      `download_job`), so one build cannot starve the others.
+    * Transferred bytes draw from a token bucket refilled at
+      ``bandwidth_limit`` bytes per second, capping the aggregate rate.
+
+    Attributes:
+        max_per_host: Concurrent transfers per host; 0 for unlimited.
+        bandwidth_limit: Aggregate bytes per second; 0 for unlimited.
+
+    """
+
+    def __init__(self, max_per_host: int = DEFAULT_DOWNLOAD_MAX_PER_HOST, bandwidth_limit: int = 0) -> None:
+        """Initialize the governor.
+
+        Args:
+            max_per_host: Concurrent transfers per host; 0 for unlimited.
+            bandwidth_limit: Aggregate bytes per second; 0 for unlimited.
+
+        """
+        self._lock = threading.Lock()
+        self._in_flight: collections.Counter[str] = collections.Counter()
+        self._queues: dict[str, collections.deque[_SlotWaiter]] = {}
+        # Grant sequence number per job; the least recently served job goes next.
+        self._last_served: dict[str, int] = {}
+        self._grants = itertools.count()
+        self._bw_lock = threading.Lock()
+        self._tokens = 0.0
+        self._refilled = time.monotonic()
+        self.max_per_host = max_per_host
+        self.bandwidth_limit = bandwidth_limit
+
+    @classmethod
+    def from_env(cls) -> DownloadGovernor:
+        """Build a governor from DOWNLOAD_MAX_PER_HOST and DOWNLOAD_BANDWIDTH_LIMIT."""
+        return cls(
+            max_per_host=int(os.environ.get("DOWNLOAD_MAX_PER_HOST", DEFAULT_DOWNLOAD_MAX_PER_HOST)),
+            bandwidth_limit=parse_byte_rate(os.environ.get("DOWNLOAD_BANDWIDTH_LIMIT")),
+        )
+
+    def configure(self, *, max_per_host: int | None = None, bandwidth_limit: int | None = None) -> None:
+        """Change limits; queued transfers are re-evaluated immediately."""
+        with self._lock:
+            if max_per_host is not None:
+                self.max_per_host = max_per_host
+            if bandwidth_limit is not None:
+                self.bandwidth_limit = bandwidth_limit
+            self._dispatch()
+
+    def in_flight(self, host: str) -> int:
+        """Transfers currently holding a slot for ``host``."""
+        with self._lock:
+            return self._in_flight[host]
+
+    def _has_capacity(self, host: str) -> bool:
+        return self.max_per_host <= 0 or self._in_flight[host] < self.max_per_host
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters, round-robin across jobs. Lock held."""
+        while True:
+            chosen: _SlotWaiter | None = None
+            for job, queue in self._queues.items():
+                waiter = next((w for w in queue if self._has_capacity(w.host)), None)
+                if waiter is not None and (
+                    chosen is None or self._last_served.get(job, -1) < self._last_served.get(chosen.job, -1)
+                ):
+                    chosen = waiter
+            if chosen is None:
+                return
+            waiter = chosen
+            queue = self._queues[waiter.job]
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.job]
+            self._last_served[waiter.job] = next(self._grants)
+            self._in_flight[waiter.host] += 1
+            waiter.granted = True
+            waiter.wake()
+
+    def _enqueue(self, waiter: _SlotWaiter) -> None:
+        with self._lock:
+            self._queues.setdefault(waiter.job, collections.deque()).append(waiter)
+            self._dispatch()
+
+    def _release(self, waiter: _SlotWaiter) -> None:
+        with self._lock:
+            self._in_flight[waiter.host] -= 1
+            if self._in_flight[waiter.host] <= 0:
+                del self._in_flight[waiter.host]
+            if waiter.job not in self._queues:
+                self._last_served.pop(waiter.job, None)
+            self._dispatch()
+
+    def _abandon(self, waiter: _SlotWaiter) -> None:
+        """Withdraw a cancelled waiter, returning its slot if already granted."""
+        with self._lock:
+            if not waiter.granted:
+                queue = self._queues.get(waiter.job)
+                if queue is not None:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[waiter.job]
+                return
+        self._release(waiter)
+
+    @contextlib.contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Hold a transfer slot for the host of ``url`` (blocking)."""
+        waiter = _SlotWaiter(_current_download_job(), httpx.URL(url).host, event=threading.Event())
+        self._enqueue(waiter)
+        waiter.event.wait()  # type: ignore[union-attr]
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, url: str) -> AsyncIterator[None]:
+        """Async counterpart of `slot`."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiter = _SlotWaiter(_current_download_job(), httpx.URL(url).host, future=future)
+        self._enqueue(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def _reserve(self, nbytes: int) -> float:
+        """Take ``nbytes`` from the bandwidth bucket; return the seconds to wait."""
+        rate = self.bandwidth_limit
+        if rate <= 0:
+            return 0.0
+        with self._bw_lock:
+            now = time.monotonic()
+            burst = max(rate, DOWNLOAD_CHUNK_SIZE)
+            self._tokens = min(burst, self._tokens + (now - self._refilled) * rate) - nbytes
+            self._refilled = now
+            return max(0.0, -self._tokens / rate)
+
+    def throttle(self, nbytes: int) -> None:
+        """Account for ``nbytes`` received, sleeping to respect the bandwidth cap."""
+        delay = self._reserve(nbytes)
+        if delay:
+            time.sleep(delay)
+
+    async def athrottle(self, nbytes: int) -> None:
+        """Async counterpart of `throttle`."""
+        delay = self._reserve(nbytes)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_DOWNLOAD_GOVERNOR = DownloadGovernor.from_env()
+
+
+def download_governor() -> DownloadGovernor:
+    """The process-wide `DownloadGovernor` shared by all download paths."""
+    return _DOWNLOAD_GOVERNOR
+
+
+def configure_download_governor(
+    *,
+    max_per_host: int | None = None,
+    bandwidth_limit: str | int | None = None,
+) -> None:
+    """Apply configured download limits to the shared governor.
+
+    Args:
+        max_per_host: Concurrent transfers per host; 0 for unlimited, None
+            to keep the current value.
+        bandwidth_limit: Aggregate rate such as ``"2M"`` (bytes/s); 0 for
+            unlimited, None to keep the current value.
+
+    """
+    _DOWNLOAD_GOVERNOR.configure(
+        max_per_host=max_per_host,
+        bandwidth_limit=None if bandwidth_limit is None else parse_byte_rate(bandwidth_limit),
+    )
 
 
 class HttpClient:
@@ -83,19 +516,22 @@ class HttpClient:
 
     CONFIG: ClassVar[type[HttpClientConfig]] = HttpClientConfig
 
-    def __init__(self, config: HttpClientConfig | None = None) -> None:
+    def __init__(self, config: HttpClientConfig | None = None, *, pooled: bool = False) -> None:
         """Initialize HTTP client with optional configuration.
 
         Args:
             config: Optional configuration object. Uses default if None.
+            pooled: Borrow the process-wide shared clients (kept-alive
+                connections, HTTP/2) instead of owning private ones. Closing
+                a pooled HttpClient leaves the shared clients open.
 
         """
         self.config = config or self.CONFIG()
-        self._sync_client = httpx.Client(
-            timeout=httpx.Timeout(self.config.timeout),
-            headers={"User-Agent": self.config.user_agent},
-            follow_redirects=True,
-        )
+        self.pooled = pooled
+        if pooled:
+            self._sync_client = _CLIENT_POOL.get_sync(self.config)
+        else:
+            self._sync_client = httpx.Client(**_client_options(self.config))
         self._async_client: httpx.AsyncClient | None = None
 
     def __enter__(self) -> HttpClient:
@@ -104,48 +540,46 @@ class HttpClient:
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Exit context manager and close clients."""
-        self._sync_client.close()
-        if self._async_client:
-            pass
+        if not self.pooled:
+            self._sync_client.close()
+            self._save_cookies()
 
     async def __aenter__(self) -> HttpClient:
         """Enter async context manager."""
-        self._async_client = httpx.AsyncClient(
-            timeout=httpx.Timeout(self.config.timeout),
-            headers={"User-Agent": self.config.user_agent},
-            follow_redirects=True,
-        )
+        if self.pooled:
+            self._async_client = _CLIENT_POOL.get_async(self.config)
+        else:
+            self._async_client = httpx.AsyncClient(**_client_options(self.config))
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Exit async context manager and close clients."""
+        if self.pooled:
+            self._async_client = None
+            return
         if self._async_client:
             await self._async_client.aclose()
         self._sync_client.close()
+        await asyncio.to_thread(self._save_cookies)
 
-    def _get_cookie_header(self) -> dict[str, str]:
-        """Load cookies from cookie file if configured."""
-        if not self.config.cookie_file or not self.config.cookie_file.exists():
-            return {}
-        cookies = {}
+    def _save_cookies(self) -> None:
+        """Persist the shared cookie jar (pooled clients save at exit)."""
         try:
-            content = self.config.cookie_file.read_text()
-            for line in content.splitlines():
-                if line.startswith("#") or not line.strip():
-                    continue
-                parts = line.split("\t")
-                if len(parts) >= 7:
-                    cookies[parts[5]] = parts[6]
-        except OSError:
-            pass
-        return cookies
+            cookie_store(self.config.cookie_file).save()
+        except OSError as e:
+            log.warn(f"Could not save cookies: {e}")
+
+    @property
+    def _retry_policy(self) -> RetryPolicy:
+        return RetryPolicy(
+            max_retries=self.config.max_retries,
+            initial_delay=self.config.initial_delay,
+            deadline=self.config.retry_deadline,
+        )
 
     def _build_headers(self, extra_headers: dict[str, str] | None = None) -> dict[str, str]:
-        """Build headers dictionary with cookies and extra headers."""
-        headers = self._get_cookie_header()
-        if extra_headers:
-            headers.update(extra_headers)
-        return headers
+        """Build per-request headers; cookies come from the client's jar."""
+        return dict(extra_headers or {})
 
     def _retry_with_backoff(
         self,
@@ -153,7 +587,7 @@ class HttpClient:
         *args: Any,
         **kwargs: Any,
     ) -> httpx.Response:
-        """Execute request with retry logic and exponential backoff.
+        """Execute request under the client's `RetryPolicy`.
 
         Args:
             func: Request function to execute.
@@ -161,29 +595,14 @@ class HttpClient:
             **kwargs: Keyword arguments for the function.
 
         Returns:
-            Response object from successful request.
+            Result of the last attempt.
 
         Raises:
-            httpx.HTTPError: If all retry attempts fail.
+            httpx.HTTPError: If the error is not retryable or retries are
+                exhausted.
 
         """
-        delay = self.config.initial_delay
-        last_exception: Exception | None = None
-
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                return func(*args, **kwargs)
-            except httpx.HTTPError as e:
-                last_exception = e
-                if attempt < self.config.max_retries:
-                    time.sleep(delay)
-                    delay *= 2
-                else:
-                    break
-
-        if last_exception:
-            raise last_exception
-        raise httpx.HTTPError("Request failed after retries")
+        return self._retry_policy.call(func, *args, **kwargs)
 
     async def _async_retry_with_backoff(
         self,
@@ -191,7 +610,7 @@ class HttpClient:
         *args: Any,
         **kwargs: Any,
     ) -> httpx.Response:
-        """Execute async request with retry logic and exponential backoff.
+        """Execute async request under the client's `RetryPolicy`.
 
         Args:
             func: Async request function to execute.
@@ -199,29 +618,14 @@ class HttpClient:
             **kwargs: Keyword arguments for the function.
 
         Returns:
-            Response object from successful request.
+            Result of the last attempt.
 
         Raises:
-            httpx.HTTPError: If all retry attempts fail.
+            httpx.HTTPError: If the error is not retryable or retries are
+                exhausted.
 
         """
-        delay = self.config.initial_delay
-        last_exception: Exception | None = None
-
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                return await func(*args, **kwargs)
-            except httpx.HTTPError as e:
-                last_exception = e
-                if attempt < self.config.max_retries:
-                    await asyncio.sleep(delay)
-                    delay *= 2
-                else:
-                    break
-
-        if last_exception:
-            raise last_exception
-        raise httpx.HTTPError("Request failed after retries")
+        return await self._retry_policy.acall(func, *args, **kwargs)
 
     def _do_request(
         self,
@@ -229,6 +633,8 @@ class HttpClient:
         url: str,
         output: str | Path | None = None,
         headers: dict[str, str] | None = None,
+        *,
+        resume: bool = False,
         **kwargs: Any,
     ) -> str | bytes:
         """Execute HTTP request with retry logic.
@@ -238,6 +644,8 @@ class HttpClient:
             url: Request URL.
             output: Output file path or None for response content.
             headers: Additional headers for the request.
+            resume: Continue a partial ``output`` file with a Range request
+                (see `_resume_request_headers`). Ignored without an output file.
             **kwargs: Additional arguments for httpx request.
 
         Returns:
@@ -247,25 +655,78 @@ class HttpClient:
         """
         full_headers = self._build_headers(headers)
 
-        def request_func() -> httpx.Response:
-            return self._sync_client.request(method, url, headers=full_headers, **kwargs)
+        if output == "-" or output is None:
 
-        response = self._retry_with_backoff(request_func)
+            def request_func() -> httpx.Response:
+                with _DOWNLOAD_GOVERNOR.slot(url):
+                    return self._sync_client.request(method, url, headers=full_headers, **kwargs)
 
-        if output == "-" or output is None:
+            response = self._retry_with_backoff(request_func)
             return response.text
 
         output_path = Path(output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_bytes(response.content)
+        self._retry_with_backoff(self._stream_to_file, method, url, output_path, full_headers, resume=resume, **kwargs)
         return ""
 
+    def _stream_to_file(
+        self,
+        method: str,
+        url: str,
+        output_path: Path,
+        headers: dict[str, str],
+        *,
+        resume: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Stream a response body to disk in bounded chunks.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            output_path: File to write the body to.
+            headers: Request headers.
+            resume: Append to an existing partial ``output_path`` via a Range
+                request when its resume sidecar still validates.
+            **kwargs: Additional arguments for httpx request.
+
+        Returns:
+            The (closed) response, for status and header inspection.
+
+        Raises:
+            httpx.HTTPStatusError: If the server answered with an error status.
+
+        """
+        while True:
+            range_headers, offset = _resume_request_headers(output_path, url) if resume else ({}, 0)
+            with (
+                _DOWNLOAD_GOVERNOR.slot(url),
+                self._sync_client.stream(method, url, headers={**headers, **range_headers}, **kwargs) as response,
+            ):
+                mode = _partial_write_mode(response, offset)
+                if mode is None:
+                    _clear_resume_state(output_path)
+                    continue
+                response.raise_for_status()
+                if resume:
+                    _save_resume_meta(output_path, url, response)
+                digest = _start_digest(output_path, mode)
+                with output_path.open(mode) as f:
+                    for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        _DOWNLOAD_GOVERNOR.throttle(len(chunk))
+                        f.write(chunk)
+                        digest.update(chunk)
+            record_digests(output_path, digest.hexdigests())
+            return response
+
     async def _async_do_request(
         self,
         method: str,
         url: str,
         output: str | Path | None = None,
         headers: dict[str, str] | None = None,
+        *,
+        resume: bool = False,
         **kwargs: Any,
     ) -> str | bytes:
         """Execute async HTTP request with retry logic.
@@ -275,6 +736,8 @@ class HttpClient:
             url: Request URL.
             output: Output file path or None for response content.
             headers: Additional headers for the request.
+            resume: Continue a partial ``output`` file with a Range request
+                (see `_resume_request_headers`). Ignored without an output file.
             **kwargs: Additional arguments for httpx request.
 
         Returns:
@@ -288,19 +751,121 @@ class HttpClient:
 
         full_headers = self._build_headers(headers)
 
-        async def request_func() -> httpx.Response:
-            return await client.request(method, url, headers=full_headers, **kwargs)
+        if output == "-" or output is None:
 
-        response = await self._async_retry_with_backoff(request_func)
+            async def request_func() -> httpx.Response:
+                async with _DOWNLOAD_GOVERNOR.aslot(url):
+                    return await client.request(method, url, headers=full_headers, **kwargs)
 
-        if output == "-" or output is None:
+            response = await self._async_retry_with_backoff(request_func)
             return response.text
 
         output_path = Path(output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_bytes(response.content)
+        await self._async_retry_with_backoff(
+            self._async_stream_to_file, client, method, url, output_path, full_headers, resume=resume, **kwargs
+        )
         return ""
 
+    async def _async_stream_to_file(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        output_path: Path,
+        headers: dict[str, str],
+        *,
+        resume: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Async counterpart of `_stream_to_file`.
+
+        Args:
+            client: Async client to issue the request with.
+            method: HTTP method.
+            url: Request URL.
+            output_path: File to write the body to.
+            headers: Request headers.
+            resume: Append to an existing partial ``output_path`` via a Range
+                request when its resume sidecar still validates.
+            **kwargs: Additional arguments for httpx request.
+
+        Returns:
+            The (closed) response, for status and header inspection.
+
+        Raises:
+            httpx.HTTPStatusError: If the server answered with an error status.
+
+        """
+        while True:
+            range_headers, offset = _resume_request_headers(output_path, url) if resume else ({}, 0)
+            async with (
+                _DOWNLOAD_GOVERNOR.aslot(url),
+                client.stream(method, url, headers={**headers, **range_headers}, **kwargs) as response,
+            ):
+                mode = _partial_write_mode(response, offset)
+                if mode is None:
+                    _clear_resume_state(output_path)
+                    continue
+                response.raise_for_status()
+                if resume:
+                    _save_resume_meta(output_path, url, response)
+                digest = await asyncio.to_thread(_start_digest, output_path, mode)
+                with output_path.open(mode) as f:
+                    async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        await _DOWNLOAD_GOVERNOR.athrottle(len(chunk))
+                        f.write(chunk)
+                        digest.update(chunk)
+            record_digests(output_path, digest.hexdigests())
+            return response
+
+    def fetch(self, url: str, headers: dict[str, str] | None = None, **kwargs: Any) -> httpx.Response:
+        """Perform GET request and return the response itself.
+
+        Unlike `get`, status and headers stay available to the caller (e.g.
+        for conditional requests). Error statuses are not raised.
+
+        Args:
+            url: Request URL.
+            headers: Additional headers for the request.
+            **kwargs: Additional arguments for httpx request.
+
+        Returns:
+            Response object from the last attempt.
+
+        """
+        return self._fetch_response("GET", url, headers, **kwargs)
+
+    def head(self, url: str, headers: dict[str, str] | None = None, **kwargs: Any) -> httpx.Response:
+        """Perform HEAD request and return the response itself (see `fetch`).
+
+        Args:
+            url: Request URL.
+            headers: Additional headers for the request.
+            **kwargs: Additional arguments for httpx request.
+
+        Returns:
+            Response object from the last attempt.
+
+        """
+        return self._fetch_response("HEAD", url, headers, **kwargs)
+
+    def _fetch_response(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Request ``url`` under a host slot and the retry policy, returning the response."""
+        full_headers = self._build_headers(headers)
+
+        def request_func() -> httpx.Response:
+            with _DOWNLOAD_GOVERNOR.slot(url):
+                return self._sync_client.request(method, url, headers=full_headers, **kwargs)
+
+        return self._retry_with_backoff(request_func)
+
     def get(self, url: str, output: str | Path | None = None, **kwargs: Any) -> str | bytes:
         """Perform GET request.
 
@@ -361,6 +926,29 @@ class HttpClient:
         """
         return self._do_request("DELETE", url, output, **kwargs)
 
+    async def async_fetch(self, url: str, headers: dict[str, str] | None = None, **kwargs: Any) -> httpx.Response:
+        """Async counterpart of `fetch`.
+
+        Args:
+            url: Request URL.
+            headers: Additional headers for the request.
+            **kwargs: Additional arguments for httpx request.
+
+        Returns:
+            Response object from the last attempt.
+
+        """
+        if not self._async_client:
+            raise RuntimeError("Async client not initialized. Use 'async with' context.")
+        client = self._async_client
+        full_headers = self._build_headers(headers)
+
+        async def request_func() -> httpx.Response:
+            async with _DOWNLOAD_GOVERNOR.aslot(url):
+                return await client.request("GET", url, headers=full_headers, **kwargs)
+
+        return await self._async_retry_with_backoff(request_func)
+
     async def async_get(self, url: str, output: str | Path | None = None, **kwargs: Any) -> str | bytes:
         """Perform async GET request.
 
@@ -391,8 +979,117 @@ class HttpClient:
         """
         return await self._async_do_request("POST", url, output, **kwargs)
 
+    async def async_segmented_get(
+        self,
+        url: str,
+        output: str | Path,
+        *,
+        segments: int,
+        headers: dict[str, str] | None = None,
+    ) -> bool:
+        """Download ``url`` over several concurrent Range requests.
+
+        Probes byte-range support with a one-byte ranged GET, preallocates a
+        sparse ``output`` of the advertised size and fills it with up to
+        ``segments`` parallel ranged streams. Each segment retries on its own
+        and continues from the last byte it wrote.
+
+        Args:
+            url: Request URL.
+            output: Output file path.
+            segments: Maximum number of concurrent connections.
+            headers: Additional headers for the requests.
+
+        Returns:
+            True if the file was downloaded in segments, False (with nothing
+            written) if the server does not support ranges or the file is
+            too small to be worth splitting.
+
+        Raises:
+            httpx.HTTPError: If a segment fails after all retries.
+
+        """
+        if not self._async_client:
+            raise RuntimeError("Async client not initialized. Use 'async with' context.")
+        client = self._async_client
+        full_headers = self._build_headers(headers)
+
+        async def probe() -> httpx.Response:
+            async with client.stream("GET", url, headers={**full_headers, "Range": "bytes=0-0"}) as response:
+                response.raise_for_status()
+                return response
+
+        probe_response = await self._async_retry_with_backoff(probe)
+        size = _range_total_size(probe_response)
+        if size is None:
+            return False
+        count = min(segments, size // SEGMENT_MIN_SIZE)
+        if count < 2:
+            return False
+
+        # Fetch segments from the post-redirect URL (often a signed CDN link)
+        # and never forward credentials to a different host.
+        final_url = probe_response.url
+        segment_headers = dict(full_headers)
+        if final_url.host != httpx.URL(url).host:
+            segment_headers.pop("Authorization", None)
+
+        output_path = Path(output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # A sparse file with holes must never be mistaken for a resumable one.
+        _clear_resume_state(output_path)
+        with output_path.open("wb") as f:
+            f.truncate(size)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for start, end in _segment_bounds(size, count):
+                    group.create_task(
+                        self._async_fetch_segment(client, str(final_url), segment_headers, output_path, start, end)
+                    )
+        except ExceptionGroup as exc:
+            raise exc.exceptions[0] from exc
+        return True
+
+    async def _async_fetch_segment(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        output_path: Path,
+        start: int,
+        end: int,
+    ) -> None:
+        """Fill bytes ``start``..``end`` (inclusive) of ``output_path``."""
+        position = start
+
+        async def fetch() -> httpx.Response:
+            nonlocal position
+            async with (
+                _DOWNLOAD_GOVERNOR.aslot(url),
+                client.stream("GET", url, headers={**headers, "Range": f"bytes={position}-{end}"}) as response,
+            ):
+                response.raise_for_status()
+                if response.status_code != httpx.codes.PARTIAL_CONTENT:
+                    raise httpx.HTTPError(f"Server ignored Range request for {url}")
+                with output_path.open("r+b") as f:
+                    f.seek(position)
+                    async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        await _DOWNLOAD_GOVERNOR.athrottle(len(chunk))
+                        f.write(chunk[: end + 1 - position])
+                        position += len(chunk)
+                        if position > end:
+                            break
+            if position <= end:
+                raise httpx.RemoteProtocolError(f"Segment {start}-{end} of {url} ended early at byte {position}")
+            return response
+
+        await self._async_retry_with_backoff(fetch)
+
     def close(self) -> None:
         """Close the HTTP client and release resources."""
+        if self.pooled:
+            return
         self._sync_client.close()
         if self._async_client:
             import asyncio
@@ -400,6 +1097,136 @@ class HttpClient:
             asyncio.get_event_loop().run_until_complete(self._async_client.aclose())
 
 
+def _resume_meta_path(part_path: Path) -> Path:
+    """Sidecar file holding the validators of a partial download."""
+    return part_path.with_name(part_path.name + ".resume.json")
+
+
+def _resume_request_headers(part_path: Path, url: str) -> tuple[dict[str, str], int]:
+    """Build Range/If-Range headers to continue a partial download.
+
+    A partial file is only resumed when its sidecar was written for the same
+    URL and carries a validator usable in ``If-Range`` (a strong ETag, or
+    Last-Modified). If the resource changed since, the server answers with a
+    full 200 response and the partial file is overwritten.
+
+    Args:
+        part_path: Partial download file.
+        url: URL being downloaded.
+
+    Returns:
+        Tuple of (extra request headers, byte offset to resume from).
+
+    """
+    try:
+        offset = part_path.stat().st_size
+        meta = json.loads(_resume_meta_path(part_path).read_text(encoding="utf-8"))
+    except OSError, ValueError:
+        return {}, 0
+    if offset <= 0 or not isinstance(meta, dict) or meta.get("url") != url:
+        return {}, 0
+    etag = meta.get("etag") or ""
+    validator = etag if etag and not etag.startswith("W/") else meta.get("last_modified")
+    if not validator:
+        return {}, 0
+    return {"Range": f"bytes={offset}-", "If-Range": validator}, offset
+
+
+def _partial_write_mode(response: httpx.Response, offset: int) -> str | None:
+    """Pick the file mode for a (possibly ranged) download response.
+
+    Args:
+        response: Response to a request built by `_resume_request_headers`.
+        offset: Byte offset that was requested, 0 for a full download.
+
+    Returns:
+        ``"ab"`` to append a matching 206 body, ``"wb"`` to (re)write the file
+        from scratch, or None if the partial file is unusable (unsatisfiable
+        or misaligned range) and the request must be repeated without it.
+
+    """
+    if not offset:
+        return "wb"
+    if response.status_code == httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE:
+        return None
+    if response.status_code != httpx.codes.PARTIAL_CONTENT:
+        return "wb"
+    content_range = response.headers.get("Content-Range", "")
+    if not content_range.startswith(f"bytes {offset}-"):
+        return None
+    return "ab"
+
+
+def _start_digest(output_path: Path, mode: str) -> StreamDigest:
+    """Digest for a streamed download, seeded with the partial being resumed."""
+    digest = StreamDigest()
+    if mode == "ab":
+        digest.update_from_file(output_path)
+    return digest
+
+
+def _save_resume_meta(part_path: Path, url: str, response: httpx.Response) -> None:
+    """Record the validators needed to resume ``part_path`` later."""
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    if response.status_code == httpx.codes.PARTIAL_CONTENT:
+        # 206 responses may omit validators; keep the ones we resumed with.
+        with contextlib.suppress(OSError, ValueError):
+            previous = json.loads(_resume_meta_path(part_path).read_text(encoding="utf-8"))
+            meta["etag"] = meta["etag"] or previous.get("etag")
+            meta["last_modified"] = meta["last_modified"] or previous.get("last_modified")
+    _resume_meta_path(part_path).write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _clear_resume_state(part_path: Path) -> None:
+    """Remove a partial download and its resume and digest sidecars."""
+    for path in (part_path, _resume_meta_path(part_path)):
+        with contextlib.suppress(OSError):
+            path.unlink()
+    discard_digests(part_path)
+
+
+def _range_total_size(response: httpx.Response) -> int | None:
+    """Total resource size from a 206 probe, or None if ranges are unsupported."""
+    if response.status_code != httpx.codes.PARTIAL_CONTENT:
+        return None
+    _, _, total = response.headers.get("Content-Range", "").partition("/")
+    return int(total) if total.isdigit() else None
+
+
+def _segment_bounds(size: int, count: int) -> list[tuple[int, int]]:
+    """Split ``size`` bytes into ``count`` contiguous inclusive byte ranges."""
+    step = -(-size // count)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def _segmented_download(
+    url: str,
+    output_path: Path,
+    config: HttpClientConfig | None,
+    headers: dict[str, str] | None,
+    segments: int,
+) -> bool:
+    """Blocking wrapper around `HttpClient.async_segmented_get`.
+
+    Uses the pooled client of the temporary event loop (closed before the
+    loop ends) rather than a private one, so the cookie jar is not rewritten
+    per download.
+    """
+
+    async def run() -> bool:
+        try:
+            async with HttpClient(config, pooled=True) as client:
+                return await client.async_segmented_get(url, output_path, segments=segments, headers=headers)
+        finally:
+            await aclose_shared_clients()
+
+    return asyncio.run(run())
+
+
 SECURE_WORK_DIR_MODE = 0o700
 INSECURE_PERMISSION_MASK = 0o077
 
@@ -407,7 +1234,7 @@ INSECURE_PERMISSION_MASK = 0o077
 def _lock_fd(fd: IO[str]) -> None:
     """Acquire an exclusive lock on a file descriptor (POSIX or Windows)."""
     if fcntl is not None:
-        fcntl.flock(fd.fileno(), fcntl.LOCK_EX)  # type: ignore  # noqa: PGH003
+        fcntl.flock(fd.fileno(), fcntl.LOCK_EX)
     elif msvcrt is not None:
         fd.write("\0")
         fd.flush()
@@ -418,7 +1245,7 @@ def _lock_fd(fd: IO[str]) -> None:
 def _unlock_fd(fd: IO[str]) -> None:
     """Release a lock acquired by `_lock_fd`."""
     if fcntl is not None:
-        fcntl.flock(fd.fileno(), fcntl.LOCK_UN)  # type: ignore  # noqa: PGH003
+        fcntl.flock(fd.fileno(), fcntl.LOCK_UN)
     elif msvcrt is not None:
         fd.seek(0)
         msvcrt.locking(fd.fileno(), msvcrt.LK_UNLCK, 1)
@@ -471,7 +1298,10 @@ def _get_secure_work_dir(temp_dir: Path, output_path: str | Path) -> Path:
 
 
 def _calculate_sha256(file_path: Path) -> str:
-    """Calculate SHA256 hash of a file using chunked reading.
+    """Calculate SHA256 hash of a file.
+
+    Served from the digest sidecar recorded while the file was downloaded
+    (or last hashed) when its size and mtime are unchanged.
 
     Args:
         file_path: Path to the file.
@@ -480,8 +1310,7 @@ def _calculate_sha256(file_path: Path) -> str:
         Hexadecimal representation of the SHA256 hash.
 
     """
-    with file_path.open("rb") as f:
-        return hashlib.file_digest(f, "sha256").hexdigest()
+    return file_sha256(file_path)
 
 
 def _verify_or_remove(file_path: Path, sha256: str | None) -> bool:
@@ -503,6 +1332,7 @@ def _verify_or_remove(file_path: Path, sha256: str | None) -> bool:
 
     with contextlib.suppress(OSError):
         file_path.unlink()
+    discard_digests(file_path)
     return False
 
 
@@ -521,6 +1351,54 @@ async def _async_verify_or_remove(file_path: Path, sha256: str | None) -> bool:
     return await asyncio.to_thread(_verify_or_remove, file_path, sha256)
 
 
+def _artifact_store(config: HttpClientConfig) -> ArtifactStore | None:
+    return ArtifactStore(config.artifact_dir) if config.artifact_dir is not None else None
+
+
+def _download_temp_dir(temp_dir: str | Path | None, store: ArtifactStore | None) -> Path:
+    """Parent of download work directories.
+
+    Store downloads default to a directory inside the store, so adding the
+    finished file is a rename rather than a copy across filesystems.
+    """
+    if temp_dir:
+        return Path(temp_dir)
+    return store.root / "work" if store is not None else Path(tempfile.gettempdir())
+
+
+def _materialize_stored(store: ArtifactStore, url: str, sha256: str | None, output_path: Path) -> bool:
+    """Place an already stored artifact at ``output_path`` without downloading.
+
+    A known ``sha256`` matches blobs fetched from any URL; otherwise the URL
+    index decides.
+
+    Returns:
+        True if ``output_path`` now holds the artifact.
+
+    """
+    digest = sha256 if sha256 and store.has(sha256) else store.lookup(url)
+    if digest is None or (sha256 and digest != sha256):
+        return False
+    store.materialize(digest, output_path)
+    return True
+
+
+def _commit_download(
+    temp_path: Path,
+    output_path: Path,
+    url: str,
+    store: ArtifactStore | None,
+    sha256: str | None,
+) -> None:
+    """Move a finished download to ``output_path``, through the store if enabled."""
+    if store is None:
+        move_with_digests(temp_path, output_path)
+        return
+    digest = store.add(temp_path, sha256)
+    store.record(url, digest)
+    store.materialize(digest, output_path)
+
+
 def download_with_lock(
     url: str,
     output: str | Path,
@@ -528,11 +1406,19 @@ def download_with_lock(
     config: HttpClientConfig | None = None,
     headers: dict[str, str] | None = None,
     sha256: str | None = None,
+    segments: int = 1,
 ) -> bool:
     """Download file with concurrent download protection via file locking.
 
     Uses deterministic temp paths and flock to serialize concurrent downloads
     of the same file. Only one process will download, others wait and reuse.
+    An interrupted download leaves its partial file in the work directory and
+    the next call resumes it with a Range request instead of starting over.
+
+    With the artifact store enabled (``config.artifact_dir``), the lock and
+    work directory are keyed by URL and finished downloads are stored by
+    digest, so the same artifact requested for several output paths is
+    fetched once and linked into place.
 
     Args:
         url: URL to download from.
@@ -541,16 +1427,20 @@ def download_with_lock(
         config: Optional HTTP client configuration.
         headers: Additional headers for the request.
         sha256: Optional SHA256 hash for integrity verification.
+        segments: Connections to split the download across when the server
+            supports byte ranges; 1 downloads over a single stream.
 
     Returns:
         True if download succeeded or file already exists, False otherwise.
 
     """
     output_path = Path(output).resolve()
-    base_temp = Path(temp_dir) if temp_dir else Path(tempfile.gettempdir())
+    config = config or HttpClientConfig()
+    store = _artifact_store(config)
+    base_temp = _download_temp_dir(temp_dir, store)
 
     try:
-        work_dir = _get_secure_work_dir(base_temp, output_path)
+        work_dir = _get_secure_work_dir(base_temp, url if store else output_path)
     except RuntimeError as exc:
         log.error(str(exc))
         return False
@@ -571,20 +1461,28 @@ def download_with_lock(
             if _verify_or_remove(output_path, sha256):
                 return True
 
-        client = HttpClient(config)
+        if store is not None and _materialize_stored(store, url, sha256, output_path):
+            return True
+
+        client = HttpClient(config, pooled=True)
         try:
-            client.get(url, temp_path, headers=headers or {})
+            if segments <= 1 or not _segmented_download(url, temp_path, config, headers, segments):
+                client.get(url, temp_path, headers=headers or {}, resume=True)
             if sha256 and not _verify_or_remove(temp_path, sha256):
+                _clear_resume_state(temp_path)
                 return False
-            temp_path.replace(output_path)
+            _commit_download(temp_path, output_path, url, store, sha256)
+            _clear_resume_state(temp_path)
             return True
         finally:
             client.close()
+    except httpx.HTTPError:
+        # Keep the partial file and its sidecar: the next attempt resumes it.
+        return False
     except OSError:
         return False
     except Exception:
-        if temp_path.exists():
-            temp_path.unlink()
+        _clear_resume_state(temp_path)
         return False
     finally:
         if lock_fd:
@@ -601,6 +1499,7 @@ async def async_download_with_lock(
     config: HttpClientConfig | None = None,
     headers: dict[str, str] | None = None,
     sha256: str | None = None,
+    segments: int = 1,
 ) -> bool:
     """Async download file with concurrent download protection via file locking.
 
@@ -611,16 +1510,20 @@ async def async_download_with_lock(
         config: Optional HTTP client configuration.
         headers: Additional headers for the request.
         sha256: Optional SHA256 hash for integrity verification.
+        segments: Connections to split the download across when the server
+            supports byte ranges; 1 downloads over a single stream.
 
     Returns:
         True if download succeeded or file already exists, False otherwise.
 
     """
     output_path = Path(output).resolve()
-    base_temp = Path(temp_dir) if temp_dir else Path(tempfile.gettempdir())
+    config = config or HttpClientConfig()
+    store = _artifact_store(config)
+    base_temp = _download_temp_dir(temp_dir, store)
 
     try:
-        work_dir = _get_secure_work_dir(base_temp, output_path)
+        work_dir = _get_secure_work_dir(base_temp, url if store else output_path)
     except RuntimeError as exc:
         log.error(str(exc))
         return False
@@ -656,19 +1559,29 @@ async def async_download_with_lock(
             if verified:
                 return True
 
-        async with HttpClient(config) as client:
-            await client.async_get(url, temp_path, headers=headers or {})
+        if store is not None and await asyncio.to_thread(_materialize_stored, store, url, sha256, output_path):
+            return True
+
+        async with HttpClient(config, pooled=True) as client:
+            if segments <= 1 or not await client.async_segmented_get(
+                url, temp_path, segments=segments, headers=headers
+            ):
+                await client.async_get(url, temp_path, headers=headers or {}, resume=True)
             if sha256:
                 valid = await _async_verify_or_remove(temp_path, sha256)
                 if not valid:
+                    _clear_resume_state(temp_path)
                     return False
-            temp_path.replace(output_path)
+            await asyncio.to_thread(_commit_download, temp_path, output_path, url, store, sha256)
+            _clear_resume_state(temp_path)
             return True
+    except httpx.HTTPError:
+        # Keep the partial file and its sidecar: the next attempt resumes it.
+        return False
     except OSError:
         return False
     except Exception:
-        if temp_path.exists():
-            temp_path.unlink()
+        _clear_resume_state(temp_path)
         return False
     finally:
         if lock_fd is not None:
@@ -693,13 +1606,126 @@ def req(
 
     """
     cfg = config or HttpClientConfig()
-    client = HttpClient(cfg)
+    client = HttpClient(cfg, pooled=True)
     try:
         return client.get(url, output)
     finally:
         client.close()
 
 
+def _api_cache_path(cache_dir: Path, url: str) -> Path:
+    """Cache file for a GitHub API URL."""
+    return cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.json"
+
+
+def _read_api_cache(cache_path: Path, url: str) -> dict[str, Any] | None:
+    """Load a cached API response, ignoring missing or corrupt entries."""
+    try:
+        entry = json.loads(cache_path.read_text(encoding="utf-8"))
+    except OSError, ValueError:
+        return None
+    if not isinstance(entry, dict) or entry.get("url") != url or not isinstance(entry.get("body"), str):
+        return None
+    if not isinstance(entry.get("fetched_at"), (int, float)):
+        return None
+    return entry
+
+
+def _write_api_cache(cache_path: Path | None, entry: dict[str, Any]) -> None:
+    """Atomically persist a cached API response; failures only cost a cache miss."""
+    if cache_path is None:
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_file.write_text(json.dumps(entry), encoding="utf-8")
+        temp_file.replace(cache_path)
+    except OSError as exc:
+        log.debug(f"Failed to cache GitHub API response: {exc}")
+
+
+def _conditional_headers(entry: dict[str, Any]) -> dict[str, str]:
+    """Revalidation headers for a cached API response."""
+    headers: dict[str, str] = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _emit_body(body: str, output: str | Path | None) -> str:
+    """Return ``body`` or write it to ``output``, mirroring `HttpClient.get`."""
+    if output == "-" or output is None:
+        return body
+    output_path = Path(output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(body, encoding="utf-8")
+    return ""
+
+
+def _gh_headers(config: HttpClientConfig, accept: str) -> dict[str, str]:
+    """GitHub request headers with the token from config or GITHUB_TOKEN."""
+    token = config.github_token or os.environ.get("GITHUB_TOKEN")
+    headers = {"Accept": accept}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _gh_cache_lookup(
+    url: str,
+    config: HttpClientConfig,
+    headers: dict[str, str],
+) -> tuple[Path | None, dict[str, Any] | None, bool]:
+    """Consult the GitHub API cache before a request.
+
+    Adds revalidation headers to ``headers`` for a stale entry.
+
+    Returns:
+        Tuple of (cache path, cached entry, whether the entry is fresh).
+
+    """
+    cache_path = _api_cache_path(config.api_cache_dir, url) if config.api_cache_dir else None
+    entry = _read_api_cache(cache_path, url) if cache_path else None
+    if entry is None:
+        return cache_path, None, False
+    if time.time() - entry["fetched_at"] < config.api_cache_ttl:
+        return cache_path, entry, True
+    headers.update(_conditional_headers(entry))
+    return cache_path, entry, False
+
+
+def _gh_cache_update(
+    url: str,
+    response: httpx.Response,
+    cache_path: Path | None,
+    entry: dict[str, Any] | None,
+) -> str:
+    """Resolve a GitHub API response against the cache and store it.
+
+    Returns:
+        The body to hand to the caller (the cached one for a 304).
+
+    """
+    if response.status_code == httpx.codes.NOT_MODIFIED and entry is not None:
+        _write_api_cache(cache_path, {**entry, "fetched_at": time.time()})
+        return cast("str", entry["body"])
+    body = response.text
+    if response.status_code == httpx.codes.OK and cache_path:
+        _write_api_cache(
+            cache_path,
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "body": body,
+            },
+        )
+    return body
+
+
 def gh_req(
     url: str,
     output: str | Path | None = None,
@@ -708,6 +1734,10 @@ def gh_req(
     """Make GitHub API request with retries.
 
     Uses GITHUB_TOKEN from environment or config for authentication.
+    Successful responses are cached on disk per URL: within
+    ``config.api_cache_ttl`` they are served without any request, after that
+    they are revalidated with If-None-Match/If-Modified-Since, and a 304
+    (which does not count against the rate limit) is answered from disk.
 
     Args:
         url: GitHub API URL.
@@ -720,17 +1750,44 @@ def gh_req(
 
     """
     cfg = config or HttpClientConfig()
-    token = cfg.github_token or os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/vnd.github+json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = _gh_headers(cfg, "application/vnd.github+json")
+    cache_path, entry, fresh = _gh_cache_lookup(url, cfg, headers)
+    if fresh and entry is not None:
+        return _emit_body(entry["body"], output)
 
-    client = HttpClient(cfg)
+    client = HttpClient(cfg, pooled=True)
     try:
-        return client.get(url, output, headers=headers)
+        response = client.fetch(url, headers=headers)
     finally:
         client.close()
 
+    return _emit_body(_gh_cache_update(url, response, cache_path, entry), output)
+
+
+async def async_gh_req(url: str, config: HttpClientConfig | None = None) -> str:
+    """Async counterpart of `gh_req` returning the response body.
+
+    Shares the on-disk GitHub API cache with `gh_req`.
+
+    Args:
+        url: GitHub API URL.
+        config: Optional HTTP client configuration.
+
+    Returns:
+        Response body.
+
+    """
+    cfg = config or HttpClientConfig()
+    headers = _gh_headers(cfg, "application/vnd.github+json")
+    cache_path, entry, fresh = await asyncio.to_thread(_gh_cache_lookup, url, cfg, headers)
+    if fresh and entry is not None:
+        return cast("str", entry["body"])
+
+    async with HttpClient(cfg, pooled=True) as client:
+        response = await client.async_fetch(url, headers=headers)
+
+    return await asyncio.to_thread(_gh_cache_update, url, response, cache_path, entry)
+
 
 def gh_dl(
     asset_path: str | Path,
@@ -740,6 +1797,9 @@ def gh_dl(
 ) -> bool:
     """Download GitHub release asset with file locking.
 
+    Release assets are shared through the artifact store unless ``config``
+    says otherwise.
+
     Args:
         asset_path: Path where the asset should be saved.
         url: GitHub asset download URL.
@@ -750,15 +1810,34 @@ def gh_dl(
         True if download succeeded or file already exists, False otherwise.
 
     """
-    cfg = config or HttpClientConfig()
-    token = cfg.github_token or os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/octet-stream"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
+    cfg = config or HttpClientConfig(artifact_dir=default_artifact_dir())
+    headers = _gh_headers(cfg, "application/octet-stream")
     return download_with_lock(url, asset_path, config=cfg, headers=headers, sha256=sha256)
 
 
+async def async_gh_dl(
+    asset_path: str | Path,
+    url: str,
+    config: HttpClientConfig | None = None,
+    sha256: str | None = None,
+) -> bool:
+    """Async counterpart of `gh_dl`.
+
+    Args:
+        asset_path: Path where the asset should be saved.
+        url: GitHub asset download URL.
+        config: Optional HTTP client configuration.
+        sha256: Optional SHA256 hash for integrity verification.
+
+    Returns:
+        True if download succeeded or file already exists, False otherwise.
+
+    """
+    cfg = config or HttpClientConfig(artifact_dir=default_artifact_dir())
+    headers = _gh_headers(cfg, "application/octet-stream")
+    return await async_download_with_lock(url, asset_path, config=cfg, headers=headers, sha256=sha256)
+
+
 def _executor_download_with_lock(
     url: str,
     output: str | Path,
@@ -801,6 +1880,9 @@ def aria2c_download(
 ) -> bool:
     """Download a file using aria2c for multi-connection acceleration.
 
+    The aria2c process counts as one transfer against the download governor
+    (for the first URL's host) and inherits its bandwidth cap.
+
     Args:
         urls: List of URLs to download (mirrors).
         output_path: Destination file path.
@@ -813,7 +1895,7 @@ def aria2c_download(
         True if download succeeded, False otherwise.
 
     """
-    if not shutil.which("aria2c"):
+    if not shutil.which("aria2c") or not urls:
         return False
 
     output_path = Path(output_path)
@@ -827,12 +1909,15 @@ def aria2c_download(
         "--out",
         output_path.name,
     ]
+    if _DOWNLOAD_GOVERNOR.bandwidth_limit > 0:
+        cmd.append(f"--max-overall-download-limit={_DOWNLOAD_GOVERNOR.bandwidth_limit}")
     if extra_args:
         cmd.extend(extra_args)
     cmd.extend(urls)
 
     try:
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with _DOWNLOAD_GOVERNOR.slot(urls[0]):
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return True
     except subprocess.CalledProcessError, OSError:
         return False
@@ -848,12 +1933,15 @@ def download_with_aria2c_fallback(
 ) -> bool:
     """Download a file using aria2c if available, falling back to httpx.
 
+    The httpx fallback splits the download into up to ``max_connections``
+    concurrent Range requests when the server allows it, like aria2c does.
+
     Args:
         urls: List of URLs to download (first URL used for httpx fallback).
         output_path: Destination file path.
         config: Optional HTTP client configuration for fallback.
         headers: Optional headers for fallback download.
-        max_connections: Max connections for aria2c.
+        max_connections: Max connections for aria2c and the segmented fallback.
 
     Returns:
         True if download succeeded, False otherwise.
@@ -865,7 +1953,7 @@ def download_with_aria2c_fallback(
 
     # Fallback to httpx via download_with_lock
     primary_url = urls[0] if urls else ""
-    return download_with_lock(primary_url, output_path, config=config, headers=headers)
+    return download_with_lock(primary_url, output_path, config=config, headers=headers, segments=max_connections)
 
 
 def main() -> int:
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Shared retry policy for HTTP requests.
+
+Decides whether a failed request is worth repeating and how long to wait
+before the next attempt. Server hints (``Retry-After``, GitHub's
+``X-RateLimit-*``) take precedence over exponential backoff, and a per-host
+token bucket caps how many retries a struggling host receives across all
+concurrent callers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import UTC
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_JITTER = 0.25
+# Per-host retry budget: a burst of RETRY_BUDGET_CAPACITY retries, refilled
+# at RETRY_BUDGET_REFILL_RATE tokens per second.
+RETRY_BUDGET_CAPACITY = 10.0
+RETRY_BUDGET_REFILL_RATE = 0.5
+# Transient statuses below 500 that are always worth retrying.
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429})
+# Server errors that will not go away by asking again.
+NON_RETRYABLE_SERVER_ERRORS = frozenset({501, 505})
+
+
+@dataclass
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Attributes:
+        capacity: Maximum number of tokens (burst size).
+        refill_rate: Tokens added per second.
+
+    """
+
+    capacity: float
+    refill_rate: float
+    _tokens: float = field(init=False)
+    _updated: float = field(init=False, default_factory=time.monotonic)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self._tokens = self.capacity
+
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        """Take ``cost`` tokens if available.
+
+        Returns:
+            True if the tokens were taken, False if the bucket is short.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+            if self._tokens < cost:
+                return False
+            self._tokens -= cost
+            return True
+
+
+@dataclass
+class HostState:
+    """Retry bookkeeping shared by every request to one host.
+
+    Attributes:
+        budget: Token bucket limiting retries to the host.
+        blocked_until: Monotonic time before which the host asked not to be
+            contacted (from ``Retry-After``/``X-RateLimit-Reset``).
+
+    """
+
+    budget: TokenBucket = field(
+        default_factory=lambda: TokenBucket(RETRY_BUDGET_CAPACITY, RETRY_BUDGET_REFILL_RATE),
+    )
+    blocked_until: float = 0.0
+
+    def block_for(self, seconds: float) -> None:
+        """Extend the host's cooldown to at least ``seconds`` from now."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def remaining_block(self) -> float:
+        """Seconds left in the host's cooldown (0 when not blocked)."""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+
+class _HostRegistry:
+    """Process-wide map of host name to `HostState`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: dict[str, HostState] = {}
+
+    def get(self, host: str) -> HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState()
+            return state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+_HOSTS = _HostRegistry()
+
+
+def host_state(host: str) -> HostState:
+    """Return the shared retry state for ``host``."""
+    return _HOSTS.get(host)
+
+
+def reset_host_states() -> None:
+    """Forget all per-host budgets and cooldowns."""
+    _HOSTS.clear()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header value.
+
+    Args:
+        value: Delay in seconds or an HTTP date.
+
+    Returns:
+        Seconds to wait (never negative), or None if absent or malformed.
+
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except TypeError, ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def rate_limit_delay(headers: httpx.Headers) -> float | None:
+    """Seconds the server asked the client to wait, if any.
+
+    ``Retry-After`` wins; otherwise an exhausted ``X-RateLimit-Remaining``
+    quota waits until ``X-RateLimit-Reset`` (epoch seconds).
+
+    Returns:
+        Seconds to wait, or None if the headers carry no hint.
+
+    """
+    retry_after = parse_retry_after(headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    if headers.get("X-RateLimit-Remaining") != "0":
+        return None
+    try:
+        reset = float(headers.get("X-RateLimit-Reset", ""))
+    except ValueError:
+        return None
+    return max(0.0, reset - time.time())
+
+
+def is_retryable_response(response: httpx.Response) -> bool:
+    """Whether a response status is transient.
+
+    403 only counts when it is a rate-limit rejection (GitHub and
+    Cloudflare answer exhausted quotas with 403 plus rate-limit headers).
+    """
+    status = response.status_code
+    if status in RETRYABLE_STATUS_CODES:
+        return True
+    if status == httpx.codes.FORBIDDEN:
+        return rate_limit_delay(response.headers) is not None
+    return status >= httpx.codes.INTERNAL_SERVER_ERROR and status not in NON_RETRYABLE_SERVER_ERRORS
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether an exception raised by a request is transient."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return is_retryable_response(error.response)
+    if isinstance(error, httpx.UnsupportedProtocol):
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+def _host_of(outcome: BaseException | httpx.Response) -> str | None:
+    try:
+        return outcome.request.url.host or None  # type: ignore[union-attr]
+    except AttributeError, RuntimeError:
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before repeating a failed request.
+
+    Attributes:
+        max_retries: Maximum number of retries after the first attempt.
+        initial_delay: Backoff before the first retry, doubled per retry.
+        max_delay: Upper bound for a computed backoff delay.
+        jitter: Relative random spread applied to computed delays.
+        deadline: Seconds after the first attempt past which no further
+            attempt is started, or None for no limit.
+
+    """
+
+    max_retries: int = 4
+    initial_delay: float = 2.0
+    max_delay: float = DEFAULT_MAX_DELAY
+    jitter: float = DEFAULT_JITTER
+    deadline: float | None = None
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered exponential delay before retry number ``attempt + 1``."""
+        delay = min(self.max_delay, self.initial_delay * 2.0**attempt)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)  # noqa: S311
+
+    def next_delay(self, attempt: int, outcome: BaseException | httpx.Response, started: float) -> float | None:
+        """Decide whether to retry after a failed attempt.
+
+        Args:
+            attempt: Zero-based index of the attempt that just failed.
+            outcome: The raised exception or the returned error response.
+            started: `time.monotonic` value when the first attempt began.
+
+        Returns:
+            Seconds to sleep before the next attempt, or None to give up.
+
+        """
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(outcome, httpx.Response):
+            if not is_retryable_response(outcome):
+                return None
+            response: httpx.Response | None = outcome
+        elif not is_retryable_error(outcome):
+            return None
+        else:
+            response = outcome.response if isinstance(outcome, httpx.HTTPStatusError) else None
+
+        host = _host_of(outcome)
+        state = host_state(host) if host else None
+        hinted = rate_limit_delay(response.headers) if response is not None else None
+        delay = self.backoff(attempt) if hinted is None else hinted
+        if state is not None:
+            if hinted is not None:
+                state.block_for(hinted)
+            delay = max(delay, state.remaining_block())
+
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return None
+        if state is not None and not state.budget.try_acquire():
+            return None
+        return delay
+
+    def call[T](self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` until it succeeds or the policy gives up.
+
+        Transient `httpx.HTTPError` exceptions are retried. A returned
+        `httpx.Response` with a transient status is retried as well; once
+        retries run out it is returned as-is rather than raised.
+
+        Raises:
+            httpx.HTTPError: The last error, if it was not retryable or the
+                retry budget is spent.
+
+        """
+        started = time.monotonic()
+        for attempt in itertools.count():
+            try:
+                result = func(*args, **kwargs)
+            except httpx.HTTPError as e:
+                delay = self.next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            else:
+                if not isinstance(result, httpx.Response):
+                    return result
+                delay = self.next_delay(attempt, result, started)
+                if delay is None:
+                    return result
+            time.sleep(delay)
+        raise AssertionError  # pragma: no cover - itertools.count never ends
+
+    async def acall[T](self, func: Callable[..., Awaitable[T]], /, *args: Any, **kwargs: Any) -> T:
+        """Async counterpart of `call`."""
+        started = time.monotonic()
+        for attempt in itertools.count():
+            try:
+                result = await func(*args, **kwargs)
+            except httpx.HTTPError as e:
+                delay = self.next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            else:
+                if not isinstance(result, httpx.Response):
+                    return result
+                delay = self.next_delay(attempt, result, started)
+                if delay is None:
+                    return result
+            await asyncio.sleep(delay)
+        raise AssertionError  # pragma: no cover - itertools.count never ends
@@ -0,0 +1,24 @@
+"""Shared fixtures for the scraper tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from scripts.scrapers.page_cache import reset_page_cache
+from scripts.scrapers.result_cache import result_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture(autouse=True)
+def _fresh_scraper_caches(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep pages and parsed results from leaking between tests or onto disk."""
+    monkeypatch.setenv("SCRAPER_PAGE_CACHE", "off")
+    reset_page_cache()
+    result_cache().clear()
+    yield
+    reset_page_cache()
+    result_cache().clear()
@@ -1,9 +1,24 @@
 """Tests for APKMirror scraper."""
 
-# ruff: noqa: S101
+# ruff: noqa: S101, D107, FBT001, FBT002, TC003
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
 import pytest
+from selectolax.parser import HTMLParser
 
-from scripts.scrapers.apkmirror import ArchType, get_target_archs
+from scripts.scrapers.apkmirror import (
+    APKMirror,
+    ArchType,
+    RowData,
+    SearchConfig,
+    extract_variants,
+    get_target_archs,
+    select_variant,
+)
+from scripts.scrapers.base import VersionInfo
 
 
 @pytest.mark.parametrize(
@@ -46,3 +61,228 @@ def test_get_target_archs(arch: ArchType, expected: list[str]) -> None:
     to a list of acceptable architectures, including fallbacks.
     """
     assert get_target_archs(arch) == expected
+
+
+RELEASE_PATH = "/apk/google-inc/youtube/youtube-19-10-36-release"
+HEADER_ROW = (
+    '<div class="table-row headerFont">'
+    '<div class="table-cell"><span class="hidden-xs">Variant</span></div>'
+    '<div class="table-cell">Architecture</div><div class="table-cell">Minimum Version</div>'
+    '<div class="table-cell">Screen DPI</div><div class="table-cell"></div></div>'
+)
+
+
+def _release_row(index: int, bundle: str, arch: str, dpi: str, *, nested: bool = False) -> str:
+    """One variant row as APKMirror renders it: badges and a timestamp share the version cell."""
+    href = f"{RELEASE_PATH}/youtube-19-10-36-{index}-android-apk-download/"
+    version_cell = (
+        f'<a class="accent_color" href="{href}">19.10.36</a><br>'
+        f'<span class="apkm-badge">{bundle}</span>'
+        '<span class="apkm-badge"><svg class="icon"></svg></span>'
+        f'<span class="colorLightBlack">154800000{index}</span>'
+        '<div class="dateyear_utc"><span class="datetime_utc">March 12, 2024</span></div>'
+    )
+    cells = [
+        version_cell,
+        arch,
+        "Android 8.0+",
+        dpi,
+        f'<a class="accent_color" href="{href}"><svg class="icon download-button-icon"></svg></a>',
+    ]
+    row = "".join(f'<div class="table-cell rowheight addseparator">{cell}</div>' for cell in cells)
+    if nested:
+        row = f'<div class="table-cells">{row}</div>'
+    return f'<div class="table-row headerFont">{row}</div>'
+
+
+RELEASE_PAGE = (
+    '<html><body><div class="table topmargin variants-table">'
+    + HEADER_ROW
+    + _release_row(1, "APK", "arm64-v8a", "nodpi")
+    + _release_row(2, "BUNDLE", "arm64-v8a", "120-640dpi")
+    + _release_row(3, "BUNDLE", "armeabi-v7a", "120-640dpi")
+    + _release_row(4, "APK", "x86_64", "nodpi", nested=True)
+    + "</div></body></html>"
+)
+
+
+def _reference_variants(html: str) -> list[RowData]:
+    """Per-row CSS queries, the approach `extract_variants` replaced."""
+    variants = []
+    for row in HTMLParser(html).css("div.table-row.headerFont"):
+        cells = row.css(".table-cell")
+        link = row.css_first("div > a")
+        href = link.attrs.get("href") if link is not None else None
+        version_link = cells[0].css_first("a")
+        bundle_badge = cells[0].css_first(".apkm-badge")
+        variants.append(
+            RowData(
+                version=(version_link or cells[0]).text(strip=True),
+                size="",
+                bundle=bundle_badge.text(strip=True) if bundle_badge else "",
+                arch=cells[1].text(strip=True),
+                dpi=cells[3].text(strip=True),
+                url=f"https://www.apkmirror.com{href}" if href else None,
+            )
+        )
+    return variants
+
+
+def test_extract_variants_reads_every_row() -> None:
+    variants = extract_variants(RELEASE_PAGE)
+
+    assert len(variants) == 5
+    assert variants[0].url is None
+    first = variants[1]
+    assert (first.version, first.bundle, first.arch, first.dpi) == ("19.10.36", "APK", "arm64-v8a", "nodpi")
+    assert first.url == f"https://www.apkmirror.com{RELEASE_PATH}/youtube-19-10-36-1-android-apk-download/"
+    assert variants[4].arch == "x86_64"
+
+
+def test_extract_variants_matches_per_row_queries() -> None:
+    assert extract_variants(RELEASE_PAGE) == _reference_variants(RELEASE_PAGE)
+
+
+@pytest.mark.parametrize(
+    ("config", "expected_slug"),
+    [
+        (SearchConfig("APK", "nodpi", "arm64-v8a"), "youtube-19-10-36-1-"),
+        (SearchConfig("BUNDLE", "120-640dpi", "armeabi-v7a"), "youtube-19-10-36-3-"),
+        (SearchConfig("APK", "nodpi", "x86_64"), "youtube-19-10-36-4-"),
+        (SearchConfig("APK", "999dpi", "universal"), None),
+    ],
+)
+def test_select_variant_on_release_page(config: SearchConfig, expected_slug: str | None) -> None:
+    url = select_variant(extract_variants(RELEASE_PAGE), config)
+
+    if expected_slug is None:
+        assert url is None
+    else:
+        assert url is not None
+        assert expected_slug in url
+
+
+RELEASES = [
+    ("YouTube 19.10.36", "https://www.apkmirror.com/r/19.10.36/"),
+    ("YouTube 20.01.0 beta", "https://www.apkmirror.com/r/20.01.0-beta/"),
+    ("YouTube 19.9.1", "https://www.apkmirror.com/r/19.9.1/"),
+    ("YouTube 19.12.0", "https://www.apkmirror.com/r/19.12.0/"),
+    ("YouTube 19.11.2", "https://www.apkmirror.com/r/19.11.2/"),
+    ("YouTube 19.8.0", "https://www.apkmirror.com/r/19.8.0/"),
+]
+
+
+class FakeReleasePages:
+    """Serves release pages; only versions in ``matching`` have a variant."""
+
+    def __init__(self, matching: set[str]) -> None:
+        self.matching = matching
+        self.fetched: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def get(self, url: str, use_cache: bool = True) -> httpx.Response:
+        del use_cache
+        self.fetched.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        version = url.rstrip("/").rsplit("/", 1)[-1]
+        return httpx.Response(200, text=_variant_table(version) if version in self.matching else "<html></html>")
+
+
+def _variant_table(version: str) -> str:
+    cells = [
+        f'<a href="/variant/{version}/">{version}</a><span class="apkm-badge">APK</span>',
+        "universal",
+        "Android 8.0+",
+        "nodpi",
+        "",
+    ]
+    row = "".join(f'<div class="table-cell">{cell}</div>' for cell in cells)
+    return f'<div class="table-row headerFont">{row}</div>'
+
+
+async def _get_versions(pages: FakeReleasePages, **kwargs: object) -> list[str]:
+    scraper = APKMirror()
+    with (
+        patch.object(scraper, "_list_release_pages", return_value=RELEASES),
+        patch.object(scraper, "get", side_effect=pages.get),
+    ):
+        versions = await scraper.get_versions("google-inc/youtube", **kwargs)  # type: ignore[arg-type]
+    scraper.close()
+    return [v.version for v in versions]
+
+
+@pytest.mark.asyncio
+async def test_get_versions_fetches_concurrently_highest_first() -> None:
+    pages = FakeReleasePages({"19.12.0", "19.10.36", "19.8.0"})
+
+    assert await _get_versions(pages) == ["19.12.0", "19.10.36", "19.8.0"]
+    assert pages.peak > 1
+    assert len(pages.fetched) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_versions_limit_stops_early() -> None:
+    pages = FakeReleasePages({"19.12.0", "19.11.2"})
+
+    with patch("scripts.scrapers.apkmirror.RELEASE_FETCH_CONCURRENCY", 2):
+        assert await _get_versions(pages, limit=1) == ["19.12.0"]
+    # At most one page beyond the concurrency window starts before the cancel.
+    assert len(pages.fetched) <= 3
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookup_reuses_parsed_release_pages() -> None:
+    pages = FakeReleasePages({"19.12.0", "19.8.0"})
+    first = await _get_versions(pages)
+    fetched = len(pages.fetched)
+
+    assert await _get_versions(pages) == first
+    assert len(pages.fetched) == fetched
+
+
+@pytest.mark.asyncio
+async def test_html_instead_of_apk_fails_download(tmp_path: Path) -> None:
+    scraper = APKMirror()
+    scraper.MIN_REQUEST_INTERVAL = 0
+    scraper._session = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda _request: httpx.Response(200, html="<html>Just a moment</html>"))
+    )
+
+    variant = VersionInfo("19.12.0", url="https://www.apkmirror.com/variant/19.12.0/")
+    with (
+        patch.object(scraper, "get_versions", return_value=[variant]),
+        patch.object(scraper, "_get_download_url", return_value="https://www.apkmirror.com/wp-content/download.php"),
+    ):
+        result = await scraper.download("google-inc/youtube", None, tmp_path / "app.apk")
+    scraper.close()
+
+    assert not result.success
+    assert result.error == "Received HTML instead of APK"
+    assert not (tmp_path / "app.apk").exists()
+
+
+@pytest.mark.asyncio
+async def test_download_keys_are_never_cached() -> None:
+    requests: list[tuple[str, bool]] = []
+    keys = iter(["first", "second"])
+
+    async def get(url: str, use_cache: bool = True) -> httpx.Response:
+        requests.append((url, use_cache))
+        if url.endswith("/variant/"):
+            return httpx.Response(200, html=f'<a class="downloadButton" href="/download/?key={next(keys)}">Get</a>')
+        key = url.rsplit("=", 1)[-1]
+        return httpx.Response(200, html=f'<a id="download-link" href="/download.php?key={key}">APK</a>')
+
+    scraper = APKMirror()
+    with patch.object(scraper, "get", side_effect=get):
+        first = await scraper._get_download_url("https://www.apkmirror.com/variant/")
+        second = await scraper._get_download_url("https://www.apkmirror.com/variant/")
+    scraper.close()
+
+    assert first == "https://www.apkmirror.com/download.php?key=first"
+    assert second == "https://www.apkmirror.com/download.php?key=second"
+    assert all(not use_cache for _, use_cache in requests)
@@ -0,0 +1,104 @@
+"""Tests for the Aptoide scraper."""
+
+# ruff: noqa: S101, D107
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from scripts.scrapers.aptoide import VERSIONS_PAGE_LIMIT, AptoideScraper
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PKG = "com.example.app"
+APK = b"PK\x03\x04 aptoide apk"
+APK_URL = "https://pool.apk.aptoide.com/app.apk"
+
+
+class FakeApi:
+    """Serves ``count`` versions, newest first, in pages of the requested size."""
+
+    def __init__(self, count: int, md5sum: str = hashlib.md5(APK).hexdigest()) -> None:  # noqa: S324
+        self.count = count
+        self.md5sum = md5sum
+        self.queries: list[dict[str, str]] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if str(request.url) == APK_URL:
+            return httpx.Response(200, content=APK, headers={"content-type": "application/vnd.android.package-archive"})
+        query = dict(request.url.params)
+        self.queries.append(query)
+        offset, limit = int(query["offset"]), int(query["limit"])
+        versions = [
+            {
+                "version": f"1.{self.count - i}",
+                "architecture": "arm64-v8a",
+                "file": {"path": APK_URL, "md5sum": self.md5sum, "filesize": len(APK)},
+            }
+            for i in range(offset, min(offset + limit, self.count))
+        ]
+        return httpx.Response(200, text=json.dumps({"data": {"total": self.count, "versions": versions}}))
+
+
+def _scraper(api: FakeApi) -> AptoideScraper:
+    scraper = AptoideScraper()
+    scraper.MIN_REQUEST_INTERVAL = 0
+    scraper._session = httpx.AsyncClient(transport=httpx.MockTransport(api.handler))
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_versions_are_paged_and_filtered_by_abi() -> None:
+    api = FakeApi(VERSIONS_PAGE_LIMIT + 3)
+    scraper = _scraper(api)
+
+    versions = await scraper.get_versions(PKG, arch="arm64-v8a")
+
+    assert len(versions) == VERSIONS_PAGE_LIMIT + 3
+    assert versions[0].version == f"1.{VERSIONS_PAGE_LIMIT + 3}"
+    assert versions[0].size == len(APK)
+    assert versions[0].hashes == {"md5": api.md5sum}
+    assert [q["offset"] for q in api.queries] == ["0", str(VERSIONS_PAGE_LIMIT)]
+    assert base64.urlsafe_b64decode(api.queries[0]["q"]) == b"myCPU=arm64-v8a"
+
+
+@pytest.mark.asyncio
+async def test_universal_lookup_sends_no_abi_filter() -> None:
+    api = FakeApi(2)
+
+    await _scraper(api).get_versions(PKG)
+
+    assert len(api.queries) == 1
+    assert "q" not in api.queries[0]
+
+
+@pytest.mark.asyncio
+async def test_download_reuses_lookup_and_verifies_md5(tmp_path: Path) -> None:
+    api = FakeApi(2)
+    scraper = _scraper(api)
+    await scraper.get_versions(PKG, arch="arm64-v8a")
+
+    result = await scraper.download(PKG, "1.1", tmp_path / "app.apk", arch="arm64-v8a")
+
+    assert result.success
+    assert (tmp_path / "app.apk").read_bytes() == APK
+    assert len(api.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_md5_mismatch_fails_download(tmp_path: Path) -> None:
+    scraper = _scraper(FakeApi(1, md5sum="0" * 32))
+
+    result = await scraper.download(PKG, "1.1", tmp_path / "app.apk")
+
+    assert not result.success
+    assert result.error is not None
+    assert "md5 mismatch" in result.error
+    assert not (tmp_path / "app.apk").exists()
@@ -0,0 +1,146 @@
+"""Tests for the Archive.org scraper."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from scripts.scrapers.archive import (
+    ARCHIVE_BASE_URL,
+    ARCHIVE_FILES_COUNT_URL,
+    ARCHIVE_FILES_URL,
+    MAX_METADATA_FILES,
+    ArchiveScraper,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+PKG = "com.google.android.youtube"
+APK = b"PK\x03\x04 youtube apk"
+
+
+def _metadata(sha1: str = hashlib.sha1(APK).hexdigest()) -> str:  # noqa: S324
+    files = [
+        {"name": f"apks/{PKG}/{PKG}-19.09.36-arm64-v8a.apk", "size": str(len(APK)), "sha1": sha1, "md5": "0" * 32},
+        {"name": f"apks/{PKG}/{PKG}-19.16.39-arm64-v8a.apk", "size": "9", "md5": "1" * 32},
+        {"name": f"apks/{PKG}/{PKG}-19.16.39-arm64-v8a.apk", "size": "9"},
+        {"name": "apks/com.other.app/com.other.app-1.0-all.apk", "size": "5"},
+        {"name": "jhc-apks_meta.xml", "size": "100"},
+    ]
+    return json.dumps({"result": files})
+
+
+def _scraper(handler: Callable[[httpx.Request], httpx.Response]) -> ArchiveScraper:
+    scraper = ArchiveScraper()
+    scraper.MIN_REQUEST_INTERVAL = 0
+    scraper._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+def _files(directory: Path) -> list[str]:
+    return sorted(path.name for path in directory.iterdir())
+
+
+def _serve(
+    metadata: str, requests: list[str] | None = None, files_count: int = 5
+) -> Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if requests is not None:
+            requests.append(url)
+        if url == ARCHIVE_FILES_COUNT_URL:
+            return httpx.Response(200, text=json.dumps({"result": files_count}))
+        if url == ARCHIVE_FILES_URL:
+            return httpx.Response(200, text=metadata)
+        if url.endswith(".apk"):
+            return httpx.Response(200, content=APK, headers={"content-type": "application/vnd.android.package-archive"})
+        listing = f'<a href="{PKG}-19.09.36-all.apk">apk</a>'
+        return httpx.Response(200, text=listing, headers={"content-type": "text/html"})
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_versions_come_from_metadata_with_hashes() -> None:
+    requests: list[str] = []
+    scraper = _scraper(_serve(_metadata(), requests))
+
+    versions = await scraper.get_versions(PKG)
+    other = await scraper.get_versions("com.other.app")
+
+    assert [v.version for v in versions] == ["19.16.39", "19.09.36"]
+    assert versions[1].url == f"{ARCHIVE_BASE_URL}/{PKG}/{PKG}-19.09.36-arm64-v8a.apk"
+    assert versions[1].size == len(APK)
+    assert versions[1].hashes == {"sha1": hashlib.sha1(APK).hexdigest(), "md5": "0" * 32}  # noqa: S324
+    assert [v.version for v in other] == ["1.0"]
+    assert requests == [ARCHIVE_FILES_COUNT_URL, ARCHIVE_FILES_URL]
+
+
+@pytest.mark.asyncio
+async def test_download_verified_against_published_hash(tmp_path: Path) -> None:
+    scraper = _scraper(_serve(_metadata()))
+    output = tmp_path / "app.apk"
+
+    result = await scraper.download(PKG, "19.09.36", output, arch="arm64-v8a")
+
+    assert result.success
+    assert output.read_bytes() == APK
+    assert _files(tmp_path) == [output.name]
+
+
+@pytest.mark.asyncio
+async def test_hash_mismatch_fails_and_removes_file(tmp_path: Path) -> None:
+    scraper = _scraper(_serve(_metadata(sha1="f" * 40)))
+    output = tmp_path / "app.apk"
+
+    result = await scraper.download(PKG, "19.09.36", output)
+
+    assert not result.success
+    assert result.error is not None
+    assert "sha1 mismatch" in result.error
+    assert _files(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_html_instead_of_apk_fails_download(tmp_path: Path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == ARCHIVE_FILES_COUNT_URL:
+            return httpx.Response(200, text=json.dumps({"result": 5}))
+        if str(request.url) == ARCHIVE_FILES_URL:
+            return httpx.Response(200, text=_metadata())
+        return httpx.Response(200, html="<html>Item is being processed</html>")
+
+    result = await _scraper(handler).download(PKG, "19.09.36", tmp_path / "app.apk")
+
+    assert not result.success
+    assert result.error == "Received HTML instead of APK"
+    assert not (tmp_path / "app.apk").exists()
+
+
+@pytest.mark.asyncio
+async def test_directory_listing_used_when_metadata_unreadable() -> None:
+    scraper = _scraper(_serve("<html>Service unavailable</html>"))
+
+    versions = await scraper.get_versions(PKG)
+
+    assert [(v.version, v.arch) for v in versions] == [("19.09.36", "all")]
+    assert versions[0].hashes == {}
+
+
+@pytest.mark.asyncio
+async def test_large_collection_uses_package_listing() -> None:
+    requests: list[str] = []
+    scraper = _scraper(_serve(_metadata(), requests, files_count=MAX_METADATA_FILES + 1))
+
+    versions = await scraper.get_versions(PKG)
+
+    assert [(v.version, v.arch) for v in versions] == [("19.09.36", "all")]
+    assert requests == [ARCHIVE_FILES_COUNT_URL, f"{ARCHIVE_BASE_URL}/{PKG}"]
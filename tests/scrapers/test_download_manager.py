@@ -0,0 +1,310 @@
+"""Tests for the download manager."""
+
+# ruff: noqa: S101, ARG002, D107, TC003
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from scripts.scrapers.base import DownloadResult, DownloadSource, ScraperBase, VersionInfo, _HostPacer
+from scripts.scrapers.download_manager import DEFAULT_SOURCE_CONCURRENCY, DownloadManager, SourceCandidate
+from scripts.scrapers.source_stats import FAILURE_THRESHOLD, SourceStats
+from scripts.utils.network import _current_download_job, download_job
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Iterator
+
+
+class FakeScraper(ScraperBase):
+    """Records the loop and overlap of calls instead of scraping."""
+
+    def __init__(self, source: DownloadSource, barrier: threading.Barrier | None = None) -> None:
+        super().__init__(source)
+        self.loops: set[asyncio.AbstractEventLoop] = set()
+        self.jobs: list[str] = []
+        self.barrier = barrier
+        self.closed = False
+
+    async def get_versions(self, pkg_name: str, **kwargs: object) -> list[VersionInfo]:
+        self.loops.add(asyncio.get_running_loop())
+        if self.barrier is not None:
+            await asyncio.to_thread(self.barrier.wait, 5)
+        return [VersionInfo("1.2.0"), VersionInfo("1.10.0")]
+
+    async def download(
+        self,
+        pkg_name: str,
+        version: str | None,
+        output_path: Path,
+        **kwargs: object,
+    ) -> DownloadResult:
+        self.loops.add(asyncio.get_running_loop())
+        self.jobs.append(_current_download_job())
+        return DownloadResult(success=True, file_path=output_path, version=version)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def manager() -> Iterator[DownloadManager]:
+    dm = DownloadManager()
+    yield dm
+    dm.close()
+
+
+def _install(dm: DownloadManager, *scrapers: FakeScraper) -> None:
+    for scraper in scrapers:
+        dm._scrapers[scraper.source] = scraper
+
+
+def test_calls_share_one_event_loop(manager: DownloadManager, tmp_path: Path) -> None:
+    scraper = FakeScraper(DownloadSource.APKMIRROR)
+    _install(manager, scraper)
+
+    assert manager.resolve("pkg", DownloadSource.APKMIRROR) == ("1.10.0", "1.10.0")
+    manager.download("pkg", "1.10.0", tmp_path / "app.apk", DownloadSource.APKMIRROR)
+
+    assert len(scraper.loops) == 1
+
+
+def test_sources_are_scraped_concurrently(manager: DownloadManager) -> None:
+    # Both calls must be inside get_versions at the same time to pass the barrier.
+    barrier = threading.Barrier(2)
+    _install(
+        manager,
+        FakeScraper(DownloadSource.APKMIRROR, barrier),
+        FakeScraper(DownloadSource.UPTODOWN, barrier),
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(
+            pool.map(lambda s: manager.resolve("pkg", s), [DownloadSource.APKMIRROR, DownloadSource.UPTODOWN])
+        )
+
+    assert results == [("1.10.0", "1.10.0")] * 2
+
+
+def test_download_job_label_reaches_the_loop(manager: DownloadManager, tmp_path: Path) -> None:
+    scraper = FakeScraper(DownloadSource.ARCHIVE)
+    _install(manager, scraper)
+
+    with download_job("YouTube-arm64-v8a"):
+        manager.download("pkg", "1.0", tmp_path / "app.apk", DownloadSource.ARCHIVE)
+
+    assert scraper.jobs == ["YouTube-arm64-v8a"]
+
+
+def test_close_closes_scrapers_on_the_loop(tmp_path: Path) -> None:
+    dm = DownloadManager()
+    scraper = FakeScraper(DownloadSource.APKPURE)
+    _install(dm, scraper)
+    dm.download("pkg", "1.0", tmp_path / "app.apk", DownloadSource.APKPURE)
+
+    dm.close()
+
+    assert scraper.closed
+    assert not any(t.name == "download-manager-loop" and t.is_alive() for t in threading.enumerate())
+
+
+def test_same_source_calls_capped_by_concurrency(tmp_path: Path) -> None:
+    dm = DownloadManager(concurrency={DownloadSource.APKMIRROR: 2})
+    active = peak = 0
+
+    class SlowScraper(FakeScraper):
+        async def download(
+            self,
+            pkg_name: str,
+            version: str | None,
+            output_path: Path,
+            **kwargs: object,
+        ) -> DownloadResult:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return DownloadResult(success=True, file_path=output_path, version=version)
+
+    _install(dm, SlowScraper(DownloadSource.APKMIRROR))
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(
+                pool.map(
+                    lambda i: dm.download("pkg", "1.0", tmp_path / f"{i}.apk", DownloadSource.APKMIRROR),
+                    range(4),
+                )
+            )
+    finally:
+        dm.close()
+
+    assert peak == 2
+    assert dm.source_concurrency(DownloadSource.UPTODOWN) == DEFAULT_SOURCE_CONCURRENCY
+
+
+def test_host_pacer_spaces_request_starts() -> None:
+    pacer = _HostPacer()
+
+    waits = [pacer.reserve("www.apkmirror.com", 0.5) for _ in range(3)]
+
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(0.5, abs=0.05)
+    assert waits[2] == pytest.approx(1.0, abs=0.05)
+    assert pacer.reserve("archive.org", 0.5) == 0
+
+
+class VersionedScraper(FakeScraper):
+    """Lists ``versions`` after ``delay`` seconds; downloads succeed unless ``broken``."""
+
+    def __init__(
+        self,
+        source: DownloadSource,
+        versions: list[str],
+        *,
+        delay: float = 0,
+        broken: bool = False,
+        reported_version: str | None = None,
+    ) -> None:
+        super().__init__(source)
+        self.versions = versions
+        self.delay = delay
+        self.broken = broken
+        self.reported_version = reported_version
+        self.downloads = 0
+        self.cancelled = False
+
+    async def iter_versions(self, pkg_name: str, **kwargs: object) -> AsyncGenerator[VersionInfo]:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        for version in self.versions:
+            yield VersionInfo(version)
+
+    async def download(
+        self,
+        pkg_name: str,
+        version: str | None,
+        output_path: Path,
+        **kwargs: object,
+    ) -> DownloadResult:
+        self.downloads += 1
+        if self.broken:
+            return DownloadResult(success=False, error="blocked")
+        await asyncio.to_thread(output_path.write_bytes, self.source.value.encode())
+        return DownloadResult(success=True, file_path=output_path, version=self.reported_version or version)
+
+
+def _candidates(*scrapers: VersionedScraper) -> list[SourceCandidate]:
+    return [SourceCandidate(s.source, "com.example.app") for s in scrapers]
+
+
+def test_race_downloads_from_first_confirming_source(manager: DownloadManager, tmp_path: Path) -> None:
+    slow = VersionedScraper(DownloadSource.APKMIRROR, ["2.0", "1.0"], delay=5)
+    fast = VersionedScraper(DownloadSource.ARCHIVE, ["2.0", "1.0"])
+    _install(manager, slow, fast)
+
+    path, source = manager.download_any(_candidates(slow, fast), "1.0", tmp_path / "app.apk")
+
+    assert source == DownloadSource.ARCHIVE
+    assert path.read_bytes() == b"archive"
+    assert slow.cancelled
+    assert slow.downloads == 0
+
+
+def test_race_falls_over_when_winner_fails(manager: DownloadManager, tmp_path: Path) -> None:
+    blocked = VersionedScraper(DownloadSource.APKMIRROR, ["1.0"], broken=True)
+    missing = VersionedScraper(DownloadSource.ARCHIVE, ["3.0", "0.9"])
+    backup = VersionedScraper(DownloadSource.UPTODOWN, ["1.0"], delay=0.05)
+    _install(manager, blocked, missing, backup)
+
+    _, source = manager.download_any(_candidates(blocked, missing, backup), "1.0", tmp_path / "app.apk")
+
+    assert source == DownloadSource.UPTODOWN
+    assert blocked.downloads == 1
+    assert missing.downloads == 0
+
+
+def test_failover_rejects_wrong_version_and_package(manager: DownloadManager, tmp_path: Path) -> None:
+    wrong_version = VersionedScraper(DownloadSource.APKMIRROR, [], reported_version="0.9")
+    wrong_package = VersionedScraper(DownloadSource.ARCHIVE, [])
+    good = VersionedScraper(DownloadSource.UPTODOWN, [])
+    _install(manager, wrong_version, wrong_package, good)
+    identities = {b"archive": ("com.other.app", "1.0"), b"uptodown": ("com.example.app", "1.0")}
+
+    with patch(
+        "scripts.scrapers.download_manager.read_apk_identity",
+        side_effect=lambda path: identities.get(path.read_bytes()),
+    ):
+        path, source = manager.download_any(
+            _candidates(wrong_version, wrong_package, good),
+            "1.0",
+            tmp_path / "app.apk",
+            mode="failover",
+            expected_package="com.example.app",
+        )
+
+    assert source == DownloadSource.UPTODOWN
+    assert path.read_bytes() == b"uptodown"
+    assert [s.downloads for s in (wrong_version, wrong_package, good)] == [1, 1, 1]
+
+
+def test_no_source_delivers(manager: DownloadManager, tmp_path: Path) -> None:
+    scraper = VersionedScraper(DownloadSource.ARCHIVE, ["2.0"])
+    _install(manager, scraper)
+
+    with pytest.raises(RuntimeError, match=r"archive: version 1\.0 not listed"):
+        manager.download_any(_candidates(scraper), "1.0", tmp_path / "app.apk")
+
+
+def test_outcomes_are_recorded_and_reorder_failover(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+    manager = DownloadManager(stats=stats)
+    blocked = VersionedScraper(DownloadSource.APKMIRROR, ["1.0"], broken=True)
+    good = VersionedScraper(DownloadSource.ARCHIVE, ["1.0"])
+    _install(manager, blocked, good)
+    try:
+        for run in range(2):
+            _, source = manager.download_any(
+                _candidates(blocked, good), "1.0", tmp_path / f"app{run}.apk", mode="failover"
+            )
+            assert source == DownloadSource.ARCHIVE
+        assert manager.resolve("com.example.app", DownloadSource.ARCHIVE) == ("1.0", "1.0")
+    finally:
+        manager.close()
+
+    # The second run tried the healthy source first.
+    assert blocked.downloads == 1
+    assert stats.health(DownloadSource.APKMIRROR).last_error == "blocked"
+    archive = stats.health(DownloadSource.ARCHIVE)
+    assert archive.attempts == 3
+    assert archive.throughput is not None
+    assert archive.latency is not None
+
+
+def test_race_skips_sources_in_cooldown(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+    for _ in range(FAILURE_THRESHOLD):
+        stats.record_failure(DownloadSource.APKMIRROR, "403")
+    manager = DownloadManager(stats=stats)
+    tripped = VersionedScraper(DownloadSource.APKMIRROR, ["1.0"])
+    backup = VersionedScraper(DownloadSource.ARCHIVE, ["1.0"], delay=0.05)
+    _install(manager, tripped, backup)
+    try:
+        _, source = manager.download_any(_candidates(tripped, backup), "1.0", tmp_path / "app.apk")
+        # With nothing else left, a source in cooldown still gets its turn.
+        _, alone = manager.download_any(_candidates(tripped), "1.0", tmp_path / "app.apk")
+    finally:
+        manager.close()
+
+    assert source == DownloadSource.ARCHIVE
+    assert alone == DownloadSource.APKMIRROR
+    assert tripped.downloads == 1
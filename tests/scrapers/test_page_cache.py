@@ -0,0 +1,140 @@
+"""Tests for the persistent scraper page cache."""
+
+# ruff: noqa: S101, D107
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from scripts.scrapers.base import DownloadSource, ScraperBase
+from scripts.scrapers.page_cache import PageCache, reset_page_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+URL = "https://www.apkmirror.com/apk/google-inc/youtube/"
+
+
+def _response(body: bytes, status: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(status, content=body, headers=headers, request=httpx.Request("GET", URL))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("SCRAPER_PAGE_CACHE", str(tmp_path / "pages.sqlite3"))
+    reset_page_cache()
+    yield
+    reset_page_cache()
+
+
+class TestPageCache:
+    def test_pages_survive_reopening(self, tmp_path: Path) -> None:
+        path = tmp_path / "pages.sqlite3"
+        first = PageCache(path)
+        first.put(URL, _response(b"<html>v1</html>", **{"content-type": "text/html", "etag": '"abc"'}))
+        first.close()
+
+        page = PageCache(path).get(URL)
+
+        assert page is not None
+        assert page.body == b"<html>v1</html>"
+        assert page.conditional_headers() == {"If-None-Match": '"abc"'}
+        assert page.to_response().text == "<html>v1</html>"
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = PageCache(None, max_bytes=250)
+        for name in ["a", "b"]:
+            cache.put(f"{URL}{name}", _response(b"x" * 100))
+            time.sleep(0.01)
+        cache.get(f"{URL}a")
+        time.sleep(0.01)
+
+        cache.put(f"{URL}c", _response(b"x" * 100))
+
+        assert cache.get(f"{URL}b") is None
+        assert cache.get(f"{URL}a") is not None
+        assert cache.total_bytes() == 200
+
+    def test_errors_and_oversized_pages_are_not_stored(self) -> None:
+        cache = PageCache(None, max_bytes=10)
+        cache.put(URL, _response(b"gone", status=404))
+        cache.put(f"{URL}big", _response(b"x" * 11))
+
+        assert cache.total_bytes() == 0
+
+    def test_unwritable_path_disables_cache(self, tmp_path: Path) -> None:
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = PageCache(blocker / "pages.sqlite3")
+
+        cache.put(URL, _response(b"page"))
+
+        assert cache.get(URL) is None
+
+
+class MockScraper(ScraperBase):
+    """Scraper whose session is answered by a mock transport."""
+
+    MIN_REQUEST_INTERVAL = 0
+
+    def __init__(self, transport: httpx.MockTransport) -> None:
+        super().__init__(DownloadSource.APKMIRROR)
+        self._session = httpx.AsyncClient(transport=transport)
+
+
+class TestScraperGet:
+    @pytest.mark.asyncio
+    async def test_fresh_page_served_without_request(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, text="listing")
+
+        scraper = MockScraper(httpx.MockTransport(handler))
+        first = await scraper.get(URL)
+        second = await MockScraper(httpx.MockTransport(handler)).get(URL)
+
+        assert first.text == second.text == "listing"
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_page_revalidated(self) -> None:
+        seen: list[str | None] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text="listing", headers={"ETag": '"v1"'})
+
+        scraper = MockScraper(httpx.MockTransport(handler))
+        scraper.CACHE_TTL = 0
+        await scraper.get(URL)
+        response = await scraper.get(URL)
+
+        assert response.status_code == 200
+        assert response.text == "listing"
+        assert seen == [None, '"v1"']
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_bypasses_cache(self) -> None:
+        count = 0
+
+        def handler(_request: httpx.Request) -> httpx.Response:
+            nonlocal count
+            count += 1
+            return httpx.Response(200, text=f"token {count}")
+
+        scraper = MockScraper(httpx.MockTransport(handler))
+        await scraper.get(URL, use_cache=False)
+        response = await scraper.get(URL, use_cache=False)
+
+        assert response.text == "token 2"
+        assert await scraper.get(URL) is not None
+        assert count == 3
@@ -0,0 +1,89 @@
+"""Tests for the parsed scraper result cache."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from scripts.scrapers.result_cache import ResultCache, approximate_size
+
+
+class TestResultCache:
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = ResultCache(max_bytes=2 * approximate_size(1))
+        cache.store("a", 1, ttl=60)
+        cache.store("b", 2, ttl=60)
+        cache.lookup("a")
+
+        cache.store("c", 3, ttl=60)
+
+        assert cache.lookup("b") == (False, None)
+        assert cache.lookup("a") == (True, 1)
+        assert len(cache) == 2
+
+    def test_large_results_evict_by_size(self) -> None:
+        small = ["19.12.0"] * 10
+        large = ["19.12.0"] * 1000
+        cache = ResultCache(max_bytes=approximate_size(large) + approximate_size(small))
+        cache.store("small", small, ttl=60)
+        cache.store("versions", small, ttl=60)
+
+        cache.store("large", large, ttl=60)
+
+        assert cache.lookup("small") == (False, None)
+        assert cache.lookup("versions") == (True, small)
+        assert cache.size == approximate_size(large) + approximate_size(small)
+
+    def test_oversized_result_is_not_kept(self) -> None:
+        cache = ResultCache(max_bytes=approximate_size("x"))
+        cache.store("page", "x" * 100, ttl=60)
+
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_replacing_an_entry_updates_the_size(self) -> None:
+        cache = ResultCache()
+        cache.store("a", "x" * 100, ttl=60)
+        cache.store("a", "x", ttl=60)
+
+        assert cache.size == approximate_size("x")
+
+    def test_expired_entries_miss(self) -> None:
+        cache = ResultCache()
+        with patch("scripts.scrapers.result_cache.time.monotonic", return_value=100.0):
+            cache.store("a", None, ttl=10)
+        with patch("scripts.scrapers.result_cache.time.monotonic", return_value=105.0):
+            assert cache.lookup("a") == (True, None)
+        with patch("scripts.scrapers.result_cache.time.monotonic", return_value=110.0):
+            assert cache.lookup("a") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_memoize_computes_once(self) -> None:
+        cache = ResultCache()
+        calls = 0
+
+        async def compute() -> list[str]:
+            nonlocal calls
+            calls += 1
+            return ["19.12.0"]
+
+        assert await cache.memoize("versions", 60, compute) == ["19.12.0"]
+        assert await cache.memoize("versions", 60, compute) == ["19.12.0"]
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_memoize_does_not_cache_failures(self) -> None:
+        cache = ResultCache()
+
+        async def fail() -> str:
+            raise RuntimeError
+
+        async def succeed() -> str:
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.memoize("page", 60, fail)
+        assert await cache.memoize("page", 60, succeed) == "ok"
@@ -0,0 +1,99 @@
+"""Tests for download source health records."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from scripts.scrapers.base import DownloadSource
+from scripts.scrapers.source_stats import (
+    BASE_COOLDOWN,
+    FAILURE_THRESHOLD,
+    SourceHealth,
+    SourceStats,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SOURCES = [DownloadSource.APKMIRROR, DownloadSource.ARCHIVE, DownloadSource.UPTODOWN]
+
+
+def test_records_survive_reopening(tmp_path: Path) -> None:
+    path = tmp_path / "source-stats.json"
+    stats = SourceStats(path)
+    stats.record_success(DownloadSource.ARCHIVE, latency=2.0)
+    stats.record_success(DownloadSource.ARCHIVE, size=4 * 1024 * 1024, seconds=2.0)
+    stats.record_failure(DownloadSource.ARCHIVE, "HTTP 503")
+    stats.save()
+
+    health = SourceStats(path).health(DownloadSource.ARCHIVE)
+
+    assert health.attempts == 3
+    assert health.failures == 1
+    assert health.latency == 2.0
+    assert health.throughput == 2 * 1024 * 1024
+    assert health.success_rate == pytest.approx(0.7)
+    assert health.last_error == "HTTP 503"
+
+
+def test_corrupt_file_starts_empty(tmp_path: Path) -> None:
+    path = tmp_path / "source-stats.json"
+    path.write_text('{"archive": {"attempts": "many", "bogus": 1}, "apkmirror": [1]')
+
+    assert SourceStats(path).snapshot() == {}
+
+
+def test_unrecorded_source_scores_neutral() -> None:
+    assert SourceHealth().score() == 0.5
+
+
+def test_order_prefers_fast_reliable_sources(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+    stats.record_success(DownloadSource.UPTODOWN, latency=0.5)
+    stats.record_success(DownloadSource.APKMIRROR, latency=1.0)
+    stats.record_failure(DownloadSource.APKMIRROR, "timeout")
+
+    # Uptodown is fast, Archive unknown, APKMirror half failing.
+    assert stats.order(SOURCES, lambda s: s) == [
+        DownloadSource.UPTODOWN,
+        DownloadSource.ARCHIVE,
+        DownloadSource.APKMIRROR,
+    ]
+
+
+def test_equal_scores_keep_configured_order(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+
+    assert stats.order(SOURCES, lambda s: s) == SOURCES
+
+
+def test_repeated_failures_open_the_circuit(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+    stats.record_success(DownloadSource.APKMIRROR, latency=0.1)
+    for _ in range(FAILURE_THRESHOLD):
+        stats.record_failure(DownloadSource.APKMIRROR, "403", now=1000.0)
+
+    health = stats.health(DownloadSource.APKMIRROR)
+    assert health.cooldown_until == 1000.0 + BASE_COOLDOWN
+    assert health.cooling_down(now=1000.0)
+    assert not health.cooling_down(now=1000.0 + BASE_COOLDOWN)
+
+    stats.record_failure(DownloadSource.APKMIRROR, "403", now=2000.0)
+    assert stats.health(DownloadSource.APKMIRROR).cooldown_until == 2000.0 + 2 * BASE_COOLDOWN
+
+
+def test_success_closes_the_circuit(tmp_path: Path) -> None:
+    stats = SourceStats(tmp_path / "stats.json")
+    for _ in range(FAILURE_THRESHOLD):
+        stats.record_failure(DownloadSource.APKMIRROR, "403")
+    assert stats.order(SOURCES[:2], lambda s: s) == [DownloadSource.ARCHIVE, DownloadSource.APKMIRROR]
+
+    stats.record_success(DownloadSource.APKMIRROR, latency=1.0)
+
+    health = stats.health(DownloadSource.APKMIRROR)
+    assert health.consecutive_failures == 0
+    assert not health.cooling_down()
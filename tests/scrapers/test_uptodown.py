@@ -0,0 +1,160 @@
+"""Tests for Uptodown scraper."""
+
+# ruff: noqa: S101, D107
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from scripts.scrapers.base import first_version
+from scripts.scrapers.uptodown import PAGE_FETCH_CONCURRENCY, UptodownScraper
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _page(*versions: str) -> str:
+    cards = "".join(
+        f'<div class="card"><a class="version-detail" href="/android/download/{v}">{v}</a><p>arm64-v8a</p></div>'
+        for v in versions
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+class FakePages:
+    def __init__(self, pages: list[str]) -> None:
+        self.pages = pages
+        self.fetched: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def fetch(self, url: str) -> str | None:
+        self.fetched.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        page = int(url.rsplit("/", 1)[-1])
+        return self.pages[page - 1] if page <= len(self.pages) else "<html></html>"
+
+
+@pytest.fixture
+def scraper() -> UptodownScraper:
+    return UptodownScraper()
+
+
+@pytest.mark.asyncio
+async def test_newest_version_needs_one_page(scraper: UptodownScraper) -> None:
+    pages = FakePages([_page("20.1", "20.0"), _page("19.9")])
+
+    with patch.object(scraper, "_fetch_page", side_effect=pages.fetch):
+        latest = await first_version(scraper.iter_versions("youtube"))
+
+    assert latest is not None
+    assert latest.version == "20.1"
+    assert len(pages.fetched) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_versions_walks_all_pages(scraper: UptodownScraper) -> None:
+    pages = FakePages([_page("20.1", "20.0"), _page("20.0", "19.9")])
+
+    with patch.object(scraper, "_fetch_page", side_effect=pages.fetch):
+        versions = await scraper.get_versions("youtube", arch="arm64-v8a")
+
+    assert [v.version for v in versions] == ["20.1", "20.0", "19.9"]
+    assert pages.fetched[:3] == [scraper._build_version_page_url("youtube", page) for page in (1, 2, 3)]
+
+
+@pytest.mark.asyncio
+async def test_cards_sorted_within_each_page(scraper: UptodownScraper) -> None:
+    pages = FakePages([_page("20.0", "20.10", "20.2"), _page("19.8", "19.9")])
+
+    with patch.object(scraper, "_fetch_page", side_effect=pages.fetch):
+        latest = await first_version(scraper.iter_versions("youtube"))
+        versions = await scraper.get_versions("youtube")
+
+    assert latest is not None
+    assert latest.version == "20.10"
+    assert [v.version for v in versions] == ["20.10", "20.2", "20.0", "19.9", "19.8"]
+
+
+@pytest.mark.asyncio
+async def test_later_pages_fetched_in_parallel_until_target(scraper: UptodownScraper) -> None:
+    scraper.max_pages = 10
+    pages = FakePages([_page(f"20.{9 - page}") for page in range(9)])
+
+    with patch.object(scraper, "_fetch_page", side_effect=pages.fetch):
+        card = await scraper._resolve_target_version("youtube", "20.6", None)
+
+    assert card is not None
+    assert card.version == "20.6"
+    assert pages.peak == PAGE_FETCH_CONCURRENCY
+    # Page 4 holds the target; at most one window beyond it had started.
+    assert len(pages.fetched) <= 4 + PAGE_FETCH_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_download_crawls_pages_once(scraper: UptodownScraper, tmp_path: Path) -> None:
+    pages = FakePages([_page("20.1", "20.0")])
+
+    with (
+        patch.object(scraper, "_fetch_page", side_effect=pages.fetch),
+        patch.object(scraper, "_stream_to_file", return_value=httpx.Response(200)) as stream,
+    ):
+        result = await scraper.download("youtube", None, tmp_path / "app.apk")
+
+    assert result.success
+    assert result.version == "20.1"
+    stream.assert_awaited_once()
+    assert len(pages.fetched) == 1
+
+
+@pytest.mark.asyncio
+async def test_html_instead_of_apk_fails_download(scraper: UptodownScraper, tmp_path: Path) -> None:
+    pages = FakePages([_page("20.1")])
+    scraper.MIN_REQUEST_INTERVAL = 0
+    scraper._session = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda _request: httpx.Response(200, html="<html>Please wait</html>"))
+    )
+
+    with patch.object(scraper, "_fetch_page", side_effect=pages.fetch):
+        result = await scraper.download("youtube", "20.1", tmp_path / "app.apk")
+
+    assert not result.success
+    assert result.error == "Received HTML instead of APK"
+    assert not (tmp_path / "app.apk").exists()
+
+
+@pytest.mark.asyncio
+async def test_xapk_main_apk_is_streamed_out(scraper: UptodownScraper, sample_xapk: Path, tmp_path: Path) -> None:
+    output = tmp_path / "out" / "app.apk"
+
+    with patch.object(zipfile.ZipFile, "read", side_effect=AssertionError("whole member read")):
+        result = await scraper._download_xapk(sample_xapk, output, "20.1")
+
+    assert result.success
+    assert output.read_bytes() == b"PK\x03\x04" + b"\x00" * 26
+    assert sorted(p.name for p in output.parent.iterdir()) == ["app.apk"]
+
+
+@pytest.mark.asyncio
+async def test_xapk_without_apk_or_invalid(scraper: UptodownScraper, tmp_path: Path) -> None:
+    empty = tmp_path / "empty.xapk"
+    with zipfile.ZipFile(empty, "w") as zf:
+        zf.writestr("manifest.json", "{}")
+    broken = tmp_path / "broken.xapk"
+    broken.write_bytes(b"not a zip")
+
+    no_apk = await scraper._download_xapk(empty, tmp_path / "a.apk", "20.1")
+    invalid = await scraper._download_xapk(broken, tmp_path / "b.apk", "20.1")
+
+    assert no_apk.error == "No APK found in XAPK bundle"
+    assert invalid.error == "Invalid XAPK file format"
+    assert not (tmp_path / "a.apk").exists()
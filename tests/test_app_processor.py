@@ -4,7 +4,10 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -14,6 +17,8 @@ from scripts.builder.app_processor import (
     Architecture,
     DownloadSource,
     _is_morphe_patches_source,
+    _prebuilt_specs,
+    prefetch_prebuilts,
 )
 from scripts.builder.cli_profiles import (
     ADOBO_CLI,
@@ -22,7 +27,8 @@ from scripts.builder.cli_profiles import (
     REVANCED_CLI_V6,
     CLIProfileType,
 )
-from scripts.builder.config import AppConfig, GlobalConfig
+from scripts.builder.config import AppConfig, Config, GlobalConfig
+from scripts.scrapers.source_stats import SourceStats
 
 
 class TestAppProcessorArchitecture:
@@ -100,6 +106,94 @@ class TestAppProcessorDownloadSource:
         source = processor._determine_download_source(app_config)
         assert source == expected_source
 
+    def test_recorded_health_reorders_sources(self, processor: AppProcessor, tmp_path: Path) -> None:
+        """Test that the healthiest configured source is preferred over the priority order."""
+        processor.source_stats = SourceStats(tmp_path / "source-stats.json")
+        processor.source_stats.record_failure(DownloadSource.APKMIRROR, "HTTP 403")
+        app_config = AppConfig(
+            name="TestApp",
+            options={"apkmirror_dlurl": "https://apkmirror.com/a", "archive_dlurl": "https://archive.org/a"},
+        )
+
+        assert processor._determine_download_source(app_config) == DownloadSource.ARCHIVE
+
+
+class TestAppProcessorMultiSourceDownload:
+    """Tests for the race/failover path of AppProcessor._download_stock_apk."""
+
+    OPTIONS = {  # noqa: RUF012
+        "uptodown_dlurl": "https://youtube.en.uptodown.com/android",
+        "apkmirror_dlurl": "https://www.apkmirror.com/apk/google-inc/youtube/",
+        "archive_dlurl": "https://archive.org/download/jhc-apks/apks/com.google.android.youtube",
+    }
+
+    def _processor(self, mode: str) -> tuple[AppProcessor, MagicMock]:
+        config = MagicMock()
+        config.global_settings = GlobalConfig(download_mode=mode)  # type: ignore[arg-type]
+        manager = MagicMock()
+        manager.download_any.return_value = (Path("build/stock.apk"), DownloadSource.ARCHIVE)
+        return AppProcessor(config=config, java_runner=MagicMock(), download_manager=manager), manager
+
+    def _context(self) -> AppBuildContext:
+        return AppBuildContext(
+            app_name="YouTube",
+            app_id="YouTube",
+            brand="revanced",
+            version="20.1.0",
+            arch="arm64-v8a",
+            output_path=Path("build/YouTube-20.1.0-arm64-v8a.apk"),
+            source=DownloadSource.APKMIRROR,
+            scraper_pkg_name="google-inc/youtube",
+            options=self.OPTIONS,
+        )
+
+    def test_race_tries_every_configured_source(self) -> None:
+        processor, manager = self._processor("race")
+
+        assert processor._download_stock_apk(self._context()) == Path("build/stock.apk")
+
+        candidates = manager.download_any.call_args.args[0]
+        assert [(c.source, c.app_id) for c in candidates] == [
+            (DownloadSource.APKMIRROR, "google-inc/youtube"),
+            (DownloadSource.ARCHIVE, "com.google.android.youtube"),
+            (DownloadSource.UPTODOWN, "android"),
+        ]
+        assert manager.download_any.call_args.kwargs["expected_package"] == "com.google.android.youtube"
+        manager.download.assert_not_called()
+
+    def test_single_mode_uses_preferred_source(self) -> None:
+        processor, manager = self._processor("single")
+
+        processor._download_stock_apk(self._context())
+
+        manager.download_any.assert_not_called()
+        assert manager.download.call_args.args[3] == DownloadSource.APKMIRROR
+
+    def test_stock_file_is_per_arch(self) -> None:
+        processor, manager = self._processor("race")
+
+        processor._download_stock_apk(self._context())
+
+        assert manager.download_any.call_args.args[2] == Path("build/stock-YouTube-20.1.0-arm64-v8a.apk")
+
+
+class TestAppProcessorScheduleVariants:
+    """Tests for the size-probe URLs of AppProcessor._schedule_variants."""
+
+    APP = AppConfig(name="YouTube", options={"arch": "arm64-v8a", "archive_dlurl": "https://example.com/yt.apk"})
+
+    def test_direct_download_url_is_probed(self) -> None:
+        processor = AppProcessor(config=MagicMock(), java_runner=MagicMock())
+
+        variants = processor._schedule_variants([self.APP])
+
+        assert [(v.key, v.url) for v in variants] == [("YouTube-arm64-v8a", "https://example.com/yt.apk")]
+
+    def test_listing_pages_are_not_probed(self) -> None:
+        processor = AppProcessor(config=MagicMock(), java_runner=MagicMock(), download_manager=MagicMock())
+
+        assert [v.url for v in processor._schedule_variants([self.APP])] == [None]
+
 
 class TestIsMorphePatchesSource:
     """Tests for _is_morphe_patches_source.
@@ -300,3 +394,110 @@ class TestRunPatcherUsesProfile:
         args = call.args[1]
         assert "--rip-lib" not in args
         assert "-r" not in args
+
+
+class TestPrefetchPrebuilts:
+    """Tests for prefetch_prebuilts and the shared prebuilt specs."""
+
+    RELEASES = json.dumps(
+        [
+            {
+                "tag_name": "v1",
+                "assets": [
+                    {"name": "cli-all.jar", "url": "https://api.github.com/assets/jar"},
+                    {"name": "patches.mpp", "url": "https://api.github.com/assets/mpp"},
+                ],
+            }
+        ]
+    )
+
+    @staticmethod
+    def _config(*apps: AppConfig) -> Config:
+        return Config(
+            global_settings=GlobalConfig(),
+            apps={app.name: app for app in apps},
+            modules={},
+            source_files=[],
+            loaded_at=datetime.now(UTC),
+        )
+
+    def test_specs_use_ensure_prebuilts_paths(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+        specs = _prebuilt_specs(
+            "MorpheApp/morphe-cli",
+            "latest",
+            ["MorpheApp/morphe-patches", "ReVanced/revanced-patches"],
+            "latest",
+            "app",
+        )
+        assert [spec.path for spec in specs] == [
+            tmp_path / "prebuilts" / "cli-latest.jar",
+            tmp_path / "prebuilts" / "patches-latest-0.mpp",
+            tmp_path / "prebuilts" / "patches-latest-1.rvp",
+        ]
+
+    def test_fetches_each_artifact_once(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+        requested: list[str] = []
+        downloaded: list[str] = []
+
+        async def fake_req(url: str, *_args: object) -> str:
+            requested.append(url)
+            return self.RELEASES
+
+        async def fake_dl(path: Path, url: str, *_args: object) -> bool:
+            downloaded.append(url)
+            path.write_bytes(b"jar")  # noqa: ASYNC240
+            return True
+
+        config = self._config(AppConfig(name="a"), AppConfig(name="b"), AppConfig(name="c", enabled=False))
+        with (
+            patch("scripts.utils.network.async_gh_req", side_effect=fake_req),
+            patch("scripts.utils.network.async_gh_dl", side_effect=fake_dl),
+        ):
+            assert prefetch_prebuilts(config) == []
+
+        assert sorted(requested) == [
+            "https://api.github.com/repos/MorpheApp/morphe-cli/releases",
+            "https://api.github.com/repos/MorpheApp/morphe-patches/releases",
+        ]
+        assert sorted(downloaded) == ["https://api.github.com/assets/jar", "https://api.github.com/assets/mpp"]
+
+    def test_reports_failures_and_ensure_prebuilts_reuses_hits(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+
+        async def fake_dl(path: Path, url: str, *_args: object) -> bool:
+            if url.endswith("mpp"):
+                return False
+            path.write_bytes(b"jar")  # noqa: ASYNC240
+            return True
+
+        config = self._config(AppConfig(name="a"))
+        with (
+            patch("scripts.utils.network.async_gh_req", return_value=self.RELEASES),
+            patch("scripts.utils.network.async_gh_dl", side_effect=fake_dl),
+        ):
+            failed = prefetch_prebuilts(config)
+
+        assert failed == [tmp_path / "prebuilts" / "patches-latest-0.mpp"]
+
+        processor = AppProcessor(config=config, java_runner=MagicMock())
+        context = AppBuildContext(
+            app_name="a",
+            app_id="a",
+            brand="revanced",
+            version="1",
+            arch="all",
+            output_path=tmp_path / "out.apk",
+            source=DownloadSource.APKMIRROR,
+        )
+        with (
+            patch("scripts.builder.app_processor._resolve_github_release_asset", return_value=("p.mpp", "mpp")),
+            patch("scripts.utils.network.gh_dl", return_value=True) as gh_dl,
+        ):
+            cli_jar, _ = processor._ensure_prebuilts(context)
+
+        assert cli_jar.read_bytes() == b"jar"
+        gh_dl.assert_called_once_with(tmp_path / "prebuilts" / "patches-latest-0.mpp", "mpp")
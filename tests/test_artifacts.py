@@ -0,0 +1,174 @@
+"""Tests for scripts/utils/artifacts.py."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from scripts.utils.artifacts import (
+    URL_INDEX_TTL,
+    ArtifactStore,
+    StreamDigest,
+    cached_digests,
+    digest_sidecar_path,
+    file_sha256,
+    link_or_copy,
+    move_with_digests,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+URL = "https://github.com/owner/repo/releases/download/v1.0/patches.mpp"
+BODY = b"patch bundle contents"
+DIGEST = hashlib.sha256(BODY).hexdigest()
+
+
+def _digests_of(data: bytes) -> dict[str, str]:
+    digest = StreamDigest()
+    digest.update(data)
+    return digest.hexdigests()
+
+
+def _file(path: Path, data: bytes = BODY) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+class TestArtifactStore:
+    def test_add_moves_file_into_blob(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        src = _file(tmp_path / "download.tmp")
+
+        assert store.add(src) == DIGEST
+        assert not src.exists()
+        assert store.blob_path(DIGEST).read_bytes() == BODY
+
+    def test_add_duplicate_keeps_single_blob(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        store.add(_file(tmp_path / "a"))
+        store.add(_file(tmp_path / "b"), DIGEST)
+
+        assert [p for p in (tmp_path / "store" / "blobs").rglob("*") if p.is_file() and p.name[0] != "."] == [
+            store.blob_path(DIGEST)
+        ]
+
+    def test_lookup_after_record(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        store.record(URL, store.add(_file(tmp_path / "a")))
+
+        assert store.lookup(URL) == DIGEST
+        assert store.lookup(URL + "?other") is None
+
+    def test_lookup_ignores_missing_blob(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        store.record(URL, store.add(_file(tmp_path / "a")))
+        store.blob_path(DIGEST).unlink()
+
+        assert store.lookup(URL) is None
+
+    def test_mutable_urls_are_not_indexed(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        url = "https://github.com/owner/repo/releases/latest/download/aapt2"
+        store.record(url, store.add(_file(tmp_path / "a")))
+
+        assert store.lookup(url) is None
+
+    def test_materialized_output_is_independent(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        digest = store.add(_file(tmp_path / "a"))
+        dest = tmp_path / "build" / "out.mpp"
+
+        store.materialize(digest, dest)
+        dest.write_bytes(b"edited")
+
+        assert dest.stat().st_ino != store.blob_path(digest).stat().st_ino
+        assert store.blob_path(digest).read_bytes() == BODY
+        assert not store.blob_path(digest).stat().st_mode & 0o222
+
+    def test_urls_with_query_are_not_indexed(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        url = "https://www.apkmirror.com/wp-content/themes/APKMirror/download.php?id=1&key=abc"
+        store.record(url, store.add(_file(tmp_path / "a")))
+
+        assert store.lookup(url) is None
+        assert not (tmp_path / "store" / "urls").exists()
+
+    def test_index_entries_expire(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store")
+        store.record(URL, store.add(_file(tmp_path / "a")))
+
+        with patch("scripts.utils.artifacts.time.time", return_value=time.time() + URL_INDEX_TTL + 1):
+            assert store.lookup(URL) is None
+
+    def test_prune_drops_least_recently_used(self, tmp_path: Path) -> None:
+        store = ArtifactStore(tmp_path / "store", max_bytes=2 * len(BODY))
+        old = store.add(_file(tmp_path / "a", b"a" * len(BODY)))
+        used = store.add(_file(tmp_path / "b", b"b" * len(BODY)))
+        os.utime(store.blob_path(old), (1, 1))
+        os.utime(store.blob_path(used), (2, 2))
+
+        newest = store.add(_file(tmp_path / "c"))
+
+        assert not store.has(old)
+        assert store.has(used)
+        assert store.has(newest)
+
+
+class TestDigestSidecar:
+    def test_file_sha256_records_sidecar(self, tmp_path: Path) -> None:
+        path = _file(tmp_path / "app.apk")
+
+        assert file_sha256(path) == DIGEST
+        assert cached_digests(path) == _digests_of(BODY)
+
+    def test_unchanged_file_is_not_reread(self, tmp_path: Path) -> None:
+        path = _file(tmp_path / "app.apk")
+        file_sha256(path)
+
+        with patch.object(StreamDigest, "update_from_file") as reread:
+            assert file_sha256(path) == DIGEST
+        reread.assert_not_called()
+
+    def test_modified_file_invalidates_sidecar(self, tmp_path: Path) -> None:
+        path = _file(tmp_path / "app.apk")
+        file_sha256(path)
+        path.write_bytes(b"tampered")
+
+        assert cached_digests(path) is None
+        assert file_sha256(path) == hashlib.sha256(b"tampered").hexdigest()
+
+    def test_move_keeps_digests(self, tmp_path: Path) -> None:
+        src = _file(tmp_path / "download.tmp")
+        file_sha256(src)
+        dst = tmp_path / "app.apk"
+
+        move_with_digests(src, dst)
+
+        assert cached_digests(dst) is not None
+        assert not digest_sidecar_path(src).exists()
+
+
+class TestLinkOrCopy:
+    def test_replaces_existing_destination(self, tmp_path: Path) -> None:
+        src = _file(tmp_path / "src")
+        dst = _file(tmp_path / "dst", b"old")
+
+        link_or_copy(src, dst)
+
+        assert dst.read_bytes() == BODY
+
+    def test_falls_back_to_copy(self, tmp_path: Path) -> None:
+        src = _file(tmp_path / "src")
+        dst = tmp_path / "dst"
+
+        with patch("scripts.utils.artifacts._reflink", return_value=False):
+            assert link_or_copy(src, dst) == "copy"
+
+        assert dst.read_bytes() == BODY
+        assert dst.stat().st_ino != src.stat().st_ino
@@ -134,6 +134,17 @@ class TestConfigLoader:
         assert "YouTube" in config.apps
         assert config.apps["YouTube"].enabled is True
 
+    def test_unknown_download_mode_raises(self, tmp_path: Path) -> None:
+        cfg_file = tmp_path / "config.toml"
+        cfg_file.write_text('download-mode = "rcae"\n')
+        with pytest.raises(ConfigError, match="download_mode must be one of single, failover, race"):
+            ConfigLoader().load(cfg_file)
+
+    def test_download_mode_from_top_level_key(self, tmp_path: Path) -> None:
+        cfg_file = tmp_path / "config.toml"
+        cfg_file.write_text('download-mode = "race"\n')
+        assert ConfigLoader().load(cfg_file).global_settings.download_mode == "race"
+
     def test_load_missing_file_raises(self, tmp_path: Path) -> None:
         loader = ConfigLoader()
         with pytest.raises(ConfigError):
@@ -0,0 +1,83 @@
+"""Tests for scripts/utils/cookies.py."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from scripts.utils.cookies import CookieStore, cookie_store, reset_cookie_stores
+from scripts.utils.network import HttpClient, HttpClientConfig, _client_options
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+COOKIES_TXT = "# Netscape HTTP Cookie File\n.apkmirror.com\tTRUE\t/\tTRUE\t2147483647\tsession\tabc123\n"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stores(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.delenv("COOKIE_FILE", raising=False)
+    reset_cookie_stores()
+    yield
+    reset_cookie_stores()
+
+
+def _echo_cookies(request: httpx.Request) -> httpx.Response:
+    headers = {"Set-Cookie": "cf_clearance=ok; Domain=.apkmirror.com; Path=/"} if request.url.path == "/cf" else {}
+    return httpx.Response(200, text=request.headers.get("Cookie", ""), headers=headers)
+
+
+def _client(cookie_file: Path) -> HttpClient:
+    config = HttpClientConfig(cookie_file=cookie_file)
+    options = {**_client_options(config), "transport": httpx.MockTransport(_echo_cookies)}
+    with patch("scripts.utils.network._client_options", return_value=options):
+        return HttpClient(config)
+
+
+class TestCookieStore:
+    def test_loads_netscape_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "cookies.txt"
+        path.write_text(COOKIES_TXT)
+
+        store = CookieStore(path)
+
+        assert {c.name: c.value for c in store.jar} == {"session": "abc123"}
+
+    def test_file_is_parsed_once(self, tmp_path: Path) -> None:
+        path = tmp_path / "cookies.txt"
+        path.write_text(COOKIES_TXT)
+        client = _client(path)
+
+        with patch("http.cookiejar.MozillaCookieJar.load") as load:
+            for _ in range(3):
+                assert client.get("https://www.apkmirror.com/") == "session=abc123"
+        load.assert_not_called()
+
+    def test_server_cookies_shared_and_saved(self, tmp_path: Path) -> None:
+        path = tmp_path / "cookies.txt"
+        with _client(path) as first:
+            first.get("https://www.apkmirror.com/cf")
+            second = _client(path)
+            assert second.get("https://www.apkmirror.com/") == "cf_clearance=ok"
+
+        assert "cf_clearance\tok" in path.read_text()
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_corrupt_file_starts_empty(self, tmp_path: Path) -> None:
+        path = tmp_path / "cookies.txt"
+        path.write_text("not a cookie file")
+
+        assert len(CookieStore(path).jar) == 0
+
+    def test_default_store_is_in_memory(self) -> None:
+        store = cookie_store()
+        store.save()
+
+        assert store.path is None
+        assert cookie_store(None) is store
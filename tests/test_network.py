@@ -4,25 +4,52 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import httpx
 import pytest
 
+from scripts.utils.artifacts import ArtifactStore, default_artifact_dir
 from scripts.utils.network import (
+    DOWNLOAD_CHUNK_SIZE,
+    SEGMENT_MIN_SIZE,
+    DownloadGovernor,
     HttpClient,
     HttpClientConfig,
+    _api_cache_path,
+    _client_options,
+    _ClientPool,
     _get_secure_work_dir,
+    _resume_meta_path,
+    _resume_request_headers,
+    _segment_bounds,
+    _verify_or_remove,
     aria2c_download,
+    async_gh_req,
+    download_governor,
+    download_job,
     download_with_aria2c_fallback,
     download_with_lock,
     gh_dl,
     gh_req,
+    parse_byte_rate,
     req,
 )
 
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory) -> None:
+    """Keep the API cache and artifact store out of the working tree."""
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+
+
 # ---------------------------------------------------------------------------
 # HttpClientConfig defaults
 # ---------------------------------------------------------------------------
@@ -105,6 +132,7 @@ class TestHttpClient:
     def test_get_delegates_to_do_request(self) -> None:
         client = HttpClient()
         mock_response = MagicMock(spec=httpx.Response)
+        mock_response.status_code = 200
         mock_response.text = "hello"
         mock_response.content = b"hello"
 
@@ -114,6 +142,260 @@ class TestHttpClient:
         assert result == "hello"
         client.close()
 
+    def test_get_streams_body_to_output_file(self, tmp_path: Path) -> None:
+        body = os.urandom(DOWNLOAD_CHUNK_SIZE * 3 + 17)
+        client = HttpClient()
+        client._sync_client = httpx.Client(
+            transport=httpx.MockTransport(lambda _req: httpx.Response(200, content=body))
+        )
+        output = tmp_path / "nested" / "app.apk"
+
+        assert client.get("https://example.com/app.apk", output) == ""
+        assert output.read_bytes() == body
+        client.close()
+
+    def test_streamed_download_records_digest(self, tmp_path: Path) -> None:
+        body = os.urandom(DOWNLOAD_CHUNK_SIZE * 2 + 5)
+        client = HttpClient()
+        client._sync_client = httpx.Client(
+            transport=httpx.MockTransport(lambda _req: httpx.Response(200, content=body))
+        )
+        output = tmp_path / "app.apk"
+        client.get("https://example.com/app.apk", output)
+        client.close()
+
+        with patch("scripts.utils.artifacts.StreamDigest.update_from_file") as reread:
+            assert _verify_or_remove(output, hashlib.sha256(body).hexdigest())
+        reread.assert_not_called()
+
+    def test_get_to_file_raises_on_error_status(self, tmp_path: Path) -> None:
+        client = HttpClient(HttpClientConfig(max_retries=0))
+        client._sync_client = httpx.Client(transport=httpx.MockTransport(lambda _req: httpx.Response(404)))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get("https://example.com/missing.apk", tmp_path / "missing.apk")
+        client.close()
+
+    @pytest.mark.asyncio
+    async def test_async_get_streams_body_to_output_file(self, tmp_path: Path) -> None:
+        body = os.urandom(DOWNLOAD_CHUNK_SIZE * 2 + 5)
+        output = tmp_path / "app.apk"
+        async with HttpClient() as client:
+            await client._async_client.aclose()  # type: ignore[union-attr]
+            client._async_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda _req: httpx.Response(200, content=body))
+            )
+            await client.async_get("https://example.com/app.apk", output)
+
+        assert output.read_bytes() == body
+
+
+# ---------------------------------------------------------------------------
+# Pooled clients
+# ---------------------------------------------------------------------------
+
+
+class TestClientPool:
+    def test_pooled_clients_share_one_httpx_client(self) -> None:
+        pool = _ClientPool()
+        with patch("scripts.utils.network._CLIENT_POOL", pool):
+            first = HttpClient(pooled=True)
+            second = HttpClient(pooled=True)
+            assert first._sync_client is second._sync_client
+            first.close()
+            assert not second._sync_client.is_closed
+        pool.close()
+        assert second._sync_client.is_closed
+
+    def test_different_settings_get_different_clients(self) -> None:
+        pool = _ClientPool()
+        assert pool.get_sync(HttpClientConfig()) is not pool.get_sync(HttpClientConfig(timeout=5))
+        pool.close()
+
+    def test_closed_client_is_recreated(self) -> None:
+        pool = _ClientPool()
+        client = pool.get_sync(HttpClientConfig())
+        client.close()
+        assert pool.get_sync(HttpClientConfig()) is not client
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_async_clients_are_shared_per_loop(self) -> None:
+        pool = _ClientPool()
+        with patch("scripts.utils.network._CLIENT_POOL", pool):
+            async with HttpClient(pooled=True) as first:
+                shared = first._async_client
+            async with HttpClient(pooled=True) as second:
+                assert second._async_client is shared
+        assert shared is not None
+        assert not shared.is_closed
+        await pool.aclose_loop()
+        assert shared.is_closed
+
+
+# ---------------------------------------------------------------------------
+# Resumable downloads
+# ---------------------------------------------------------------------------
+
+
+class TestResumableDownload:
+    URL = "https://example.com/app.apk"
+    BODY = b"0123456789" * 1000
+
+    def _client(self, handler: object) -> HttpClient:
+        client = HttpClient(HttpClientConfig(max_retries=0))
+        client._sync_client = httpx.Client(transport=httpx.MockTransport(handler))  # type: ignore[arg-type]
+        return client
+
+    def test_fresh_download_writes_resume_sidecar(self, tmp_path: Path) -> None:
+        part = tmp_path / "download.tmp"
+        client = self._client(lambda _req: httpx.Response(200, content=self.BODY, headers={"ETag": '"v1"'}))
+
+        client.get(self.URL, part, resume=True)
+
+        assert part.read_bytes() == self.BODY
+        assert json.loads(_resume_meta_path(part).read_text())["etag"] == '"v1"'
+        client.close()
+
+    def test_resume_appends_partial_content(self, tmp_path: Path) -> None:
+        part = tmp_path / "download.tmp"
+        part.write_bytes(self.BODY[:4000])
+        _resume_meta_path(part).write_text(json.dumps({"url": self.URL, "etag": '"v1"', "last_modified": None}))
+        seen: dict[str, str] = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.update(request.headers)
+            return httpx.Response(
+                206,
+                content=self.BODY[4000:],
+                headers={"Content-Range": f"bytes 4000-{len(self.BODY) - 1}/{len(self.BODY)}"},
+            )
+
+        client = self._client(handler)
+        client.get(self.URL, part, resume=True)
+
+        assert seen["range"] == "bytes=4000-"
+        assert seen["if-range"] == '"v1"'
+        assert part.read_bytes() == self.BODY
+        client.close()
+
+    def test_resume_rewrites_when_resource_changed(self, tmp_path: Path) -> None:
+        part = tmp_path / "download.tmp"
+        part.write_bytes(b"stale-bytes")
+        _resume_meta_path(part).write_text(json.dumps({"url": self.URL, "etag": '"old"', "last_modified": None}))
+        client = self._client(lambda _req: httpx.Response(200, content=self.BODY, headers={"ETag": '"new"'}))
+
+        client.get(self.URL, part, resume=True)
+
+        assert part.read_bytes() == self.BODY
+        client.close()
+
+    def test_partial_without_validator_is_not_resumed(self, tmp_path: Path) -> None:
+        part = tmp_path / "download.tmp"
+        part.write_bytes(b"partial")
+        _resume_meta_path(part).write_text(json.dumps({"url": self.URL, "etag": 'W/"weak"', "last_modified": None}))
+
+        assert _resume_request_headers(part, self.URL) == ({}, 0)
+
+    def test_download_with_lock_keeps_partial_on_network_error(self, tmp_path: Path) -> None:
+        output = tmp_path / "app.apk"
+
+        def fake_get(url: str, output: Path, **kwargs: object) -> str:
+            output.write_bytes(self.BODY[:100])
+            msg = "connection reset"
+            raise httpx.ReadError(msg)
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value.get.side_effect = fake_get
+            result = download_with_lock(self.URL, output, temp_dir=tmp_path)
+
+        assert result is False
+        part = _get_secure_work_dir(tmp_path, output.resolve()) / "download.tmp"
+        assert part.read_bytes() == self.BODY[:100]
+
+
+# ---------------------------------------------------------------------------
+# Segmented downloads
+# ---------------------------------------------------------------------------
+
+
+def _range_handler(body: bytes, requests: list[str], *, ranges: bool = True) -> object:
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range", "")
+        requests.append(range_header)
+        if not ranges or not range_header:
+            return httpx.Response(200, content=body)
+        start_text, _, end_text = range_header.removeprefix("bytes=").partition("-")
+        start = int(start_text)
+        end = int(end_text) if end_text else len(body) - 1
+        return httpx.Response(
+            206,
+            content=body[start : end + 1],
+            headers={"Content-Range": f"bytes {start}-{end}/{len(body)}"},
+        )
+
+    return handler
+
+
+class TestSegmentedDownload:
+    BODY = os.urandom(SEGMENT_MIN_SIZE * 4 + 123)
+
+    def test_segment_bounds_cover_whole_file(self) -> None:
+        assert _segment_bounds(10, 3) == [(0, 3), (4, 7), (8, 9)]
+
+    @pytest.mark.asyncio
+    async def test_assembles_file_from_parallel_ranges(self, tmp_path: Path) -> None:
+        requests: list[str] = []
+        output = tmp_path / "app.apk"
+        async with HttpClient() as client:
+            await client._async_client.aclose()  # type: ignore[union-attr]
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(_range_handler(self.BODY, requests)))  # type: ignore[arg-type]
+            assert await client.async_segmented_get("https://example.com/app.apk", output, segments=4)
+
+        assert output.read_bytes() == self.BODY
+        assert requests[0] == "bytes=0-0"
+        assert len(requests) == 5
+
+    @pytest.mark.asyncio
+    async def test_returns_false_without_range_support(self, tmp_path: Path) -> None:
+        requests: list[str] = []
+        output = tmp_path / "app.apk"
+        async with HttpClient() as client:
+            await client._async_client.aclose()  # type: ignore[union-attr]
+            client._async_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(_range_handler(self.BODY, requests, ranges=False))  # type: ignore[arg-type]
+            )
+            assert not await client.async_segmented_get("https://example.com/app.apk", output, segments=4)
+
+        assert not output.exists()
+
+    def test_download_with_lock_verifies_segmented_result(self, tmp_path: Path) -> None:
+        requests: list[str] = []
+        transport = httpx.MockTransport(_range_handler(self.BODY, requests))  # type: ignore[arg-type]
+        options = _client_options(HttpClientConfig())
+        output = tmp_path / "app.apk"
+
+        pool = _ClientPool()
+
+        with (
+            patch("scripts.utils.network._client_options", return_value={**options, "transport": transport}),
+            patch("scripts.utils.network._CLIENT_POOL", pool),
+            patch.object(HttpClient, "_save_cookies") as save_cookies,
+        ):
+            result = download_with_lock(
+                "https://example.com/app.apk",
+                output,
+                temp_dir=tmp_path,
+                sha256=hashlib.sha256(self.BODY).hexdigest(),
+                segments=3,
+            )
+
+        assert result is True
+        assert output.read_bytes() == self.BODY
+        assert len(requests) == 4
+        save_cookies.assert_not_called()
+        assert not any(pool._async.values())
+
 
 # ---------------------------------------------------------------------------
 # download_with_lock
@@ -139,6 +421,58 @@ class TestDownloadWithLock:
 
         assert result is False
 
+    def test_same_url_for_two_outputs_is_fetched_once(self, tmp_path: Path) -> None:
+        body = os.urandom(4096)
+        requests: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(str(request.url))
+            return httpx.Response(200, content=body)
+
+        options = _client_options(HttpClientConfig())
+        first, second = tmp_path / "patches-0.mpp", tmp_path / "cache" / "patches-1.mpp"
+        with (
+            patch(
+                "scripts.utils.network._client_options",
+                return_value={**options, "transport": httpx.MockTransport(handler)},
+            ),
+            patch("scripts.utils.network._CLIENT_POOL", _ClientPool()),
+        ):
+            config = HttpClientConfig(artifact_dir=default_artifact_dir())
+            assert download_with_lock("https://example.com/patches.mpp", first, temp_dir=tmp_path, config=config)
+            assert download_with_lock("https://example.com/patches.mpp", second, temp_dir=tmp_path, config=config)
+
+        assert len(requests) == 1
+        assert first.read_bytes() == second.read_bytes() == body
+
+    def test_store_is_off_by_default(self, tmp_path: Path) -> None:
+        assert HttpClientConfig().artifact_dir is None
+
+        with patch("scripts.utils.network.download_with_lock", return_value=True) as download:
+            gh_dl(tmp_path / "patches.mpp", "https://github.com/o/r/releases/download/v1/patches.mpp")
+
+        assert download.call_args.kwargs["config"].artifact_dir == default_artifact_dir()
+
+    def test_known_sha256_is_served_from_store(self, tmp_path: Path) -> None:
+        body = b"artifact"
+        digest = hashlib.sha256(body).hexdigest()
+        src = tmp_path / "src"
+        src.write_bytes(body)
+        ArtifactStore().add(src, digest)
+        output = tmp_path / "mirror.apk"
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            assert download_with_lock(
+                "https://mirror.example/app.apk",
+                output,
+                temp_dir=tmp_path,
+                config=HttpClientConfig(artifact_dir=default_artifact_dir()),
+                sha256=digest,
+            )
+
+        mock_cls.assert_not_called()
+        assert output.read_bytes() == body
+
 
 # ---------------------------------------------------------------------------
 # req, gh_req, gh_dl helpers
@@ -161,18 +495,19 @@ class TestHelperFunctions:
 
         assert result == "response body"
 
-    def test_gh_req_adds_auth_header(self, monkeypatch: pytest.MonkeyPatch) -> None:
+    def test_gh_req_adds_auth_header(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
         monkeypatch.setenv("GITHUB_TOKEN", "ghp_test")
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
         captured_headers: dict[str, str] = {}
 
-        def fake_get(url: str, output: object = None, headers: dict[str, str] | None = None) -> str:
+        def fake_fetch(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
             if headers:
                 captured_headers.update(headers)
-            return ""
+            return httpx.Response(200, text="[]")
 
         with patch("scripts.utils.network.HttpClient") as mock_cls:
             mock_client = MagicMock()
-            mock_client.get.side_effect = fake_get
+            mock_client.fetch.side_effect = fake_fetch
             mock_client.close.return_value = None
             mock_cls.return_value = mock_client
 
@@ -190,6 +525,98 @@ class TestHelperFunctions:
         mock_dl.assert_called_once()
 
 
+# ---------------------------------------------------------------------------
+# gh_req response cache
+# ---------------------------------------------------------------------------
+
+
+class TestGhReqCache:
+    URL = "https://api.github.com/repos/test/test/releases"
+
+    def _fake_client(self, responses: list[httpx.Response], seen: list[dict[str, str]]) -> MagicMock:
+        def fake_fetch(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+            seen.append(dict(headers or {}))
+            return responses.pop(0)
+
+        mock_client = MagicMock()
+        mock_client.fetch.side_effect = fake_fetch
+        return mock_client
+
+    def test_fresh_entry_skips_network(self, tmp_path: Path) -> None:
+        cfg = HttpClientConfig(api_cache_dir=tmp_path, api_cache_ttl=600)
+        seen: list[dict[str, str]] = []
+        responses = [httpx.Response(200, text='[{"tag_name": "v1"}]', headers={"ETag": '"abc"'})]
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value = self._fake_client(responses, seen)
+            first = gh_req(self.URL, config=cfg)
+            second = gh_req(self.URL, config=cfg)
+
+        assert first == second == '[{"tag_name": "v1"}]'
+        assert len(seen) == 1
+
+    def test_stale_entry_is_revalidated_and_304_served_from_disk(self, tmp_path: Path) -> None:
+        cfg = HttpClientConfig(api_cache_dir=tmp_path, api_cache_ttl=0)
+        seen: list[dict[str, str]] = []
+        responses = [
+            httpx.Response(200, text="[1]", headers={"ETag": '"abc"'}),
+            httpx.Response(304),
+        ]
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value = self._fake_client(responses, seen)
+            gh_req(self.URL, config=cfg)
+            result = gh_req(self.URL, config=cfg)
+
+        assert result == "[1]"
+        assert "If-None-Match" not in seen[0]
+        assert seen[1]["If-None-Match"] == '"abc"'
+
+    @pytest.mark.asyncio
+    async def test_async_gh_req_shares_cache(self, tmp_path: Path) -> None:
+        cfg = HttpClientConfig(api_cache_dir=tmp_path, api_cache_ttl=0)
+        seen: list[dict[str, str]] = []
+        responses = [httpx.Response(200, text="[1]", headers={"ETag": '"abc"'})]
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value = self._fake_client(responses, seen)
+            gh_req(self.URL, config=cfg)
+
+        async def fake_async_fetch(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+            seen.append(dict(headers or {}))
+            return httpx.Response(304)
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_client = mock_cls.return_value.__aenter__.return_value
+            mock_client.async_fetch.side_effect = fake_async_fetch
+            result = await async_gh_req(self.URL, config=cfg)
+
+        assert result == "[1]"
+        assert seen[1]["If-None-Match"] == '"abc"'
+
+    def test_error_responses_are_not_cached(self, tmp_path: Path) -> None:
+        cfg = HttpClientConfig(api_cache_dir=tmp_path)
+        responses = [httpx.Response(403, text='{"message": "rate limited"}')]
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value = self._fake_client(responses, [])
+            gh_req(self.URL, config=cfg)
+
+        assert not _api_cache_path(tmp_path, self.URL).exists()
+
+    def test_cache_disabled_when_dir_is_none(self) -> None:
+        cfg = HttpClientConfig(api_cache_dir=None)
+        seen: list[dict[str, str]] = []
+        responses = [httpx.Response(200, text="[]"), httpx.Response(200, text="[]")]
+
+        with patch("scripts.utils.network.HttpClient") as mock_cls:
+            mock_cls.return_value = self._fake_client(responses, seen)
+            gh_req(self.URL, config=cfg)
+            gh_req(self.URL, config=cfg)
+
+        assert len(seen) == 2
+
+
 # ---------------------------------------------------------------------------
 # aria2c_download
 # ---------------------------------------------------------------------------
@@ -289,3 +716,103 @@ class TestDownloadWithAria2cFallback:
 
         assert result is True
         mock_lock.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# DownloadGovernor
+# ---------------------------------------------------------------------------
+
+
+class TestDownloadGovernor:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, 0), ("", 0), (0, 0), ("512", 512), ("512K", 512 * 1024), ("2m", 2 * 1024 * 1024)],
+    )
+    def test_parse_byte_rate(self, value: str | int | None, expected: int) -> None:
+        assert parse_byte_rate(value) == expected
+
+    def test_parse_byte_rate_rejects_garbage(self) -> None:
+        with pytest.raises(ValueError, match="fast"):
+            parse_byte_rate("fast")
+
+    def test_caps_transfers_per_host(self) -> None:
+        governor = DownloadGovernor(max_per_host=2)
+        peak = 0
+        lock = threading.Lock()
+
+        def transfer(url: str) -> None:
+            nonlocal peak
+            with governor.slot(url):
+                with lock:
+                    peak = max(peak, governor.in_flight("a.example"))
+                time.sleep(0.02)
+
+        urls = ["https://a.example/f"] * 6 + ["https://b.example/f"]
+        threads = [threading.Thread(target=transfer, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak == 2
+        assert governor.in_flight("a.example") == 0
+
+    @pytest.mark.asyncio
+    async def test_round_robin_between_jobs(self) -> None:
+        governor = DownloadGovernor(max_per_host=1)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def transfer(job: str) -> None:
+            with download_job(job):
+                async with governor.aslot("https://a.example/f"):
+                    await gate.wait()
+                    order.append(job)
+
+        tasks = [asyncio.create_task(transfer(job)) for job in ["a", "a", "a", "b", "b"]]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "a", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        governor = DownloadGovernor(max_per_host=1)
+        url = "https://a.example/f"
+        async with governor.aslot(url):
+            waiting = asyncio.create_task(governor.aslot(url).__aenter__())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        assert governor.in_flight("a.example") == 0
+        async with asyncio.timeout(1), governor.aslot(url):
+            assert governor.in_flight("a.example") == 1
+
+    def test_pooled_fetch_holds_a_host_slot(self) -> None:
+        seen: list[int] = []
+
+        def handler(_request: httpx.Request) -> httpx.Response:
+            seen.append(download_governor().in_flight("a.example"))
+            return httpx.Response(200, text="ok")
+
+        client = HttpClient()
+        client._sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+        client.fetch("https://a.example/page")
+        client.close()
+
+        assert seen == [1]
+        assert download_governor().in_flight("a.example") == 0
+
+    def test_throttle_sleeps_for_excess_bytes(self) -> None:
+        governor = DownloadGovernor(bandwidth_limit=DOWNLOAD_CHUNK_SIZE)
+        with patch("scripts.utils.network.time.sleep") as sleep:
+            governor.throttle(2 * DOWNLOAD_CHUNK_SIZE)
+        assert sleep.call_args.args[0] == pytest.approx(2, rel=0.01)
+
+    def test_unlimited_bandwidth_never_sleeps(self) -> None:
+        governor = DownloadGovernor(bandwidth_limit=0)
+        with patch("scripts.utils.network.time.sleep") as sleep:
+            governor.throttle(10 * DOWNLOAD_CHUNK_SIZE)
+        sleep.assert_not_called()
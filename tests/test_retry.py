@@ -0,0 +1,175 @@
+"""Tests for scripts/utils/retry.py."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+import time
+from email.utils import formatdate
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from scripts.utils.retry import (
+    RetryPolicy,
+    TokenBucket,
+    host_state,
+    is_retryable_error,
+    is_retryable_response,
+    parse_retry_after,
+    rate_limit_delay,
+    reset_host_states,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+URL = "https://example.com/asset"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_hosts() -> Iterator[None]:
+    reset_host_states()
+    yield
+    reset_host_states()
+
+
+def _response(status: int, headers: dict[str, str] | None = None) -> httpx.Response:
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", URL))
+
+
+def _raising(responses: list[httpx.Response]) -> tuple[list[int], Callable[[], httpx.Response]]:
+    calls: list[int] = []
+
+    def func() -> httpx.Response:
+        response = responses[min(len(calls), len(responses) - 1)]
+        calls.append(response.status_code)
+        response.raise_for_status()
+        return response
+
+    return calls, func
+
+
+# ---------------------------------------------------------------------------
+# Header parsing and classification
+# ---------------------------------------------------------------------------
+
+
+class TestHeaders:
+    def test_retry_after_seconds(self) -> None:
+        assert parse_retry_after("7") == 7.0
+
+    def test_retry_after_http_date(self) -> None:
+        delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+        assert delay is not None
+        assert 25 <= delay <= 31
+
+    def test_retry_after_malformed(self) -> None:
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_github_rate_limit_reset(self) -> None:
+        headers = httpx.Headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 20)})
+        delay = rate_limit_delay(headers)
+        assert delay is not None
+        assert 18 <= delay <= 21
+
+    def test_quota_left_is_no_hint(self) -> None:
+        headers = httpx.Headers({"X-RateLimit-Remaining": "12", "X-RateLimit-Reset": "0"})
+        assert rate_limit_delay(headers) is None
+
+
+class TestRetryability:
+    @pytest.mark.parametrize("status", [408, 425, 429, 500, 502, 503, 504])
+    def test_transient_statuses(self, status: int) -> None:
+        assert is_retryable_response(_response(status))
+
+    @pytest.mark.parametrize("status", [400, 401, 404, 410, 501])
+    def test_permanent_statuses(self, status: int) -> None:
+        assert not is_retryable_response(_response(status))
+
+    def test_403_only_when_rate_limited(self) -> None:
+        assert not is_retryable_response(_response(403))
+        assert is_retryable_response(_response(403, {"Retry-After": "5"}))
+        assert is_retryable_response(_response(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"}))
+
+    def test_transport_errors(self) -> None:
+        assert is_retryable_error(httpx.ConnectError("boom"))
+        assert is_retryable_error(httpx.ReadTimeout("slow"))
+        assert not is_retryable_error(httpx.UnsupportedProtocol("ftp"))
+        assert not is_retryable_error(httpx.TooManyRedirects("loop"))
+
+
+# ---------------------------------------------------------------------------
+# RetryPolicy
+# ---------------------------------------------------------------------------
+
+
+class TestRetryPolicy:
+    def test_not_found_is_not_retried(self) -> None:
+        calls, func = _raising([_response(404)])
+        with patch("scripts.utils.retry.time.sleep") as sleep, pytest.raises(httpx.HTTPStatusError):
+            RetryPolicy(max_retries=4).call(func)
+        assert calls == [404]
+        sleep.assert_not_called()
+
+    def test_retry_after_drives_sleep(self) -> None:
+        calls, func = _raising([_response(429, {"Retry-After": "3"}), _response(200)])
+        with patch("scripts.utils.retry.time.sleep") as sleep:
+            result = RetryPolicy(max_retries=4, initial_delay=0.01).call(func)
+        assert result.status_code == 200
+        assert calls == [429, 200]
+        sleep.assert_called_once_with(3.0)
+
+    def test_backoff_without_hint(self) -> None:
+        calls, func = _raising([_response(503), _response(503), _response(200)])
+        with patch("scripts.utils.retry.time.sleep") as sleep:
+            RetryPolicy(max_retries=4, initial_delay=1, jitter=0).call(func)
+        assert calls == [503, 503, 200]
+        assert [c.args[0] for c in sleep.call_args_list] == [1, 2]
+
+    def test_returned_error_response_is_retried_then_returned(self) -> None:
+        responses = iter([_response(502), _response(502)])
+        with patch("scripts.utils.retry.time.sleep"):
+            result = RetryPolicy(max_retries=1, initial_delay=0).call(lambda: next(responses))
+        assert result.status_code == 502
+
+    def test_deadline_stops_long_waits(self) -> None:
+        calls, func = _raising([_response(429, {"Retry-After": "600"})])
+        with patch("scripts.utils.retry.time.sleep") as sleep, pytest.raises(httpx.HTTPStatusError):
+            RetryPolicy(max_retries=4, deadline=60).call(func)
+        assert calls == [429]
+        sleep.assert_not_called()
+
+    def test_host_budget_limits_retries(self) -> None:
+        state = host_state("example.com")
+        state.budget = TokenBucket(capacity=1, refill_rate=0)
+        calls, func = _raising([_response(503)])
+        with patch("scripts.utils.retry.time.sleep"), pytest.raises(httpx.HTTPStatusError):
+            RetryPolicy(max_retries=4, initial_delay=0).call(func)
+        assert calls == [503, 503]
+
+    def test_rate_limit_blocks_host_for_other_callers(self) -> None:
+        _, func = _raising([_response(429, {"Retry-After": "30"}), _response(200)])
+        with patch("scripts.utils.retry.time.sleep"):
+            RetryPolicy(max_retries=1).call(func)
+        assert host_state("example.com").remaining_block() > 25
+
+    @pytest.mark.asyncio
+    async def test_acall_retries_transport_errors(self) -> None:
+        attempts = 0
+
+        async def func() -> str:
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                msg = "refused"
+                raise httpx.ConnectError(msg)
+            return "ok"
+
+        with patch("scripts.utils.retry.asyncio.sleep") as sleep:
+            assert await RetryPolicy(max_retries=4, initial_delay=0).acall(func) == "ok"
+        assert attempts == 3
+        assert sleep.await_count == 2
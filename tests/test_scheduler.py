@@ -0,0 +1,146 @@
+"""Tests for scripts/builder/scheduler.py."""
+
+# ruff: noqa: S101
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import httpx
+
+from scripts.builder.scheduler import (
+    DEFAULT_BUILD_SECONDS,
+    SIZE_COST_BYTES_PER_SECOND,
+    BuildTimes,
+    Variant,
+    estimate_costs,
+    order_longest_first,
+    probe_content_length,
+)
+from scripts.utils.network import HttpClientConfig, _client_options, _ClientPool, download_governor
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+URL = "https://example.com/app.apk"
+
+
+def _history(tmp_path: Path, times: dict[str, float] | None = None) -> BuildTimes:
+    history = BuildTimes(tmp_path / "build-times.json")
+    for key, seconds in (times or {}).items():
+        history.record(key, seconds)
+    return history
+
+
+def _no_probe(url: str) -> int | None:
+    raise AssertionError(url)
+
+
+class TestBuildTimes:
+    def test_round_trip(self, tmp_path: Path) -> None:
+        history = _history(tmp_path, {"YouTube-arm64-v8a": 600.0})
+        history.save()
+
+        assert BuildTimes(history.path).get("YouTube-arm64-v8a") == 600.0
+
+    def test_record_smooths_samples(self, tmp_path: Path) -> None:
+        history = _history(tmp_path, {"app": 100.0})
+        history.record("app", 200.0)
+
+        assert history.get("app") == 150.0
+
+    def test_corrupt_file_is_empty(self, tmp_path: Path) -> None:
+        path = tmp_path / "build-times.json"
+        path.write_text("{not json")
+
+        assert BuildTimes(path).average() is None
+
+
+class TestOrdering:
+    def test_longest_recorded_build_first(self, tmp_path: Path) -> None:
+        history = _history(tmp_path, {"sdmaid": 30.0, "youtube": 600.0, "music": 200.0})
+        variants = [Variant(key, key) for key in ["sdmaid", "youtube", "music"]]
+
+        ordered = order_longest_first(variants, history, probe=_no_probe)
+
+        assert [v.key for v in ordered] == ["youtube", "music", "sdmaid"]
+
+    def test_unknown_variants_are_probed(self, tmp_path: Path) -> None:
+        history = _history(tmp_path, {"known": 60.0})
+        variants = [Variant("known", None), Variant("big", None, URL), Variant("page", None, "https://example.com/")]
+        sizes = {URL: 300 * SIZE_COST_BYTES_PER_SECOND}
+
+        costs = estimate_costs(variants, history, probe=sizes.get)
+
+        assert costs == {"known": 60.0, "big": 300.0, "page": 60.0}
+
+    def test_probed_size_reorders_unknown_variants(self, tmp_path: Path) -> None:
+        variants = [Variant("small", None, "https://example.com/small.apk"), Variant("big", None, URL)]
+        sizes = {URL: 300 * SIZE_COST_BYTES_PER_SECOND, "https://example.com/small.apk": SIZE_COST_BYTES_PER_SECOND}
+
+        ordered = order_longest_first(variants, _history(tmp_path), probe=sizes.get)
+
+        assert [v.key for v in ordered] == ["big", "small"]
+
+    def test_default_cost_without_history(self, tmp_path: Path) -> None:
+        costs = estimate_costs([Variant("a", None), Variant("b", None)], _history(tmp_path), probe=_no_probe)
+
+        assert costs == {"a": DEFAULT_BUILD_SECONDS, "b": DEFAULT_BUILD_SECONDS}
+
+    def test_ties_keep_config_order(self, tmp_path: Path) -> None:
+        variants = [Variant(key, key) for key in ["a", "b", "c"]]
+
+        ordered = order_longest_first(variants, _history(tmp_path), probe=_no_probe)
+
+        assert [v.payload for v in ordered] == ["a", "b", "c"]
+
+
+def _serve(*responses: httpx.Response) -> tuple[list[tuple[str, int]], Any]:
+    """Patch the pooled clients to answer with ``responses`` in turn.
+
+    Returns the (method, requests holding a host slot) seen per request.
+    """
+    seen: list[tuple[str, int]] = []
+    answers = iter(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, download_governor().in_flight(request.url.host)))
+        return next(answers)
+
+    options = _client_options(HttpClientConfig())
+    transport = httpx.MockTransport(handler)
+    return seen, patch.multiple(
+        "scripts.utils.network",
+        _client_options=lambda _config: {**options, "transport": transport},
+        _CLIENT_POOL=_ClientPool(),
+    )
+
+
+class TestProbe:
+    def test_reads_content_length(self) -> None:
+        seen, serving = _serve(
+            httpx.Response(200, headers={"content-length": "1234", "content-type": "application/octet-stream"})
+        )
+        with serving:
+            assert probe_content_length(URL) == 1234
+        assert seen == [("HEAD", 1)]
+
+    def test_ignores_html_pages(self) -> None:
+        _, serving = _serve(httpx.Response(200, headers={"content-length": "1234", "content-type": "text/html"}))
+        with serving:
+            assert probe_content_length(URL) is None
+
+    def test_failure_gives_none(self) -> None:
+        with patch("scripts.builder.scheduler.HttpClient") as mock_cls:
+            mock_cls.return_value.head.side_effect = httpx.ConnectError("down")
+            assert probe_content_length(URL) is None
+
+    def test_rate_limit_is_retried(self) -> None:
+        seen, serving = _serve(
+            httpx.Response(429, headers={"retry-after": "0"}),
+            httpx.Response(200, headers={"content-length": "99", "content-type": "application/octet-stream"}),
+        )
+        with serving, patch("scripts.utils.retry.time.sleep"):
+            assert probe_content_length(URL) == 99
+        assert seen == [("HEAD", 1), ("HEAD", 1)]